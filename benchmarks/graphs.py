@@ -0,0 +1,50 @@
+from src.DiGraph import DiGraph
+import random
+
+"""
+Reproducible graphs for the benchmarks, and the conversion of a graph into a NetworkX graph (for comparisons).
+"""
+
+
+def random_graph(num_of_nodes: int, edges_per_node: int = 8, seed: int = 7, positions: bool = True) -> DiGraph:
+    """
+    Creating a random directed weighted graph, the same seed always gives the same graph.
+    :param num_of_nodes: the number of nodes in the graph (with the ids 0..num_of_nodes-1).
+    :param edges_per_node: the average number of out-edges of a node.
+    :param seed: the seed of the random generator.
+    :param positions: (True/False) if the nodes should have random positions in the unit square.
+    :return: a new DiGraph with num_of_nodes * edges_per_node edges (at most), with weights between 1 and 2.
+    """
+    rand = random.Random(seed)
+    graph = DiGraph()
+    node_positions = [(rand.random(), rand.random(), 0) for _ in range(num_of_nodes)] if positions else None
+    graph.add_nodes_from(range(num_of_nodes), node_positions)
+    num_of_edges = min(num_of_nodes * edges_per_node, num_of_nodes * (num_of_nodes - 1))
+    while graph.e_size() < num_of_edges:
+        missing = num_of_edges - graph.e_size()
+        graph.add_edges_from((rand.randrange(num_of_nodes), rand.randrange(num_of_nodes), 1 + rand.random())
+                             for _ in range(missing))
+    return graph
+
+
+def random_pairs(graph: DiGraph, count: int, seed: int = 7) -> list:
+    """
+    :return: a reproducible list of count random (src, dest) pairs of nodes in the graph.
+    """
+    rand = random.Random(seed)
+    nodes = list(graph.get_all_v().keys())
+    return [(rand.choice(nodes), rand.choice(nodes)) for _ in range(count)]
+
+
+def create_nx_graph(graph):
+    """
+    Converting a graph into a networkx.DiGraph with the same nodes (and positions), edges and weights.
+    """
+    import networkx as nx
+    nx_graph = nx.DiGraph()
+    for key, node in graph.get_all_v().items():
+        nx_graph.add_node(key, pos=node.pos)
+    for key in graph.get_all_v():
+        for neighbour, weight in graph.all_out_edges_of_node(key).items():
+            nx_graph.add_edge(key, neighbour, weight=weight)
+    return nx_graph
@@ -0,0 +1,193 @@
+from benchmarks.graphs import random_graph, random_pairs, create_nx_graph
+from src.GraphAlgo import GraphAlgo
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+"""
+A standalone benchmark runner for the graph algorithms, replacing the old run_time_compare_test script.
+The graphs are generated with a fixed seed at several scales, every operation is run a few times after a warmup,
+and the results are written as JSON, so the results of two versions can be compared to find regressions:
+
+    python -m benchmarks.run --scales 1000,10000 --output results.json
+    python -m benchmarks.run --scales 1000,10000 --baseline results.json
+
+The same operations are timed with NetworkX when it is installed.
+"""
+
+SHORTEST_PATH_QUERIES = 100
+
+
+def measure(func, warmup: int, repeat: int) -> list:
+    """
+    Timing a function.
+    :param func: a function without parameters.
+    :param warmup: the number of calls that are not timed.
+    :param repeat: the number of timed calls.
+    :return: a list of the times of the timed calls, in seconds.
+    """
+    for _ in range(warmup):
+        func()
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def benchmark_scale(num_of_nodes: int, edges_per_node: int, seed: int, warmup: int, repeat: int, use_networkx: bool,
+                    plot: bool, folder: str) -> list:
+    """
+    Timing all the operations on one random graph.
+    :return: a list of result records (see run).
+    """
+    graph = random_graph(num_of_nodes, edges_per_node, seed)
+    pairs = random_pairs(graph, SHORTEST_PATH_QUERIES, seed)
+    json_file = os.path.join(folder, "G_%d.json" % num_of_nodes)
+    binary_file = os.path.join(folder, "G_%d.bin" % num_of_nodes)
+    GraphAlgo(graph).save_to_json(json_file)
+    GraphAlgo(graph).save_binary(binary_file)
+
+    def shortest_paths():
+        # A new GraphAlgo for every run, so no cached state is reused between the runs
+        algo = GraphAlgo(graph)
+        for src, dest in pairs:
+            algo.shortest_path(src, dest)
+
+    operations = [
+        ("load_json", lambda: GraphAlgo().load_from_json(json_file)),
+        ("save_json", lambda: GraphAlgo(graph).save_to_json(os.path.join(folder, "saved.json"))),
+        ("save_json_gzip", lambda: GraphAlgo(graph).save_to_json(os.path.join(folder, "saved.json.gz"))),
+        ("load_binary", lambda: GraphAlgo().load_binary(binary_file)),
+        ("shortest_path", shortest_paths),
+        ("connected_components", lambda: GraphAlgo(graph).connected_components()),
+    ]
+    if plot:
+        operations.append(("plot", lambda: GraphAlgo(graph).render_to_file(os.path.join(folder, "graph.png"))))
+    records = [(name, "python", func) for name, func in operations]
+
+    if use_networkx:
+        import networkx as nx
+        nx_graph = create_nx_graph(graph)
+
+        def nx_shortest_paths():
+            for src, dest in pairs:
+                try:
+                    nx.single_source_dijkstra(nx_graph, src, dest)
+                except nx.NetworkXNoPath:
+                    pass
+
+        records.append(("shortest_path", "networkx", nx_shortest_paths))
+        records.append(("connected_components", "networkx", lambda: list(nx.strongly_connected_components(nx_graph))))
+
+    results = []
+    for name, implementation, func in records:
+        times = measure(func, warmup, repeat)
+        results.append({"nodes": graph.v_size(), "edges": graph.e_size(), "operation": name,
+                        "implementation": implementation, "times": times, "min": min(times),
+                        "median": statistics.median(times), "mean": statistics.mean(times)})
+        print("%8d nodes  %-22s %-9s median %10.4f s  min %10.4f s" %
+              (graph.v_size(), name, implementation, results[-1]["median"], results[-1]["min"]))
+    return results
+
+
+def run(scales: list, edges_per_node: int = 8, seed: int = 7, warmup: int = 1, repeat: int = 5,
+        use_networkx: bool = None, plot: bool = None) -> dict:
+    """
+    Running the benchmarks on random graphs of several sizes.
+    :param scales: the numbers of nodes of the graphs.
+    :param edges_per_node: the average number of out-edges of a node.
+    :param seed: the seed of the graphs and of the shortest path queries.
+    :param warmup: the number of untimed runs of every operation.
+    :param repeat: the number of timed runs of every operation.
+    :param use_networkx: (True/False) if the operations should also be timed with NetworkX, by default only if it's
+    installed.
+    :param plot: (True/False) if plotting should be timed, by default only if matplotlib is installed.
+    :return: a dictionary with the settings of the run ("meta") and a list of the results ("results"), every result
+    has the size of the graph, the operation, the implementation, all the times and their min/median/mean.
+    """
+    if use_networkx is None:
+        use_networkx = _installed("networkx")
+    if plot is None:
+        plot = _installed("matplotlib")
+    meta = {"python": sys.version.split()[0], "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"), "seed": seed, "edges_per_node": edges_per_node,
+            "warmup": warmup, "repeat": repeat, "shortest_path_queries": SHORTEST_PATH_QUERIES,
+            "networkx": use_networkx}
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for num_of_nodes in scales:
+            results.extend(benchmark_scale(num_of_nodes, edges_per_node, seed, warmup, repeat, use_networkx, plot,
+                                           folder))
+    return {"meta": meta, "results": results}
+
+
+def compare(results: dict, baseline: dict, threshold: float = 0.1) -> list:
+    """
+    Comparing the median times of two runs.
+    :param results: the results of the new run.
+    :param baseline: the results of the old run.
+    :param threshold: the relative slowdown above which an operation counts as a regression (0.1 is 10% slower).
+    :return: a list of (nodes, operation, implementation, old median, new median, ratio) of the regressions.
+    """
+    old = {(result["nodes"], result["operation"], result["implementation"]): result["median"]
+           for result in baseline["results"]}
+    regressions = []
+    for result in results["results"]:
+        key = (result["nodes"], result["operation"], result["implementation"])
+        if key not in old or old[key] == 0:
+            continue
+        ratio = result["median"] / old[key]
+        print("%8d nodes  %-22s %-9s %10.4f s -> %10.4f s  x%.2f%s" %
+              (key + (old[key], result["median"], ratio, "  REGRESSION" if ratio > 1 + threshold else "")))
+        if ratio > 1 + threshold:
+            regressions.append(key + (old[key], result["median"], ratio))
+    return regressions
+
+
+def _installed(module: str) -> bool:
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks of the graph algorithms.")
+    parser.add_argument("--scales", default="1000,10000", help="comma separated numbers of nodes")
+    parser.add_argument("--edges-per-node", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-networkx", action="store_true", help="don't time NetworkX even if it's installed")
+    parser.add_argument("--no-plot", action="store_true", help="don't time plotting")
+    parser.add_argument("--output", help="the JSON file to write the results to")
+    parser.add_argument("--baseline", help="a JSON file of an earlier run to compare the results with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="the slowdown that counts as a regression")
+    options = parser.parse_args(args)
+
+    results = run([int(scale) for scale in options.scales.split(",")], options.edges_per_node, options.seed,
+                  options.warmup, options.repeat, False if options.no_networkx else None,
+                  False if options.no_plot else None)
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)
+        if compare(results, baseline, options.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import threading
+import time
+
+"""
+The instrumentation of GraphAlgo (see GraphAlgo.enable_stats).
+The algorithms don't count anything in their inner loops beyond what they need anyway: the counters are derived from
+their state (settled sets, heap sizes) after a search ends, and only when a stats object was passed to them.
+"""
+
+
+class AlgoStats:
+    """
+    This class collects counters (e.g. nodes popped from the heap, edges relaxed) and wall times (e.g. of the parsing
+    and inserting phases of loading a graph) of the algorithms.
+    Every counter and time is kept under "<operation>.<name>", every operation also counts its calls and total time.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.times = {}
+        self.lock = threading.Lock()
+
+    def add(self, name: str, value=1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.times[name] = self.times.get(name, 0.0) + seconds
+
+    def record_search(self, settled: int, popped: int, relaxed: int, edges_scanned: int) -> None:
+        """
+        Adding the counters of a single Dijkstra/A* search.
+        :param settled: the number of nodes that were settled (popped for the first time).
+        :param popped: the number of entries popped from the heap, the ones that were not settled were stale.
+        :param relaxed: the number of edges that improved the distance of their destination (one heap push each).
+        :param edges_scanned: the number of edges that were checked.
+        """
+        self.add("searches")
+        self.add("nodes_popped", popped)
+        self.add("nodes_settled", settled)
+        self.add("stale_entries", popped - settled)
+        self.add("edges_scanned", edges_scanned)
+        self.add("edges_relaxed", relaxed)
+
+    def merge(self, operation: str, other) -> None:
+        """
+        Adding the counters and times of one call of an operation (collected in other) to these stats.
+        """
+        with self.lock:
+            self.counters[operation + ".calls"] = self.counters.get(operation + ".calls", 0) + 1
+            for name, value in other.counters.items():
+                key = operation + "." + name
+                self.counters[key] = self.counters.get(key, 0) + value
+            for name, seconds in other.times.items():
+                key = operation + "." + name
+                self.times[key] = self.times.get(key, 0.0) + seconds
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counters.clear()
+            self.times.clear()
+
+    def as_dict(self) -> dict:
+        """
+        :return: a dictionary with a copy of the counters and of the times (in seconds).
+        """
+        with self.lock:
+            return {"counters": dict(self.counters), "times": dict(self.times)}
+
+
+class Timer:
+    """
+    A context manager that adds the time spent inside it to a stats object, under the given name.
+    """
+    __slots__ = ("stats", "name", "start")
+
+    def __init__(self, stats: AlgoStats, name: str):
+        self.stats = stats
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stats.add_time(self.name, time.perf_counter() - self.start)
+        return False
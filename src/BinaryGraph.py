@@ -0,0 +1,92 @@
+from src.GraphInterface import GraphInteface
+from src.CSRGraph import CSRGraph
+import mmap
+import struct
+import sys
+from array import array
+
+"""
+A compact binary file format for directed weighted graphs, used by GraphAlgo.save_binary/load_binary.
+The file is a fixed size header followed by the arrays of a CSRGraph, written as raw 8 byte values:
+
+    header (64 bytes): magic, version, flags, number of nodes (n), number of edges (m), MC
+    node ids      int64[n]
+    positions     float64[3n]   (NaN for nodes without a position)
+    out offsets   int64[n+1]
+    out targets   int64[m]
+    out weights   float64[m]
+    in offsets    int64[n+1]
+    in sources    int64[m]
+    in weights    float64[m]
+
+Since every array is 8-byte aligned, a loaded file is used as is through memory mapping - nothing is parsed or
+copied, and the pages are only read from the disk when a query touches them.
+"""
+
+MAGIC = b"DWGRAPH\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sIIqqq")
+HEADER_SIZE = 64
+FLAG_DENSE_IDS = 1
+FLAG_BIG_ENDIAN = 2
+
+
+def write_binary(graph: GraphInteface, file_name: str) -> None:
+    """
+    Saving a graph in the binary format.
+    :param graph: the graph to save, any graph that isn't already a CSRGraph is frozen first.
+    :param file_name: the path of the file to save the graph in.
+    """
+    if not isinstance(graph, CSRGraph):
+        graph = CSRGraph.from_graph(graph)
+    n, m = graph.v_size(), graph.e_size()
+    flags = 0
+    if all(graph.NodeIds[i] == i for i in range(n)):
+        flags |= FLAG_DENSE_IDS
+    if sys.byteorder == "big":
+        flags |= FLAG_BIG_ENDIAN
+    with open(file_name, "wb") as file:
+        header = HEADER.pack(MAGIC, VERSION, flags, n, m, graph.get_mc())
+        file.write(header.ljust(HEADER_SIZE, b"\x00"))
+        for values, typecode in _arrays_of(graph):
+            if not isinstance(values, (array, memoryview)):
+                values = array(typecode, values)
+            file.write(values)
+
+
+def read_binary(file_name: str) -> CSRGraph:
+    """
+    Opening a graph that was saved in the binary format, the arrays of the returned graph are views over the memory
+    mapped file.
+    :param file_name: the path of the file to open.
+    :return: a CSRGraph over the file.
+    """
+    with open(file_name, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    if len(view) < HEADER_SIZE:
+        raise ValueError("%s is not a binary graph file" % file_name)
+    magic, version, flags, n, m, mc = HEADER.unpack_from(view, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("%s is not a binary graph file" % file_name)
+    swap = bool(flags & FLAG_BIG_ENDIAN) != (sys.byteorder == "big")
+
+    sizes = (("q", n), ("d", 3 * n), ("q", n + 1), ("q", m), ("d", m), ("q", n + 1), ("q", m), ("d", m))
+    if len(view) != HEADER_SIZE + 8 * sum(size for typecode, size in sizes):
+        raise ValueError("%s is truncated or corrupted" % file_name)
+    arrays = []
+    offset = HEADER_SIZE
+    for typecode, size in sizes:
+        values = view[offset:offset + 8 * size].cast(typecode)
+        if swap:
+            # The file was written on a machine with a different byte order, so it has to be copied
+            values = array(typecode, values.tobytes())
+            values.byteswap()
+        arrays.append(values)
+        offset += 8 * size
+    return CSRGraph(*arrays, mc=mc, dense_ids=bool(flags & FLAG_DENSE_IDS))
+
+
+def _arrays_of(graph: CSRGraph):
+    return ((graph.NodeIds, "q"), (graph.Positions, "d"), (graph.OutOffsets, "q"), (graph.OutTargets, "q"),
+            (graph.OutWeights, "d"), (graph.InOffsets, "q"), (graph.InSources, "q"), (graph.InWeights, "d"))
@@ -0,0 +1,174 @@
+from src.GraphInterface import GraphInteface
+from src.DiGraph import Node
+from array import array
+import math
+
+
+class CSRGraph(GraphInteface):
+    """
+    An immutable, compressed-sparse-row (CSR) snapshot of a directed weighted graph.
+    Instead of keeping every edge twice in nested dictionaries, the edges are stored in flat arrays:
+    the out-edges of the node at index i are OutTargets[OutOffsets[i]:OutOffsets[i+1]] (with the matching weights in
+    OutWeights), and the same layout is kept in reverse (InOffsets/InSources/InWeights) for the in-edges.
+    Edge targets/sources are stored as node indexes, NodeIds maps an index back to the (integer) node id.
+    The snapshot exposes the same read methods as DiGraph, so the algorithms in GraphAlgo can run over it.
+    All the mutating methods do nothing and return False.
+    The arrays can be any indexable sequences of numbers (array.array, or memoryviews over a memory mapped file, see
+    BinaryGraph), when dense_ids is True the node ids are known to be exactly 0..n-1.
+    """
+
+    def __init__(self, node_ids, positions, out_offsets, out_targets, out_weights, in_offsets, in_sources,
+                 in_weights, mc=0, dense_ids=False):
+        self.NodeIds = node_ids
+        self.Positions = positions
+        self.OutOffsets = out_offsets
+        self.OutTargets = out_targets
+        self.OutWeights = out_weights
+        self.InOffsets = in_offsets
+        self.InSources = in_sources
+        self.InWeights = in_weights
+        self.MC = mc
+        self._index = range(len(node_ids)) if dense_ids else None
+        self._nodes = None
+
+    @classmethod
+    def from_graph(cls, graph: GraphInteface):
+        """
+        Building a CSR snapshot out of any graph that implements GraphInteface.
+        The order of the nodes and the order of the edges of every node are kept as they are in the original graph.
+        :param graph: the graph to take the snapshot of.
+        :return: a new CSRGraph.
+        """
+        nodes = graph.get_all_v()
+        index = {node_id: i for i, node_id in enumerate(nodes)}
+        node_ids = array("q", nodes.keys())
+        positions = array("d")
+        for node in nodes.values():
+            if node.pos is None:
+                positions.extend((math.nan, math.nan, math.nan))
+            else:
+                positions.extend((float(node.pos[0]), float(node.pos[1]), float(node.pos[2])))
+
+        out_offsets, out_targets, out_weights = array("q", [0]), array("q"), array("d")
+        in_offsets, in_sources, in_weights = array("q", [0]), array("q"), array("d")
+        for node_id in nodes:
+            for neighbour, weight in graph.all_out_edges_of_node(node_id).items():
+                out_targets.append(index[neighbour])
+                out_weights.append(weight)
+            out_offsets.append(len(out_targets))
+            for neighbour, weight in graph.all_in_edges_of_node(node_id).items():
+                in_sources.append(index[neighbour])
+                in_weights.append(weight)
+            in_offsets.append(len(in_sources))
+
+        csr = cls(node_ids, positions, out_offsets, out_targets, out_weights, in_offsets, in_sources, in_weights,
+                  graph.get_mc())
+        csr._index = index
+        return csr
+
+    def __reduce__(self):
+        """
+        Pickling a snapshot (e.g. when it is sent to worker processes), arrays that are views over a memory mapped
+        file are copied into regular arrays.
+        """
+        arrays = [values if isinstance(values, array) else array(typecode, values) for values, typecode in
+                  ((self.NodeIds, "q"), (self.Positions, "d"), (self.OutOffsets, "q"), (self.OutTargets, "q"),
+                   (self.OutWeights, "d"), (self.InOffsets, "q"), (self.InSources, "q"), (self.InWeights, "d"))]
+        return CSRGraph, tuple(arrays) + (self.MC, isinstance(self._index, range))
+
+    def index_of(self, node_id):
+        """
+        Finding the index of a node inside the CSR arrays.
+        The id->index map is built on the first call, and skipped entirely when the ids are exactly 0..n-1.
+        :param node_id: the id of the node.
+        :return: the index of the node, or None if there is no such node.
+        """
+        if self._index is None:
+            ids = self.NodeIds
+            if all(ids[i] == i for i in range(len(ids))):
+                self._index = range(len(ids))
+            else:
+                self._index = {node_id: i for i, node_id in enumerate(ids)}
+        if isinstance(self._index, range):
+            if type(node_id) is int and 0 <= node_id < len(self._index):
+                return node_id
+            return None
+        return self._index.get(node_id)
+
+    def _pos(self, i):
+        x = self.Positions[3 * i]
+        if math.isnan(x):
+            return None
+        return x, self.Positions[3 * i + 1], self.Positions[3 * i + 2]
+
+    def v_size(self):
+        return len(self.NodeIds)
+
+    def e_size(self):
+        return len(self.OutTargets)
+
+    def get_all_v(self):
+        """
+        Returning a dictionary of all the nodes in the graph.
+        The Node objects are only created on the first call (and then kept), so a snapshot that is used only for
+        edge traversals never pays for them.
+        :return: a dictionary of (node id, Node).
+        """
+        if self._nodes is None:
+            self._nodes = {node_id: Node(node_id, self._pos(i)) for i, node_id in enumerate(self.NodeIds)}
+        return self._nodes
+
+    def getNode(self, id):
+        if self._nodes is not None:
+            return self._nodes.get(id)
+        i = self.index_of(id)
+        if i is None:
+            return None
+        return Node(self.NodeIds[i], self._pos(i))
+
+    def all_in_edges_of_node(self, id1):
+        """
+        Returning a dictionary of all the nodes that have an edge directed towards id1, with the weight of the edge.
+        :param id1: the id of the node.
+        :return: dictionary of id1's neighbours that have an edge directed towards id1.
+        """
+        i = self.index_of(id1)
+        if i is None:
+            return None
+        ids = self.NodeIds
+        start, end = self.InOffsets[i], self.InOffsets[i + 1]
+        return {ids[j]: w for j, w in zip(self.InSources[start:end], self.InWeights[start:end])}
+
+    def all_out_edges_of_node(self, id1):
+        """
+        Returning a dictionary of all the nodes that id1 has an edge directed towards, with the weight of the edge.
+        :param id1: the id of the node.
+        :return: dictionary of id1's neighbours that have an edge directed away from id1.
+        """
+        i = self.index_of(id1)
+        if i is None:
+            return None
+        ids = self.NodeIds
+        start, end = self.OutOffsets[i], self.OutOffsets[i + 1]
+        return {ids[j]: w for j, w in zip(self.OutTargets[start:end], self.OutWeights[start:end])}
+
+    def get_mc(self):
+        return self.MC
+
+    def add_edge(self, id1, id2, weight):
+        return False
+
+    def add_node(self, node_id, pos: tuple = None):
+        return False
+
+    def remove_node(self, node_id):
+        return False
+
+    def remove_edge(self, node_id1, node_id2):
+        return False
+
+    def __str__(self):
+        result = ""
+        for node in self.NodeIds:
+            result += "Node: %s, Neighbours: %s \n" % (node, str(self.all_out_edges_of_node(node)))
+        return result
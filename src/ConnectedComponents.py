@@ -0,0 +1,73 @@
+from src.GraphInterface import GraphInteface
+
+"""
+The strongly connected components engine used by GraphAlgo.
+Like the shortest path engine, it works on any graph that implements GraphInteface and never changes the graph.
+"""
+
+
+def strongly_connected_components(graph: GraphInteface, nodes=None, stats=None) -> list:
+    """
+    An iterative (non-recursive) version of Tarjan's algorithm, finding all the strongly connected components in
+    O(V+E) time. The recursion of the original algorithm is replaced by an explicit stack of (node, neighbours
+    iterator) pairs, so deep graphs don't hit Python's recursion limit.
+    :param graph: the graph to search in.
+    :param nodes: optional set of node ids, when given only the subgraph induced by these nodes is searched.
+    :param stats: optional AlgoStats, the number of visited nodes, scanned edges and components are added to it.
+    :return: a list of all the strongly connected components, every component is a (non-sorted) list of node ids.
+    """
+    out_edges = graph.all_out_edges_of_node
+    if nodes is None:
+        roots = graph.get_all_v().keys()
+    else:
+        roots = nodes
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+
+    for root in roots:
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(out_edges(root)))]
+        while work:
+            node, neighbours = work[-1]
+            for neighbour in neighbours:
+                if nodes is not None and neighbour not in nodes:
+                    continue
+                if neighbour not in index:
+                    index[neighbour] = low[neighbour] = counter
+                    counter += 1
+                    stack.append(neighbour)
+                    on_stack.add(neighbour)
+                    work.append((neighbour, iter(out_edges(neighbour))))
+                    break
+                elif neighbour in on_stack and index[neighbour] < low[node]:
+                    low[node] = index[neighbour]
+            else:
+                # All the neighbours of node were checked, so node is done:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    if stats is not None:
+        stats.add("nodes_visited", len(index))
+        stats.add("edges_scanned", sum(len(out_edges(node)) for node in index))
+        stats.add("components", len(components))
+    return components
@@ -0,0 +1,316 @@
+from src.GraphInterface import GraphInteface
+from heapq import heappush, heappop, heapify
+import json
+import math
+
+INFINITY = math.inf
+
+
+class ContractionHierarchy:
+    """
+    This class was created in order to answer many shortest path queries on a graph that rarely changes.
+    In a preprocessing step the nodes are "contracted" one by one, from the least important to the most important:
+    a contracted node is removed from the graph, and for every pair of its neighbours u->node->w whose shortest path
+    goes through it, a shortcut edge u->w is added (unless a witness path that avoids the node is found).
+    A query then only has to search upward - forward from the source and backward from the target, using only edges
+    that lead to more important nodes - and the two searches meet at the most important node of the shortest path.
+    The found path is made of shortcuts, which are unpacked back into the original edges using the node that every
+    shortcut skips over.
+    On graphs without a natural hierarchy (e.g. random graphs) contracting the last nodes adds a huge number of
+    shortcuts, so the contraction stops once the remaining graph gets too dense. The remaining nodes are left as
+    a "core" of equally important nodes, which both searches traverse like a regular bidirectional Dijkstra.
+    """
+
+    def __init__(self, graph: GraphInteface, order: list, core_start: int, shortcuts: dict, mc: int):
+        """
+        :param graph: the graph the hierarchy was built on.
+        :param order: all the nodes of the graph, in the order they were contracted (the core nodes are last).
+        :param core_start: the index in order of the first node of the core.
+        :param shortcuts: dictionary of (src, dest) -> (weight, the contracted node the shortcut skips over).
+        :param mc: the MC of the graph the hierarchy is valid for.
+        """
+        self.graph = graph
+        self.order = order
+        self.core_start = core_start
+        self.shortcuts = shortcuts
+        self.mc = mc
+        self.rank = {node: min(rank, core_start) for rank, node in enumerate(order)}
+        self.upward = {node: {} for node in order}
+        self.downward = {node: {} for node in order}
+        for node in order:
+            for neighbour, weight in graph.all_out_edges_of_node(node).items():
+                self._add_edge(node, neighbour, weight)
+        for (src, dest), (weight, via) in shortcuts.items():
+            self._add_edge(src, dest, weight)
+
+    def _add_edge(self, src, dest, weight):
+        # Upward edges are kept at the less important end: as an out-edge of src or as an in-edge of dest,
+        # and edges inside the core are kept in both directions
+        if self.rank[dest] >= self.rank[src]:
+            edges = self.upward[src]
+            if weight < edges.get(dest, INFINITY):
+                edges[dest] = weight
+        if self.rank[dest] <= self.rank[src]:
+            edges = self.downward[dest]
+            if weight < edges.get(src, INFINITY):
+                edges[src] = weight
+
+    @classmethod
+    def build(cls, graph: GraphInteface, max_settled: int = 50, max_core_degree: float = 16):
+        """
+        Building the hierarchy of a graph.
+        The next node to contract is the one with the smallest priority - the number of shortcuts its contraction adds
+        minus the number of edges it removes, plus the number of its neighbours that were already contracted. The
+        priorities are updated lazily: the chosen node is checked again before it is contracted.
+        :param graph: the graph to build the hierarchy of.
+        :param max_settled: the maximum number of nodes settled by a single witness search, a search that gives up
+        adds a shortcut that might not be needed, which keeps the preprocessing fast.
+        :param max_core_degree: the contraction stops when the average degree (edges per node) of the remaining graph
+        is higher than this, and the remaining nodes become the core.
+        :return: a new ContractionHierarchy.
+        """
+        builder = _Contraction(graph, max_settled, max_core_degree)
+        return cls(graph, builder.order, builder.core_start, builder.shortcuts, graph.get_mc())
+
+    def is_valid(self, graph: GraphInteface) -> bool:
+        """
+        :return: (True/False) if the hierarchy was built on this graph, and the graph wasn't changed since.
+        """
+        return graph is self.graph and graph.get_mc() == self.mc
+
+    def size(self) -> int:
+        """
+        :return: the number of shortcut edges in the hierarchy.
+        """
+        return len(self.shortcuts)
+
+    def shortest_path(self, src, dest) -> (float, list):
+        """
+        Finding the shortest path between two nodes using a bidirectional upward search.
+        Unlike a regular bidirectional search, each direction only stops when its next node is farther than the best
+        path found so far, since the searches don't meet at the middle of the path but at its most important node.
+        :param src: the source node of the path.
+        :param dest: the destination node of the path.
+        :return: a tuple of the distance and the path from src to dest, or (INFINITY, []) if there is no path.
+        """
+        if src == dest:
+            return 0, [src]
+        best, meeting, forward_parents, backward_parents = self._search(src, dest)
+        if meeting is None:
+            return INFINITY, []
+        upward_path = [meeting]
+        node = meeting
+        while node != src:
+            node = forward_parents[node]
+            upward_path.append(node)
+        upward_path.reverse()
+        node = meeting
+        while node != dest:
+            node = backward_parents[node]
+            upward_path.append(node)
+
+        path = self._unpack(upward_path)
+        distance = 0
+        for node, next_node in zip(path, path[1:]):
+            distance += self.graph.all_out_edges_of_node(node)[next_node]
+        return distance, path
+
+    def distance(self, src, dest):
+        """
+        Finding only the distance between two nodes (see shortest_path), without building and unpacking the path.
+        note: the distance is added up through the shortcuts, so with float weights it can differ from the distance
+        shortest_path returns in the last digits.
+        :return: the distance from src to dest, or INFINITY if there is no path.
+        """
+        if src == dest:
+            return 0
+        return self._search(src, dest)[0]
+
+    def _search(self, src, dest):
+        """
+        The bidirectional upward search of shortest_path.
+        :return: a tuple of the distance, the node where the best path meets (None if there is no path), and the
+        parents dictionaries of the forward and the backward searches.
+        """
+        forward = ({src: 0}, {src: src}, [(0, src)], self.upward)
+        backward = ({dest: 0}, {dest: dest}, [(0, dest)], self.downward)
+        best = INFINITY
+        meeting = None
+        while True:
+            forward_top = forward[2][0][0] if forward[2] else INFINITY
+            backward_top = backward[2][0][0] if backward[2] else INFINITY
+            if min(forward_top, backward_top) >= best:
+                break
+            if forward_top <= backward_top:
+                search, other = forward, backward
+            else:
+                search, other = backward, forward
+            distances, parents, heap, edges = search
+            distance, node = heappop(heap)
+            if distance > distances[node]:
+                continue
+            other_distances = other[0]
+            for neighbour, weight in edges[node].items():
+                new_distance = distance + weight
+                if new_distance < distances.get(neighbour, INFINITY):
+                    distances[neighbour] = new_distance
+                    parents[neighbour] = node
+                    heappush(heap, (new_distance, neighbour))
+                    if neighbour in other_distances and new_distance + other_distances[neighbour] < best:
+                        best = new_distance + other_distances[neighbour]
+                        meeting = neighbour
+        return best, meeting, forward[1], backward[1]
+
+    def _unpack(self, path: list) -> list:
+        """
+        Replacing every shortcut in the path with the original edges it stands for.
+        """
+        shortcuts = self.shortcuts
+        result = [path[0]]
+        stack = [(path[i], path[i + 1]) for i in range(len(path) - 2, -1, -1)]
+        while stack:
+            src, dest = stack.pop()
+            shortcut = shortcuts.get((src, dest))
+            if shortcut is None:
+                result.append(dest)
+            else:
+                via = shortcut[1]
+                stack.append((via, dest))
+                stack.append((src, via))
+        return result
+
+    def save(self, file_name: str) -> None:
+        """
+        Saving the hierarchy (the contraction order and the shortcuts) in a JSON file, to be saved alongside the graph.
+        """
+        shortcuts = [[src, dest, weight, via] for (src, dest), (weight, via) in self.shortcuts.items()]
+        data = {"Nodes": self.graph.v_size(), "Edges": self.graph.e_size(), "Order": self.order,
+                "CoreStart": self.core_start, "Shortcuts": shortcuts}
+        with open(file_name, "w") as file:
+            json.dump(data, file)
+
+    @classmethod
+    def load(cls, graph: GraphInteface, file_name: str):
+        """
+        Loading a hierarchy that was saved using save, for the same graph it was built on.
+        :param graph: the graph of the hierarchy (usually loaded from the graph file saved alongside the hierarchy).
+        :param file_name: the name of the hierarchy file.
+        :return: a new ContractionHierarchy, valid for the current version of the graph.
+        """
+        with open(file_name) as file:
+            data = json.load(file)
+        if data["Nodes"] != graph.v_size() or data["Edges"] != graph.e_size() or \
+                any(graph.getNode(node) is None for node in data["Order"]):
+            raise ValueError("The hierarchy in %s was built on a different graph" % file_name)
+        shortcuts = {(src, dest): (weight, via) for src, dest, weight, via in data["Shortcuts"]}
+        return cls(graph, data["Order"], data["CoreStart"], shortcuts, graph.get_mc())
+
+
+class _Contraction:
+    """
+    The state of the preprocessing step of ContractionHierarchy.build: a copy of the remaining (not contracted yet)
+    graph, including the shortcuts that were added so far.
+    """
+
+    def __init__(self, graph: GraphInteface, max_settled: int, max_core_degree: float):
+        self.max_settled = max_settled
+        nodes = list(graph.get_all_v().keys())
+        self.out_edges = {node: dict(graph.all_out_edges_of_node(node)) for node in nodes}
+        self.in_edges = {node: dict(graph.all_in_edges_of_node(node)) for node in nodes}
+        self.deleted_neighbours = dict.fromkeys(nodes, 0)
+        self.shortcuts = {}
+        self.order = []
+        edge_count = graph.e_size()
+
+        heap = [(self._priority(self._needed_shortcuts(node), node), node) for node in nodes]
+        heapify(heap)
+        while heap:
+            if edge_count > max_core_degree * len(heap):
+                break
+            priority, node = heappop(heap)
+            shortcuts = self._needed_shortcuts(node)
+            priority = self._priority(shortcuts, node)
+            if heap and priority > heap[0][0]:
+                heappush(heap, (priority, node))
+                continue
+            edge_count += self._contract(node, shortcuts)
+
+        self.core_start = len(self.order)
+        self.order.extend(node for priority, node in sorted(heap))
+
+    def _witness_search(self, src, skip, limit: float, targets: set) -> dict:
+        """
+        A limited Dijkstra from src in the remaining graph without the node skip, looking for paths to the targets
+        that are not longer than limit.
+        :return: the (upper bounds of the) distances from src that were found.
+        """
+        out_edges = self.out_edges
+        distances = {src: 0}
+        heap = [(0, src)]
+        remaining = set(targets)
+        settled = 0
+        while heap and settled < self.max_settled:
+            distance, node = heappop(heap)
+            if distance > distances[node]:
+                continue
+            if distance > limit:
+                break
+            settled += 1
+            remaining.discard(node)
+            if not remaining:
+                break
+            for neighbour, weight in out_edges[node].items():
+                if neighbour == skip:
+                    continue
+                new_distance = distance + weight
+                if new_distance < distances.get(neighbour, INFINITY):
+                    distances[neighbour] = new_distance
+                    heappush(heap, (new_distance, neighbour))
+        return distances
+
+    def _needed_shortcuts(self, node) -> list:
+        """
+        :return: a list of (src, dest, weight) of all the shortcuts needed if node is contracted now.
+        """
+        outs = self.out_edges[node]
+        shortcuts = []
+        if not outs:
+            return shortcuts
+        for src, in_weight in self.in_edges[node].items():
+            targets = {dest for dest in outs if dest != src}
+            if not targets:
+                continue
+            limit = in_weight + max(outs[dest] for dest in targets)
+            distances = self._witness_search(src, node, limit, targets)
+            for dest in targets:
+                weight = in_weight + outs[dest]
+                if distances.get(dest, INFINITY) > weight:
+                    shortcuts.append((src, dest, weight))
+        return shortcuts
+
+    def _priority(self, shortcuts: list, node) -> int:
+        removed = len(self.out_edges[node]) + len(self.in_edges[node])
+        return len(shortcuts) - removed + self.deleted_neighbours[node]
+
+    def _contract(self, node, shortcuts: list) -> int:
+        """
+        Removing node from the remaining graph and adding the shortcuts instead.
+        :return: the change in the number of edges in the remaining graph.
+        """
+        change = -len(self.out_edges[node]) - len(self.in_edges[node])
+        for src in self.in_edges[node]:
+            del self.out_edges[src][node]
+            self.deleted_neighbours[src] += 1
+        for dest in self.out_edges[node]:
+            del self.in_edges[dest][node]
+            self.deleted_neighbours[dest] += 1
+        del self.out_edges[node], self.in_edges[node]
+        for src, dest, weight in shortcuts:
+            if weight < self.out_edges[src].get(dest, INFINITY):
+                if dest not in self.out_edges[src]:
+                    change += 1
+                self.out_edges[src][dest] = weight
+                self.in_edges[dest][src] = weight
+                self.shortcuts[(src, dest)] = (weight, node)
+        self.order.append(node)
+        return change
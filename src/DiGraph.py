@@ -1,11 +1,19 @@
 from src.GraphInterface import GraphInteface
 import math
+import random
+import threading
+from itertools import repeat
+from array import array
+
+# The area that nodes get random positions in, when no node in the graph has a position
+DEFAULT_POS_BOUNDS = (35.18, 35.25, 32.10, 32.11)
 
 
 class GeoLocation:
     """
     This class was created in order to implement the location of each node with x,y,z coordinates.
     """
+    __slots__ = ("x", "y", "z")
 
     def __init__(self, x, y, z):
         self.x = x
@@ -26,7 +34,9 @@ class GeoLocation:
 class Node:
     """
     This class was created in order to implement a node in a directed weighted graph.
+    The class uses __slots__ instead of a __dict__ for every node, which saves most of the memory of a node.
     """
+    __slots__ = ("id", "info", "tag", "pos")
 
     def __init__(self, node_id, pos=None):
         self.id = node_id
@@ -38,10 +48,79 @@ class Node:
         return "{}".format(self.id)
 
 
+class PositionArray:
+    """
+    This class stores the positions of many nodes in one contiguous array of floats (x,y,z for every node), instead
+    of a tuple of 3 float objects per node. A node without a position is stored as NaNs.
+    The cells of removed nodes are kept in a free list and reused by the next nodes that are added.
+    """
+    __slots__ = ("values", "free")
+
+    def __init__(self):
+        self.values = array("d")
+        self.free = []
+
+    def add(self, pos) -> int:
+        """
+        Storing a new position.
+        :param pos: the (x,y,z) position, or None.
+        :return: the index of the position in the array.
+        """
+        if self.free:
+            index = self.free.pop()
+            self.set(index, pos)
+            return index
+        if pos is None:
+            self.values.extend((math.nan, math.nan, math.nan))
+        else:
+            self.values.extend((pos[0], pos[1], pos[2]))
+        return len(self.values) // 3 - 1
+
+    def get(self, index: int):
+        values = self.values
+        x = values[3 * index]
+        if math.isnan(x):
+            return None
+        return x, values[3 * index + 1], values[3 * index + 2]
+
+    def set(self, index: int, pos):
+        if pos is None:
+            pos = (math.nan, math.nan, math.nan)
+        self.values[3 * index:3 * index + 3] = array("d", (pos[0], pos[1], pos[2]))
+
+    def release(self, index: int):
+        self.set(index, None)
+        self.free.append(index)
+
+
+class PackedNode(Node):
+    """
+    A node of a DiGraph that was created with packed_positions=True, the position of the node is kept in the
+    PositionArray of the graph, and is only turned into a tuple when it is read.
+    """
+    __slots__ = ("positions", "index")
+
+    def __init__(self, node_id, positions: PositionArray, index: int):
+        self.positions = positions
+        self.index = index
+        self.id = node_id
+        self.info = ""
+        self.tag = 0
+
+    @property
+    def pos(self):
+        return self.positions.get(self.index)
+
+    @pos.setter
+    def pos(self, pos):
+        self.positions.set(self.index, pos)
+
+
 class Edge:
     """
     This class was created in order to implement an edge in a directed weighted graph.
     """
+    __slots__ = ("src", "dest", "weight")
 
     def __init__(self, src, dest, weight):
         self.src = src
@@ -52,18 +131,102 @@ class Edge:
         return "(src:" + str(self.src) + ", dest:" + str(self.dest) + ", weight:" + str(self.weight) + ")"
 
 
+def pos_bounds(nodes):
+    """
+    Finding the bounding box of the positions of nodes, in a single pass.
+    :param nodes: an iterable of nodes.
+    :return: a tuple of (x_min, x_max, y_min, y_max), or None if none of the nodes has a position.
+    """
+    x_min = y_min = math.inf
+    x_max = y_max = -math.inf
+    for node in nodes:
+        pos = node.pos
+        if pos is None:
+            continue
+        x, y = pos[0], pos[1]
+        if x < x_min:
+            x_min = x
+        if x > x_max:
+            x_max = x
+        if y < y_min:
+            y_min = y
+        if y > y_max:
+            y_max = y
+    if x_min > x_max:
+        return None
+    return x_min, x_max, y_min, y_max
+
+
+def assign_random_positions(nodes, bounds=None) -> int:
+    """
+    Giving a uniformly random position inside bounds to every node that doesn't have a position.
+    :param nodes: a collection of nodes, it is iterated twice.
+    :param bounds: the (x_min, x_max, y_min, y_max) area of the new positions, by default the bounding box of the
+    nodes that have a position (or DEFAULT_POS_BOUNDS if none of them has one).
+    :return: the number of nodes that were given a position.
+    """
+    missing = [node for node in nodes if node.pos is None]
+    if not missing:
+        return 0
+    if bounds is None:
+        bounds = pos_bounds(nodes) or DEFAULT_POS_BOUNDS
+    x_min, x_max, y_min, y_max = bounds
+    x_span, y_span = x_max - x_min, y_max - y_min
+    uniform = random.random
+    for node in missing:
+        node.pos = (x_min + x_span * uniform(), y_min + y_span * uniform(), 0)
+    return len(missing)
+
+
 class DiGraph(GraphInteface):
     """
     Using the previous classes, the DiGraph class is built to implement a directed weighted graph, mostly using dictionaries
     to store the values of different types of data needed in order to properly build the graph.
+    When packed_positions is True, the positions of the nodes are kept in one contiguous array of floats
+    (see PositionArray) instead of a tuple per node, which is useful for graphs with millions of nodes.
+    Objects that need to follow the changes of the graph (like DynamicSCC) can be added as listeners, and are notified
+    after every node or edge that is added or removed.
+    The graph keeps the bounding box of the positions of its nodes (see get_pos_bounds) up to date as nodes are added
+    and removed, positions that are changed directly on a node (node.pos = ...) instead of with set_node_pos are not
+    tracked.
+    snapshot() returns an immutable view of the current version of the graph that shares its dictionaries, once a
+    snapshot was taken the graph copies every dictionary (and node) before it changes it, see GraphSnapshot.
+    Every change, and taking a snapshot, holds the lock of the graph, so a snapshot never sees half of a change.
     """
 
-    def __init__(self):
+    def __init__(self, packed_positions: bool = False):
         self.NodesInGraph = {}
         self.NodesWithOutputEdges = {}
         self.NodesWithReceivingEdges = {}
         self.MC = 0
         self.EdgeCounter = 0
+        self.Positions = PositionArray() if packed_positions else None
+        self.Listeners = []
+        self.SCCIndex = None
+        self.Journal = None
+        # The token of the journal the graph was recovered from or recorded in (see GraphJournal)
+        self.JournalToken = None
+        self.PosBounds = [math.inf, -math.inf, math.inf, -math.inf]
+        self.PosBoundsValid = True
+        self.NodesWithoutPos = 0
+        self.Lock = threading.RLock()
+        # Copy-on-write state: Shared is True while the top level dictionaries belong to the last snapshot, and the
+        # Owned sets hold the nodes whose dictionaries (and Node objects) were created since then (None until the
+        # first snapshot is taken)
+        self.Shared = False
+        self.LastSnapshot = None
+        self.OwnedOut = None
+        self.OwnedIn = None
+        self.OwnedNodes = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["Lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.Lock = threading.RLock()
 
     def v_size(self):
         return len(self.NodesInGraph.keys())
@@ -110,18 +273,29 @@ class DiGraph(GraphInteface):
         :param weight: the weigh of the edge
         :return: (True/False) if the edge was successfully connected or not
         """
-        if (id1 not in self.NodesInGraph.keys()) or (id2 not in self.NodesInGraph.keys()):
-            return False
-        if id1 == id2:
-            return False
-        # If edge exists then we do nothing
-        if id2 in self.NodesWithOutputEdges[id1]:
-            return False
-        self.NodesWithOutputEdges[id1][id2] = weight
-        self.NodesWithReceivingEdges[id2][id1] = weight
-        self.MC += 1
-        self.EdgeCounter += 1
-        return True
+        with self.Lock:
+            if (id1 not in self.NodesInGraph.keys()) or (id2 not in self.NodesInGraph.keys()):
+                return False
+            if id1 == id2:
+                return False
+            # If edge exists then we do nothing
+            if id2 in self.NodesWithOutputEdges[id1]:
+                return False
+            if self.Journal is not None:
+                self.Journal.check_edge(id1, id2, weight)
+            if self.Shared:
+                self._unshare()
+            if self.OwnedOut is None:
+                self.NodesWithOutputEdges[id1][id2] = weight
+                self.NodesWithReceivingEdges[id2][id1] = weight
+            else:
+                self._out_edges(id1)[id2] = weight
+                self._in_edges(id2)[id1] = weight
+            self.MC += 1
+            self.EdgeCounter += 1
+            for listener in self.Listeners:
+                listener.edge_added(id1, id2, weight)
+            return True
 
     def add_node(self, node_id, pos: tuple = None):
         """
@@ -130,14 +304,175 @@ class DiGraph(GraphInteface):
         :param pos: the position of the node in graph
         :return: (True/False) if the node was successfully added to the graph or not.
         """
-        if node_id in self.NodesInGraph:
-            return False
-        node = Node(node_id, pos)
-        self.NodesInGraph[node_id] = node
-        self.NodesWithOutputEdges[node_id] = {}
-        self.NodesWithReceivingEdges[node_id] = {}
-        self.MC += 1
-        return True
+        with self.Lock:
+            if node_id in self.NodesInGraph:
+                return False
+            if self.Journal is not None:
+                self.Journal.check_node(node_id, pos)
+            if self.Shared:
+                self._unshare()
+            node = self._new_node(node_id, pos)
+            if pos is None:
+                self.NodesWithoutPos += 1
+            else:
+                self._extend_bounds(pos)
+            self.NodesInGraph[node_id] = node
+            self.NodesWithOutputEdges[node_id] = {}
+            self.NodesWithReceivingEdges[node_id] = {}
+            if self.OwnedNodes is not None:
+                self._own_new_nodes((node_id,))
+            self.MC += 1
+            for listener in self.Listeners:
+                listener.node_added(node_id, pos)
+            return True
+
+    def add_nodes_from(self, node_ids, positions=None):
+        """
+        Adding many nodes to the graph at once, which is much faster than calling add_node for every node.
+        The MC of the graph is updated once, by the number of nodes that were added.
+        :param node_ids: an iterable (list, range, NumPy array...) of the ids of the new nodes.
+        :param positions: an optional iterable of the positions of the new nodes, in the same order as node_ids (None
+        for a node without a position).
+        :return: the number of nodes that were added (ids that already exist in the graph are skipped).
+        :raise ValueError: if the number of positions is not the number of node ids (nothing is added).
+        """
+        if hasattr(node_ids, "tolist"):
+            node_ids = [int(node_id) for node_id in node_ids.tolist()]
+        if positions is None:
+            positions = repeat(None)
+        else:
+            if hasattr(positions, "tolist"):
+                positions = [tuple(pos) for pos in positions.tolist()]
+            elif not isinstance(positions, list):
+                positions = list(positions)
+            if not isinstance(node_ids, list):
+                node_ids = list(node_ids)
+            if len(node_ids) != len(positions):
+                raise ValueError("Got %d node ids and %d positions" % (len(node_ids), len(positions)))
+        items = zip(node_ids, positions)
+        with self.Lock:
+            if self.Journal is not None:
+                # All the new nodes are checked before the first one is added, so a rejected node changes nothing
+                items = list(items)
+                for node_id, pos in items:
+                    if node_id not in self.NodesInGraph:
+                        self.Journal.check_node(node_id, pos)
+            if self.Shared:
+                self._unshare()
+            # Taken after _unshare, which replaces the dictionaries the last snapshot holds
+            nodes, out_edges, in_edges = self.NodesInGraph, self.NodesWithOutputEdges, self.NodesWithReceivingEdges
+            new_node = Node if self.Positions is None else self._new_node
+            listeners = self.Listeners
+            new_ids = [] if self.OwnedNodes is not None else None
+            x_min, x_max, y_min, y_max = self.PosBounds
+            without_pos = 0
+            added = 0
+            for node_id, pos in items:
+                if node_id in nodes:
+                    continue
+                nodes[node_id] = new_node(node_id, pos)
+                if pos is None:
+                    without_pos += 1
+                else:
+                    x, y = pos[0], pos[1]
+                    if x < x_min:
+                        x_min = x
+                    if x > x_max:
+                        x_max = x
+                    if y < y_min:
+                        y_min = y
+                    if y > y_max:
+                        y_max = y
+                out_edges[node_id] = {}
+                in_edges[node_id] = {}
+                added += 1
+                if new_ids is not None:
+                    new_ids.append(node_id)
+                for listener in listeners:
+                    listener.node_added(node_id, pos)
+            if new_ids:
+                self._own_new_nodes(new_ids)
+            self.PosBounds = [x_min, x_max, y_min, y_max]
+            self.NodesWithoutPos += without_pos
+            self.MC += added
+            return added
+
+    def add_edges_from(self, edges):
+        """
+        Adding many edges to the graph at once, which is much faster than calling add_edge for every edge.
+        The MC and the edge counter of the graph are updated once, by the number of edges that were added.
+        :param edges: an iterable of (src, dest, weight) triples, or a NumPy array with 3 columns.
+        :return: the number of edges that were added (edges that add_edge would refuse are skipped).
+        """
+        if hasattr(edges, "tolist"):
+            edges = [(int(src), int(dest), weight) for src, dest, weight in edges.tolist()]
+        with self.Lock:
+            if self.Journal is not None:
+                # All the new edges are checked before the first one is added, so a rejected edge changes nothing
+                edges = list(edges)
+                nodes = self.NodesInGraph
+                for src, dest, weight in edges:
+                    if src != dest and src in nodes and dest in nodes:
+                        self.Journal.check_edge(src, dest, weight)
+            if self.Shared:
+                self._unshare()
+            # Taken after _unshare, which replaces the dictionaries the last snapshot holds, out_edges[src] is then
+            # always the current dictionary of src (_out_edges puts its copies in it)
+            nodes, out_edges, in_edges = self.NodesInGraph, self.NodesWithOutputEdges, self.NodesWithReceivingEdges
+            copy_on_write = self.OwnedOut is not None
+            listeners = self.Listeners
+            added = 0
+            for src, dest, weight in edges:
+                if src == dest or src not in nodes or dest not in nodes:
+                    continue
+                src_edges = out_edges[src]
+                if dest in src_edges:
+                    continue
+                if copy_on_write:
+                    src_edges = self._out_edges(src)
+                    self._in_edges(dest)[src] = weight
+                else:
+                    in_edges[dest][src] = weight
+                src_edges[dest] = weight
+                added += 1
+                for listener in listeners:
+                    listener.edge_added(src, dest, weight)
+            self.MC += added
+            self.EdgeCounter += added
+            return added
+
+    def remove_edges_from(self, edges):
+        """
+        Removing many edges from the graph at once.
+        The MC and the edge counter of the graph are updated once, by the number of edges that were removed.
+        :param edges: an iterable of (src, dest) pairs, or a NumPy array with 2 columns.
+        :return: the number of edges that were removed (edges that don't exist are skipped).
+        """
+        if hasattr(edges, "tolist"):
+            edges = [(int(src), int(dest)) for src, dest in edges.tolist()]
+        with self.Lock:
+            if self.Shared:
+                self._unshare()
+            out_edges, in_edges = self.NodesWithOutputEdges, self.NodesWithReceivingEdges
+            copy_on_write = self.OwnedOut is not None
+            listeners = self.Listeners
+            removed = 0
+            for src, dest in edges:
+                src_edges = out_edges.get(src)
+                if src_edges is None or dest not in src_edges:
+                    continue
+                if copy_on_write:
+                    del self._out_edges(src)[dest]
+                    del self._in_edges(dest)[src]
+                else:
+                    del src_edges[dest]
+                    del in_edges[dest][src]
+                removed += 1
+                for listener in listeners:
+                    listener.edge_removed(src, dest)
+            self.MC += removed
+            self.EdgeCounter -= removed
+            return removed
 
     def remove_node(self, node_id):
         """
@@ -145,22 +480,31 @@ class DiGraph(GraphInteface):
         :param node_id: the id of the node to remove from the graph.
         :return: (True/False) if the node was successfully removed or not.
         """
-        if node_id not in self.NodesInGraph:
-            return False
+        with self.Lock:
+            if node_id not in self.NodesInGraph:
+                return False
+            if self.Shared:
+                self._unshare()
 
-        for key in self.NodesWithOutputEdges[node_id]:
-            del self.NodesWithReceivingEdges[key][node_id]
-            self.EdgeCounter -= 1
-        del self.NodesWithOutputEdges[node_id]
+            for key in self.NodesWithOutputEdges[node_id]:
+                del self._in_edges(key)[node_id]
+                self.EdgeCounter -= 1
+            del self.NodesWithOutputEdges[node_id]
 
-        for key in self.NodesWithReceivingEdges[node_id]:
-            del self.NodesWithOutputEdges[key][node_id]
-            self.EdgeCounter -= 1
-        del self.NodesWithReceivingEdges[node_id]
+            for key in self.NodesWithReceivingEdges[node_id]:
+                del self._out_edges(key)[node_id]
+                self.EdgeCounter -= 1
+            del self.NodesWithReceivingEdges[node_id]
 
-        del self.NodesInGraph[node_id]
-        self.MC += 1
-        return True
+            self._forget_pos(self.NodesInGraph[node_id].pos)
+            # The position of a node that a snapshot may still hold is never reused
+            if self.Positions is not None and (self.OwnedNodes is None or node_id in self.OwnedNodes):
+                self.Positions.release(self.NodesInGraph[node_id].index)
+            del self.NodesInGraph[node_id]
+            self.MC += 1
+            for listener in self.Listeners:
+                listener.node_removed(node_id)
+            return True
 
     def remove_edge(self, node_id1, node_id2):
         """
@@ -169,15 +513,278 @@ class DiGraph(GraphInteface):
         :param node_id2: the destination node of the edge
         :return: (True/False) if the edge was successfully removed or not.
         """
-        if node_id1 not in self.NodesWithOutputEdges:
-            return False
-        elif node_id2 not in self.NodesWithOutputEdges[node_id1]:
-            return False
-        del self.NodesWithOutputEdges[node_id1][node_id2]
-        del self.NodesWithReceivingEdges[node_id2][node_id1]
-        self.MC += 1
-        self.EdgeCounter -= 1
-        return True
+        with self.Lock:
+            if node_id1 not in self.NodesWithOutputEdges:
+                return False
+            elif node_id2 not in self.NodesWithOutputEdges[node_id1]:
+                return False
+            if self.Shared:
+                self._unshare()
+            if self.OwnedOut is None:
+                del self.NodesWithOutputEdges[node_id1][node_id2]
+                del self.NodesWithReceivingEdges[node_id2][node_id1]
+            else:
+                del self._out_edges(node_id1)[node_id2]
+                del self._in_edges(node_id2)[node_id1]
+            self.MC += 1
+            self.EdgeCounter -= 1
+            for listener in self.Listeners:
+                listener.edge_removed(node_id1, node_id2)
+            return True
+
+    def set_node_pos(self, node_id, pos: tuple) -> bool:
+        """
+        Changing the position of a node, and updating the bounding box of the graph.
+        :param node_id: the id of the node.
+        :param pos: the new (x,y,z) position, or None.
+        :return: (True/False) if the position was successfully changed or not.
+        """
+        with self.Lock:
+            node = self.getNode(node_id)
+            if node is None:
+                return False
+            if self.Shared:
+                self._unshare()
+            self._forget_pos(node.pos)
+            self._own_node(node_id).pos = pos
+            if pos is None:
+                self.NodesWithoutPos += 1
+            else:
+                self._extend_bounds(pos)
+            return True
+
+    def get_pos_bounds(self):
+        """
+        Returning the bounding box of the positions of the nodes. The box is kept up to date as nodes are added, and is
+        only searched again after a node on its edge was removed (or moved with set_node_pos).
+        :return: a tuple of (x_min, x_max, y_min, y_max), or None if no node has a position.
+        """
+        if not self.PosBoundsValid:
+            bounds = pos_bounds(self.NodesInGraph.values())
+            self.PosBounds = [math.inf, -math.inf, math.inf, -math.inf] if bounds is None else list(bounds)
+            self.PosBoundsValid = True
+        x_min, x_max, y_min, y_max = self.PosBounds
+        if x_min > x_max:
+            return None
+        return x_min, x_max, y_min, y_max
+
+    def assign_missing_positions(self, bounds: tuple = None) -> int:
+        """
+        Giving a random position to every node that doesn't have one, in a single pass over the nodes.
+        :param bounds: the (x_min, x_max, y_min, y_max) area of the new positions, by default the bounding box of the
+        nodes that have a position (or DEFAULT_POS_BOUNDS if none of them has one).
+        :return: the number of nodes that were given a position.
+        """
+        if self.NodesWithoutPos == 0:
+            return 0
+        if bounds is None:
+            bounds = self.get_pos_bounds() or DEFAULT_POS_BOUNDS
+        with self.Lock:
+            if self.Shared:
+                self._unshare()
+            if self.OwnedNodes is not None:
+                for node_id in [node_id for node_id, node in self.NodesInGraph.items() if node.pos is None]:
+                    self._own_node(node_id)
+            assigned = assign_random_positions(self.NodesInGraph.values(), bounds)
+            self.NodesWithoutPos = 0
+            if assigned:
+                self.PosBoundsValid = False
+            return assigned
+
+    def _extend_bounds(self, pos):
+        bounds = self.PosBounds
+        x, y = pos[0], pos[1]
+        if x < bounds[0]:
+            bounds[0] = x
+        if x > bounds[1]:
+            bounds[1] = x
+        if y < bounds[2]:
+            bounds[2] = y
+        if y > bounds[3]:
+            bounds[3] = y
+
+    def _forget_pos(self, pos):
+        """
+        Updating the bookkeeping of the positions for a position that is removed from the graph.
+        """
+        if pos is None:
+            self.NodesWithoutPos -= 1
+            return
+        bounds = self.PosBounds
+        if pos[0] <= bounds[0] or pos[0] >= bounds[1] or pos[1] <= bounds[2] or pos[1] >= bounds[3]:
+            self.PosBoundsValid = False
+
+    def _new_node(self, node_id, pos):
+        if self.Positions is None:
+            return Node(node_id, pos)
+        return PackedNode(node_id, self.Positions, self.Positions.add(pos))
+
+    def add_listener(self, listener) -> None:
+        """
+        Adding an object that is notified of every change of the graph, right after the change is made.
+        The listener has to implement node_added(node_id, pos), node_removed(node_id), edge_added(src, dest, weight)
+        and edge_removed(src, dest). When a node is removed, only node_removed is called (not edge_removed for its
+        edges).
+        """
+        self.Listeners.append(listener)
+
+    def remove_listener(self, listener) -> None:
+        if listener in self.Listeners:
+            self.Listeners.remove(listener)
+
+    def enable_dynamic_scc(self):
+        """
+        Attaching an index of the strongly connected components to the graph, which is updated on every change of the
+        graph (see DynamicSCC), so GraphAlgo.connected_component doesn't have to search the whole graph after changes.
+        :return: the DynamicSCC index of the graph.
+        """
+        if self.SCCIndex is None:
+            from src.DynamicSCC import DynamicSCC
+            self.SCCIndex = DynamicSCC(self)
+            self.add_listener(self.SCCIndex)
+        return self.SCCIndex
+
+    def disable_dynamic_scc(self) -> None:
+        if self.SCCIndex is not None:
+            self.remove_listener(self.SCCIndex)
+            self.SCCIndex = None
+
+    def enable_journal(self, path: str, durability: str = "flush", compact_every: int = None):
+        """
+        Recording every change of the graph in a write-ahead journal next to a checkpoint of the graph (see
+        GraphJournal), so the graph can be rebuilt with DiGraph.recover(path) after a crash.
+        :param path: the path of the journal files, without an extension.
+        :param durability: "none", "flush" (the default) or "fsync", see GraphJournal.
+        :param compact_every: optional number of records, after which the journal is folded into a new checkpoint in
+        the background.
+        :return: the GraphJournal of the graph.
+        """
+        if self.Journal is None:
+            from src.GraphJournal import GraphJournal
+            GraphJournal(self, path, durability, compact_every)
+        return self.Journal
+
+    def disable_journal(self) -> None:
+        if self.Journal is not None:
+            self.Journal.close()
+
+    @classmethod
+    def recover(cls, path: str, packed_positions: bool = False):
+        """
+        Rebuilding a graph from the last checkpoint and the journal that were written by enable_journal.
+        :param path: the path of the journal files, without an extension.
+        :param packed_positions: see DiGraph.
+        :return: a new DiGraph, with the MC of the last recorded change.
+        """
+        from src.GraphJournal import recover
+        return recover(path, packed_positions)
+
+    def snapshot(self):
+        """
+        Creating an immutable view of the current version of the graph, in constant time.
+        The snapshot shares the dictionaries of the graph, and the graph copies a dictionary before it changes it from
+        now on: the top level dictionaries once on the first change after the snapshot, and the neighbours of a node
+        (or the node itself) the first time they change, so the cost of a snapshot is paid only for the parts of the
+        graph that change while it is used. Calling snapshot again before the graph changes returns the same view.
+        :return: a GraphSnapshot of the graph, its MC is the MC of the graph when it was taken.
+        """
+        with self.Lock:
+            # A snapshot that gave positions to its own copies of the nodes is not the same view anymore
+            if self.Shared and self.LastSnapshot is not None and self.LastSnapshot.NodesInGraph is self.NodesInGraph:
+                return self.LastSnapshot
+            from src.GraphSnapshot import GraphSnapshot
+            snapshot = GraphSnapshot(self.NodesInGraph, self.NodesWithOutputEdges, self.NodesWithReceivingEdges,
+                                     self.MC, self.EdgeCounter, tuple(self.PosBounds) if self.PosBoundsValid else None)
+            self.Shared = True
+            self.LastSnapshot = snapshot
+            return snapshot
+
+    def _unshare(self):
+        """
+        Starting a new version of the graph after a snapshot: the top level dictionaries are copied (the snapshot keeps
+        the old ones), and the Owned sets are emptied, since every dictionary of neighbours now belongs to the snapshot.
+        """
+        self.NodesInGraph = dict(self.NodesInGraph)
+        self.NodesWithOutputEdges = dict(self.NodesWithOutputEdges)
+        self.NodesWithReceivingEdges = dict(self.NodesWithReceivingEdges)
+        self.OwnedOut = set()
+        self.OwnedIn = set()
+        self.OwnedNodes = set()
+        self.Shared = False
+        self.LastSnapshot = None
+
+    def _out_edges(self, node_id) -> dict:
+        """
+        Returning the out-edges of a node for changing them, copying them first if a snapshot may hold them.
+        """
+        edges = self.NodesWithOutputEdges[node_id]
+        owned = self.OwnedOut
+        if owned is not None and node_id not in owned:
+            edges = dict(edges)
+            self.NodesWithOutputEdges[node_id] = edges
+            owned.add(node_id)
+        return edges
+
+    def _in_edges(self, node_id) -> dict:
+        """
+        Returning the in-edges of a node for changing them, copying them first if a snapshot may hold them.
+        """
+        edges = self.NodesWithReceivingEdges[node_id]
+        owned = self.OwnedIn
+        if owned is not None and node_id not in owned:
+            edges = dict(edges)
+            self.NodesWithReceivingEdges[node_id] = edges
+            owned.add(node_id)
+        return edges
+
+    def _own_node(self, node_id):
+        """
+        Returning a node for changing it, replacing it with a copy first if a snapshot may hold it.
+        """
+        node = self.NodesInGraph[node_id]
+        owned = self.OwnedNodes
+        if owned is None or node_id in owned:
+            return node
+        copy = self._new_node(node_id, node.pos)
+        copy.info, copy.tag = node.info, node.tag
+        self.NodesInGraph[node_id] = copy
+        owned.add(node_id)
+        return copy
+
+    def _own_new_nodes(self, node_ids) -> None:
+        # Nodes that were added since the last snapshot are not held by any snapshot, and are never copied
+        self.OwnedOut.update(node_ids)
+        self.OwnedIn.update(node_ids)
+        self.OwnedNodes.update(node_ids)
+
+    def freeze(self):
+        """
+        Creating an immutable compressed-sparse-row snapshot of the graph, which takes a fraction of the memory of
+        the nested dictionaries and can be used by GraphAlgo for read-only algorithms.
+        Later changes to this graph are not reflected in the snapshot.
+        :return: a CSRGraph of the current state of the graph.
+        """
+        from src.CSRGraph import CSRGraph
+        return CSRGraph.from_graph(self)
+
+    def to_scipy_sparse(self):
+        """
+        Converting the graph into a SciPy sparse matrix (NumPy and SciPy have to be installed).
+        :return: a tuple of the (n x n) csr_matrix of the edge weights and a list of the node ids of its rows.
+        """
+        from src.ScipyBackend import to_scipy_sparse
+        return to_scipy_sparse(self)
+
+    @classmethod
+    def from_scipy_sparse(cls, matrix, node_ids=None):
+        """
+        Building a graph out of a square SciPy sparse matrix, every stored entry (except the diagonal) becomes an edge.
+        :param matrix: the adjacency matrix of the graph.
+        :param node_ids: the node ids of the rows of the matrix, 0..n-1 by default.
+        :return: a new DiGraph.
+        """
+        from src.ScipyBackend import from_scipy_sparse
+        return from_scipy_sparse(matrix, node_ids)
 
     def __str__(self):
         result = ""
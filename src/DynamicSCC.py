@@ -0,0 +1,211 @@
+from src.GraphInterface import GraphInteface
+from src.ConnectedComponents import strongly_connected_components
+
+"""
+An index of the strongly connected components of a DiGraph that is kept up to date while the graph changes.
+The index is attached to a graph with DiGraph.enable_dynamic_scc, and the graph reports every change to it.
+"""
+
+
+class DynamicSCC:
+    """
+    This class keeps the strongly connected components of a graph, and updates them on every change of the graph
+    instead of finding them all again:
+    - The components are kept in a topological order of the condensed graph (an edge between two components always
+      goes forward in the order). An edge that is added forward in the order can't close a cycle, so nothing changes.
+      Otherwise, only the components between the two ends of the edge in the order are searched (Pearce-Kelly): the
+      components found on a new cycle are merged, and the rest of the searched components are reordered.
+    - Removing an edge inside a component only splits the component if the source of the edge can't reach its
+      destination anymore. Tarjan's algorithm is then run on the nodes of that component alone.
+    """
+
+    def __init__(self, graph: GraphInteface):
+        self.graph = graph
+        self.component_of = {}
+        self.members = {}
+        self.order = []
+        self.position = {}
+        self.sorted_members = {}
+        self.next_id = 0
+        # Tarjan's algorithm finds the components in a reversed topological order
+        components = strongly_connected_components(graph)
+        components.reverse()
+        for component in components:
+            self.order.append(self._new_component(component))
+        self._renumber()
+
+    def _new_component(self, nodes) -> int:
+        component_id = self.next_id
+        self.next_id += 1
+        self.members[component_id] = set(nodes)
+        component_of = self.component_of
+        for node in nodes:
+            component_of[node] = component_id
+        return component_id
+
+    def _drop_component(self, component_id: int) -> int:
+        del self.members[component_id]
+        self.sorted_members.pop(component_id, None)
+        return self.position.pop(component_id)
+
+    def _renumber(self) -> None:
+        """
+        Removing the holes left in the order by merged components, and updating the position of every component.
+        """
+        self.order = [component_id for component_id in self.order if component_id is not None]
+        self.position = {component_id: index for index, component_id in enumerate(self.order)}
+
+    def component(self, node_id) -> list:
+        """
+        :return: a sorted list of the nodes in the component of node_id, or an empty list if it isn't in the graph.
+        """
+        component_id = self.component_of.get(node_id)
+        if component_id is None:
+            return []
+        members = self.sorted_members.get(component_id)
+        if members is None:
+            members = sorted(self.members[component_id])
+            self.sorted_members[component_id] = members
+        return list(members)
+
+    def components(self) -> list:
+        """
+        :return: a sorted list of all the components, every component is a sorted list of node ids.
+        """
+        return sorted(self.component(next(iter(members))) for members in self.members.values())
+
+    def node_added(self, node_id, pos) -> None:
+        component_id = self._new_component((node_id,))
+        self.position[component_id] = len(self.order)
+        self.order.append(component_id)
+
+    def node_removed(self, node_id) -> None:
+        component_id = self.component_of.pop(node_id)
+        members = self.members[component_id]
+        members.discard(node_id)
+        if members:
+            self._split(component_id)
+        else:
+            self.order[self._drop_component(component_id)] = None
+
+    def edge_added(self, src, dest, weight) -> None:
+        src_component, dest_component = self.component_of[src], self.component_of[dest]
+        if src_component == dest_component:
+            return
+        if self.position[src_component] < self.position[dest_component]:
+            return
+        self._reorder(src, dest)
+
+    def edge_removed(self, src, dest) -> None:
+        component_id = self.component_of[src]
+        if component_id != self.component_of[dest]:
+            return
+        if not self._reaches(src, dest, self.members[component_id]):
+            self._split(component_id)
+
+    def _reaches(self, src, dest, nodes: set) -> bool:
+        """
+        A bidirectional breadth first search between src and dest inside nodes, every step expands the smaller of the
+        two frontiers, so a path is usually found after visiting a small part of a large component.
+        """
+        out_edges, in_edges = self.graph.all_out_edges_of_node, self.graph.all_in_edges_of_node
+        forward, backward = {src}, {dest}
+        forward_frontier, backward_frontier = [src], [dest]
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, visited, other, edges = forward_frontier, forward, backward, out_edges
+            else:
+                frontier, visited, other, edges = backward_frontier, backward, forward, in_edges
+            next_frontier = []
+            for node in frontier:
+                for neighbour in edges(node):
+                    if neighbour in other:
+                        return True
+                    if neighbour not in visited and neighbour in nodes:
+                        visited.add(neighbour)
+                        next_frontier.append(neighbour)
+            if frontier is forward_frontier:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+        return False
+
+    def _split(self, component_id: int) -> None:
+        """
+        Finding the components of the nodes of a component that might not be strongly connected anymore.
+        """
+        self.sorted_members.pop(component_id, None)
+        pieces = strongly_connected_components(self.graph, self.members[component_id])
+        if len(pieces) == 1:
+            return
+        index = self._drop_component(component_id)
+        pieces.reverse()
+        self.order[index:index + 1] = [self._new_component(piece) for piece in pieces]
+        self._renumber()
+
+    def _search(self, start, edges, component_of, position, lower: int, upper: int) -> set:
+        """
+        A depth first search from start, only going through components with a position between lower and upper.
+        :return: the set of the components that were found.
+        """
+        visited = {start}
+        stack = [start]
+        found = {component_of[start]}
+        while stack:
+            for neighbour in edges(stack.pop()):
+                if neighbour in visited:
+                    continue
+                component_id = component_of[neighbour]
+                if lower <= position[component_id] <= upper:
+                    visited.add(neighbour)
+                    stack.append(neighbour)
+                    found.add(component_id)
+        return found
+
+    def _reorder(self, src, dest) -> None:
+        """
+        Handling a new edge src->dest that goes backward in the order of the components.
+        The components that dest reaches and the components that reach src are found, both only between the two
+        components in the order. The components in both sets are on a new cycle and are merged into one, then the
+        components that reach src (and the merged one) are moved before the components that dest reaches, reusing
+        the same positions.
+        """
+        component_of, position = self.component_of, self.position
+        lower, upper = position[component_of[dest]], position[component_of[src]]
+        forward = self._search(dest, self.graph.all_out_edges_of_node, component_of, position, lower, upper)
+        backward = self._search(src, self.graph.all_in_edges_of_node, component_of, position, lower, upper)
+        slots = sorted(position[component_id] for component_id in forward | backward)
+        cycle = forward & backward
+        by_position = position.__getitem__
+        before = sorted(backward - cycle, key=by_position)
+        after = sorted(forward - cycle, key=by_position)
+        # The components before the new edge only move backward and the ones after it only move forward, so their
+        # edges to the rest of the components stay in order. The merged component takes the first free position.
+        new_order = before + [None] * (len(slots) - len(before) - len(after)) + after
+        if cycle:
+            new_order[len(before)] = self._merge(cycle)
+
+        order = self.order
+        for index, component_id in zip(slots, new_order):
+            order[index] = component_id
+            if component_id is not None:
+                position[component_id] = index
+
+    def _merge(self, component_ids: set) -> int:
+        """
+        Merging components into the largest one of them.
+        :return: the id of the merged component.
+        """
+        largest = max(component_ids, key=lambda component_id: len(self.members[component_id]))
+        members = self.members[largest]
+        self.sorted_members.pop(largest, None)
+        component_of = self.component_of
+        for component_id in component_ids:
+            if component_id == largest:
+                continue
+            nodes = self.members[component_id]
+            for node in nodes:
+                component_of[node] = largest
+            members.update(nodes)
+            self._drop_component(component_id)
+        return largest
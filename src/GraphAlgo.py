@@ -1,278 +1,754 @@
 from typing import List
 from src import GraphInterface
 from src.GraphAlgoInterface import GraphAlgoInterface
-from src.DiGraph import DiGraph
-from queue import PriorityQueue
-import json
-import math
+from src.DiGraph import DiGraph, DEFAULT_POS_BOUNDS, pos_bounds, assign_random_positions
+from src.ShortestPath import dijkstra, dijkstra_to_targets, astar, bidirectional_dijkstra, euclidean_scale, \
+    euclidean_potential, build_path, distance_row, init_distance_worker, distance_worker_row, INFINITY
+from src.CSRGraph import CSRGraph
+from src.GraphSnapshot import GraphSnapshot
+from src.ConnectedComponents import strongly_connected_components
+from src.JsonStream import JsonStreamReader, write_graph_json
+from src.PathCache import PathCache
+from src.ContractionHierarchy import ContractionHierarchy
+from src.Landmarks import Landmarks
+from src.BinaryGraph import write_binary, read_binary
+from src.AlgoStats import AlgoStats, Timer
+from array import array
+import os
+import gzip
+import io
 import random
-import matplotlib.pyplot as plt
-from matplotlib.patches import ConnectionPatch
+import time
 
-INFINITY = math.inf
+LOAD_BATCH_SIZE = 1 << 16
+PLOT_MAX_EDGES = 20000
+# The number of sources times the size (nodes + edges) of the graph above which distance_matrix uses processes by
+# default, about 2 seconds of searching, below it starting the processes and sending them the graph costs more
+PARALLEL_MIN_WORK = 2000000
+# The gzip level of compressed JSON files, 9 (the default of gzip) is almost 3 times slower for 1% smaller files
+JSON_GZIP_LEVEL = 6
 
 
 class GraphAlgo(GraphAlgoInterface):
     """
     This class was created in order to implement a number of different algorithms in a directed weighted graph.
+    The algorithms never use the nodes (tag/info) to store their state, everything is kept in per-call structures,
+    so a single graph can be shared between several GraphAlgo objects and threads that query it at the same time
+    (as long as it isn't changed during the queries).
+    With backend="scipy", shortest_path, single_source_distances, distance_matrix and the connected components are
+    computed by scipy.sparse.csgraph over a sparse matrix of the graph (see ScipyBackend) when SciPy is installed.
     """
-    def __init__(self, graph=DiGraph()):
+    def __init__(self, graph=None, backend: str = "python"):
+        if graph is None:
+            graph = DiGraph()
         self.graph = graph
+        self.backend = "python"
+        self._scipy = None
+        self.set_backend(backend)
+        self._components = None
+        self._path_cache = None
+        self._scale = None
+        self._hierarchy = None
+        self._landmarks = None
+        self._stats = None
+        self._stats_callback = None
 
     def get_graph(self) -> GraphInterface:
         return self.graph
 
+    def set_backend(self, backend: str) -> bool:
+        """
+        Choosing the implementation of the algorithms, "python" (the default) or "scipy".
+        The scipy backend converts the graph into a sparse matrix once for every version of the graph, which pays off
+        for jobs that run many full searches. If SciPy isn't installed the python backend is kept.
+        :param backend: "python" or "scipy".
+        :return: (True/False) if the backend was set.
+        """
+        if backend not in ("python", "scipy"):
+            raise ValueError("Unknown backend: %s" % backend)
+        if backend == "scipy":
+            from src import ScipyBackend
+            if not ScipyBackend.is_available():
+                print("SciPy is not installed, using the python backend")
+                return False
+        self.backend = backend
+        return True
+
+    def _scipy_graph(self):
+        """
+        Returning the sparse matrix of the graph, it is built once for every version of the graph.
+        """
+        cached = self._scipy
+        if cached is None or not cached.is_valid(self.graph):
+            from src.ScipyBackend import ScipyGraph
+            cached = ScipyGraph(self.graph)
+            self._scipy = cached
+        return cached
+
+    def enable_stats(self, callback=None) -> AlgoStats:
+        """
+        Turning on the instrumentation of shortest_path, connected_component(s) and load_from_json: the number of
+        nodes popped and settled, stale heap entries, edges scanned and relaxed, and the wall time of every call and
+        of the phases of loading (parsing the file and inserting into the graph).
+        When it's off (the default), the algorithms don't collect anything.
+        :param callback: optional function that is called after every instrumented call with the name of the
+        operation and an AlgoStats of that call alone.
+        :return: the AlgoStats that sums all the calls, counters are named "<operation>.<counter>".
+        """
+        self._stats = AlgoStats()
+        self._stats_callback = callback
+        return self._stats
+
+    def disable_stats(self) -> None:
+        self._stats = None
+        self._stats_callback = None
+
+    def get_stats(self) -> dict:
+        """
+        :return: the counters and times collected since enable_stats was called, or None if it isn't enabled.
+        """
+        if self._stats is None:
+            return None
+        return self._stats.as_dict()
+
+    def _instrumented(self, operation: str, func, *args):
+        """
+        Calling func(*args, stats), where stats is None when the instrumentation is off, or a new AlgoStats for this
+        call that is then added to the stats of the GraphAlgo.
+        """
+        if self._stats is None:
+            return func(*args, None)
+        stats = AlgoStats()
+        start = time.perf_counter()
+        try:
+            return func(*args, stats)
+        finally:
+            stats.add_time("total", time.perf_counter() - start)
+            self._stats.merge(operation, stats)
+            if self._stats_callback is not None:
+                self._stats_callback(operation, stats)
+
+    def enable_path_cache(self, max_size: int = 128) -> None:
+        """
+        Turning on a cache of shortest path trees (see PathCache): the first query from a source runs a full Dijkstra
+        from it, and the following queries from the same source are answered from the saved tree, until the graph is
+        changed (its MC changes) or the tree is evicted by newer sources.
+        :param max_size: the maximum number of source trees to keep.
+        """
+        self._path_cache = PathCache(max_size)
+
+    def disable_path_cache(self) -> None:
+        self._path_cache = None
+
+    def path_cache_stats(self) -> dict:
+        """
+        :return: the hits/misses/evictions/invalidations counters of the path cache, or None if it isn't enabled.
+        """
+        if self._path_cache is None:
+            return None
+        return self._path_cache.stats()
+
+    def _source_tree(self, src, stats=None):
+        """
+        Returning the full shortest path tree of src, from the path cache if possible.
+        :return: a tuple of the distances and parents dictionaries.
+        """
+        cache = self._path_cache
+        graph = self.graph
+        tree = cache.get(graph, src)
+        if tree is None:
+            mc = graph.get_mc()
+            tree = dijkstra(graph, src, stats=stats)
+            cache.put(graph, mc, src, tree)
+        elif stats is not None:
+            stats.add("path_cache_hits")
+        return tree
+
     def load_from_json(self, file_name: str) -> bool:
         """
         Loading a graph that was saved as in a JSON file format.
+        The file is parsed as a stream (see JsonStream), and the nodes and edges are added to the graph in batches
+        using the bulk methods of DiGraph, so the whole JSON object tree is never held in memory. Edges that appear
+        in the file before the nodes are kept in compact arrays until all the nodes were added (or in lists, if the
+        node ids are not 64 bit integers).
+        A file that was compressed with gzip (see save_to_json) is decompressed while it is read.
         :param file_name: the name of the file that we want to load
         :return: (True/False) if the graph was successfully loaded from the file or not.
         """
+        return self._instrumented("load_from_json", self._load_from_json, file_name)
+
+    def _load_from_json(self, file_name: str, stats) -> bool:
+        start = time.perf_counter()
         self.graph = DiGraph()
         try:
-            with open(file_name) as file:
-                JSONgraph = json.load(file)
-                for node in JSONgraph["Nodes"]:
-                    if "pos" in node:
-                        pos = tuple(map(float, str(node["pos"]).split(",")))
-                        self.graph.add_node(node["id"], pos)
-                    else:
-                        x = random.uniform(35.1800000000, 35.2500000000)
-                        y = random.uniform(32.1000000000, 32.1100000000)
-                        pos = (x, y, 0)
-                        self.graph.add_node(node["id"], pos)
+            with self._open_json(file_name) as file:
+                reader = JsonStreamReader(file)
+                node_ids, node_positions = list(), list()
+                edge_src, edge_dest, edge_weights = array("q"), array("q"), list()
+                nodes_done = False
+                for key, batch in reader.batches():
+                    if key == "Edges":
+                        edge_src = self._extend_ids(edge_src, [item["src"] for item in batch])
+                        edge_dest = self._extend_ids(edge_dest, [item["dest"] for item in batch])
+                        edge_weights.extend([item["w"] for item in batch])
+                        if nodes_done and len(edge_weights) >= LOAD_BATCH_SIZE:
+                            self._add_loaded_edges(edge_src, edge_dest, edge_weights, stats)
+                    elif key == "Nodes":
+                        node_ids.extend([item["id"] for item in batch])
+                        node_positions.extend([self._json_node_pos(item) for item in batch])
+                        if len(node_ids) >= LOAD_BATCH_SIZE:
+                            self._add_loaded_nodes(node_ids, node_positions, stats)
+                    if not nodes_done and key != "Nodes" and "Nodes" in reader.keys:
+                        nodes_done = True
+                        self._add_loaded_nodes(node_ids, node_positions, stats)
 
-                for edge in JSONgraph["Edges"]:
-                    src = edge["src"]
-                    weight = edge["w"]
-                    dest = edge["dest"]
-                    self.graph.add_edge(src, dest, weight)
-
-                file.close()
+                if "Nodes" not in reader.keys or "Edges" not in reader.keys:
+                    raise KeyError("Nodes" if "Nodes" not in reader.keys else "Edges")
+                self._add_loaded_nodes(node_ids, node_positions, stats)
+                self._add_loaded_edges(edge_src, edge_dest, edge_weights, stats)
 
         except Exception as e:
             print(e)
             return False
 
+        if stats is not None:
+            # Everything that wasn't inserting into the graph was reading and parsing the file
+            stats.add_time("parse", time.perf_counter() - start - stats.times.get("insert", 0.0))
+            stats.add("nodes", self.graph.v_size())
+            stats.add("edges", self.graph.e_size())
         return True
 
-    def save_to_json(self, file_name: str) -> bool:
+    @staticmethod
+    def _open_json(file_name: str):
+        with open(file_name, "rb") as file:
+            compressed = file.read(2) == b"\x1f\x8b"
+        return gzip.open(file_name, "rt") if compressed else open(file_name)
+
+    @staticmethod
+    def _extend_ids(ids, new_ids: list):
+        """
+        Adding node ids to an array of 64 bit integers, the array is replaced by a list when an id doesn't fit in it.
+        :return: the array or list that holds the ids.
+        """
+        if type(ids) is array:
+            size = len(ids)
+            try:
+                ids.extend(new_ids)
+                return ids
+            except (TypeError, OverflowError):
+                # Dropping the ids that were added before the one that failed
+                ids = ids[:size].tolist()
+        ids.extend(new_ids)
+        return ids
+
+    @staticmethod
+    def _json_node_pos(node: dict) -> tuple:
+        if node.get("pos") is not None:
+            return tuple(map(float, str(node["pos"]).split(",")))
+        x = random.uniform(35.1800000000, 35.2500000000)
+        y = random.uniform(32.1000000000, 32.1100000000)
+        return x, y, 0
+
+    def _add_loaded_nodes(self, node_ids, node_positions, stats=None):
+        if stats is not None:
+            with Timer(stats, "insert"):
+                self.graph.add_nodes_from(node_ids, node_positions)
+            stats.add("batches")
+        else:
+            self.graph.add_nodes_from(node_ids, node_positions)
+        del node_ids[:], node_positions[:]
+
+    def _add_loaded_edges(self, edge_src, edge_dest, edge_weights, stats=None):
+        if stats is not None:
+            with Timer(stats, "insert"):
+                self.graph.add_edges_from(zip(edge_src, edge_dest, edge_weights))
+            stats.add("batches")
+        else:
+            self.graph.add_edges_from(zip(edge_src, edge_dest, edge_weights))
+        del edge_src[:], edge_dest[:], edge_weights[:]
+
+    def save_to_json(self, file_name: str, compress: bool = None, sort: bool = False) -> bool:
         """
         Saving a graph in a JSON file format.
+        The nodes and edges are formatted and written to the file in chunks (see JsonStream.write_graph_json), without
+        building the whole JSON object in memory first, the file is the same as json.dump of that object.
         :param file_name: the name of the file that we want to save it as.
+        :param compress: (True/False) if the file should be compressed with gzip, by default only if file_name ends
+        with ".gz".
+        :param sort: (True/False) if the nodes and edges should be written in the order of their ids, so the same graph
+        is always saved as the same file (also when it is compressed).
         :return: (True/False) if the graph was successfully saved in the file or not.
         """
-        JSONgraph = dict()
-        JSONgraph["Edges"] = list()
-        JSONgraph["Nodes"] = list()
+        if compress is None:
+            compress = file_name.endswith(".gz")
         try:
-            with open(file_name, "w") as file:
-                graph_nodes = self.graph.get_all_v()
-                for node_key, node in graph_nodes.items():
-                    if node.pos is not None:
-                        pos = str(node.pos[0])+', '+str(node.pos[1])+', '+str(node.pos[2])
-                    else:
-                        pos = None
-                    JSONgraph["Nodes"].append({"pos": pos, "id": node_key})
-                    for neighbour_key, weight in self.graph.all_out_edges_of_node(node_key).items():
-                        JSONgraph["Edges"].append({"src": node_key, "w": weight, "dest": neighbour_key})
-
-                json.dump(JSONgraph, file, default=lambda x: x.__dict__)
-                file.close()
+            if compress:
+                # No file name or time in the gzip header, so a sorted file is the same every time it is saved
+                with open(file_name, "wb") as raw, \
+                        gzip.GzipFile(filename="", mode="wb", compresslevel=JSON_GZIP_LEVEL, fileobj=raw,
+                                      mtime=0 if sort else None) as compressed, \
+                        io.TextIOWrapper(compressed, encoding="ascii") as file:
+                    write_graph_json(self.graph, file, sort)
+            else:
+                with open(file_name, "w") as file:
+                    write_graph_json(self.graph, file, sort)
 
         except IOError:
             return False
 
         return True
 
-    def shortest_path(self, id1: int, id2: int) -> (float, list):
+    def save_binary(self, file_name: str) -> bool:
+        """
+        Saving a graph in a compact binary file format (see BinaryGraph), which can be loaded without any parsing.
+        note: the weights of the edges are saved as floats.
+        :param file_name: the name of the file that we want to save it as.
+        :return: (True/False) if the graph was successfully saved in the file or not.
+        """
+        try:
+            write_binary(self.graph, file_name)
+        except (IOError, TypeError, OverflowError) as e:
+            print(e)
+            return False
+        return True
+
+    def load_binary(self, file_name: str) -> bool:
+        """
+        Loading a graph that was saved using save_binary.
+        The file is memory mapped, so even a huge graph is available for queries right away, the loaded graph is a
+        read-only CSRGraph (changing it does nothing).
+        :param file_name: the name of the file that we want to load
+        :return: (True/False) if the graph was successfully loaded from the file or not.
+        """
+        try:
+            self.graph = read_binary(file_name)
+        except (IOError, ValueError) as e:
+            print(e)
+            return False
+        return True
+
+    def shortest_path(self, id1: int, id2: int, heuristic: str = None, bidirectional: bool = False) -> (float, list):
         """
         Using Dijkstra's algorithm, this function calculates the shortest path between two nodes in a directed weighted
         graph. The main idea is to start from the source node and check all of it's neighbours and the total weight of
         the traversal to him. Each time a node is visited, the total distance of the traversal to him is added to the
         distance list that contains each node and the distance from the source node to that node. Once the traversal
         reaches the destination node, the traversal stops.
+        The search itself is done by ShortestPath.dijkstra, which only touches the nodes it reaches, so a short query
+        costs the same on a small graph and on a huge one.
+        With heuristic="euclidean" the A* algorithm is used instead, directing the search towards id2 using the
+        positions of the nodes. This is only possible when every edge weighs at least a fixed factor times the
+        distance between its nodes (see ShortestPath.euclidean_scale), otherwise Dijkstra's algorithm is used.
+        With heuristic="landmarks" A* is directed by the lower bounds of the landmarks that were built (or loaded) for
+        the current version of the graph (see Landmarks), which works on graphs without meaningful positions too.
+        Without valid landmarks Dijkstra's algorithm is used.
+        With bidirectional=True (and no heuristic), the search runs from both ends at once, forward from id1 and
+        backward from id2 using the in-edges of the nodes (see ShortestPath.bidirectional_dijkstra).
+        If a contraction hierarchy was built (or loaded) for the current version of the graph, the default query is
+        answered using the hierarchy instead. Otherwise, with the scipy backend the default query is answered by
+        scipy.sparse.csgraph.dijkstra.
         :param id1: the source node of the path
         :param id2: the destination node of the path
+        :param heuristic: None for Dijkstra's algorithm, or "euclidean"/"landmarks" for A*.
+        :param bidirectional: (True/False) if a bidirectional search should be used.
         :return: a tuple containing the sum weight of the path,
         and a list of all the nodes that were visited during the traversal between the two nodes.
         """
+        return self._instrumented("shortest_path", self._shortest_path, id1, id2, heuristic, bidirectional)
+
+    def _shortest_path(self, id1, id2, heuristic, bidirectional, stats) -> (float, list):
+        if heuristic not in (None, "euclidean", "landmarks"):
+            raise ValueError("Unknown heuristic: %s" % heuristic)
         if id1 == id2:
             return 0, [id1]
 
-        parentsList = dict()
-        distanceList = dict()
-        visitedNodes = set()
-        graph_nodes = self.graph.get_all_v()
-
-        if (id1 not in graph_nodes) or (id1 not in graph_nodes):
+        if (self.graph.getNode(id1) is None) or (self.graph.getNode(id2) is None):
             return INFINITY, []
 
-        queue = PriorityQueue()
-        queue.put((0, graph_nodes[id1].id))
-        for node in graph_nodes.keys():
-            distanceList[node] = INFINITY
-
-        parentsList[id1] = id1
-        distanceList[id1] = 0
-        while not queue.empty():
-            currentNode = queue.get()[1]
-            visitedNodes.add(currentNode)
-            if currentNode == id2:
-                break
-            for key, weight in self.graph.all_out_edges_of_node(currentNode).items():
-                nextNode = graph_nodes[key].id
-                distance = weight + distanceList[currentNode]
-                if distance < distanceList[nextNode]:
-                    distanceList[nextNode] = distance
-                    parentsList[nextNode] = currentNode
-                    queue.put((distanceList[nextNode], nextNode))
+        hierarchy = self._hierarchy
+        if heuristic is None and not bidirectional and hierarchy is not None and hierarchy.is_valid(self.graph):
+            if stats is not None:
+                stats.add("hierarchy_queries")
+            return hierarchy.shortest_path(id1, id2)
+        if heuristic is None and not bidirectional and self.backend == "scipy":
+            if stats is not None:
+                stats.add("scipy_queries")
+            return self._scipy_graph().shortest_path(id1, id2)
+
+        potential = None
+        if heuristic == "euclidean":
+            scale = self._euclidean_scale()
+            if scale > 0:
+                potential = euclidean_potential(self.graph, id2, scale)
+        elif heuristic == "landmarks" and self._landmarks is not None and self._landmarks.is_valid(self.graph):
+            if stats is not None:
+                stats.add("landmark_queries")
+            if self._landmarks.unreachable(id1, id2):
+                return INFINITY, []
+            potential = self._landmarks.potential(id1, id2)
+
+        if bidirectional and potential is None:
+            return bidirectional_dijkstra(self.graph, id1, id2, stats)
+        if potential is not None:
+            distanceList, parentsList = astar(self.graph, id1, id2, potential, stats)
+        elif self._path_cache is not None:
+            distanceList, parentsList = self._source_tree(id1, stats)
+        else:
+            distanceList, parentsList = dijkstra(self.graph, id1, id2, stats)
 
         # If traversal between id1 and id2 is not possible => therefore not connected:
-        if distanceList[id2] == INFINITY:
+        if id2 not in distanceList:
             return INFINITY, []
 
-        path = []
-        BackTrackPath = id2
-        while distanceList[BackTrackPath] != 0:
-            path.append(graph_nodes[BackTrackPath].id)
-            if parentsList[BackTrackPath] != BackTrackPath:
-                BackTrackPath = parentsList[BackTrackPath]
-        path.append(BackTrackPath)
-        path = path[::-1]
-        return distanceList[id2], path
+        return distanceList[id2], build_path(parentsList, id1, id2)
+
+    def shortest_paths(self, pairs, paths: bool = True) -> list:
+        """
+        Answering many shortest path queries at once.
+        The pairs are grouped by their source, and a single Dijkstra search runs from every source until all of its
+        destinations are settled (see ShortestPath.dijkstra_to_targets), instead of a separate search for every pair.
+        With the path cache the full trees of the sources are taken from (and saved in) the cache, with the scipy
+        backend all the sources are searched by scipy.sparse.csgraph.dijkstra, and if a contraction hierarchy is valid
+        for the graph every pair is answered using the hierarchy.
+        :param pairs: an iterable of (src, dest) pairs of nodes.
+        :param paths: when False only the distances are returned, and no path is built.
+        :return: a list with a result for every pair, in the order of the pairs: a (distance, path) tuple like the one
+        shortest_path returns, or only the distance when paths is False (INFINITY if dest can't be reached).
+        """
+        return self._instrumented("shortest_paths", self._shortest_paths, pairs, paths)
+
+    def _shortest_paths(self, pairs, paths, stats) -> list:
+        pairs = list(pairs)
+        graph = self.graph
+        groups = {}
+        for src, dest in pairs:
+            if src != dest and graph.getNode(src) is not None and graph.getNode(dest) is not None:
+                groups.setdefault(src, set()).add(dest)
+        if stats is not None:
+            stats.add("pairs", len(pairs))
+            stats.add("sources", len(groups))
+
+        results = {}
+        hierarchy = self._hierarchy
+        if hierarchy is not None and hierarchy.is_valid(graph):
+            for src, targets in groups.items():
+                for dest in targets:
+                    if paths:
+                        results[(src, dest)] = hierarchy.shortest_path(src, dest)
+                    else:
+                        results[(src, dest)] = (hierarchy.distance(src, dest), None)
+        elif self.backend == "scipy":
+            results = self._scipy_graph().shortest_paths(groups, paths)
+        else:
+            for src, targets in groups.items():
+                if self._path_cache is not None:
+                    distances, parents = self._source_tree(src, stats)
+                else:
+                    distances, parents = dijkstra_to_targets(graph, src, targets, stats)
+                for dest in targets:
+                    if dest in distances:
+                        results[(src, dest)] = (distances[dest], build_path(parents, src, dest) if paths else None)
+
+        answers = []
+        for src, dest in pairs:
+            if src == dest:
+                answer = (0, [src])
+            else:
+                answer = results.get((src, dest), (INFINITY, []))
+            answers.append(answer if paths else answer[0])
+        return answers
+
+    def _euclidean_scale(self) -> float:
+        """
+        Returning the euclidean heuristic factor of the graph, it is calculated once for every version of the graph.
+        """
+        graph = self.graph
+        mc = graph.get_mc()
+        cached = self._scale
+        if cached is None or cached[0] is not graph or cached[1] != mc:
+            cached = (graph, mc, euclidean_scale(graph))
+            self._scale = cached
+        return cached[2]
+
+    def build_contraction_hierarchy(self, max_settled: int = 50, max_core_degree: float = 16) -> ContractionHierarchy:
+        """
+        Preprocessing the graph into a contraction hierarchy (see ContractionHierarchy), which is then used by
+        shortest_path until the graph is changed. This pays off on graphs with a natural hierarchy (like road
+        networks), where a query only searches a tiny part of the graph. On random graphs most of the graph stays in
+        the core of the hierarchy, and a bidirectional search is usually faster.
+        :param max_settled: the limit of every witness search during the preprocessing.
+        :param max_core_degree: the average degree at which the contraction stops and the rest of the graph becomes
+        the core.
+        :return: the new hierarchy.
+        """
+        self._hierarchy = ContractionHierarchy.build(self.graph, max_settled, max_core_degree)
+        return self._hierarchy
+
+    def save_contraction_hierarchy(self, file_name: str) -> bool:
+        """
+        Saving the contraction hierarchy of the graph in a JSON file (to be kept alongside the graph file).
+        :param file_name: the name of the file that we want to save it as.
+        :return: (True/False) if the hierarchy was successfully saved in the file or not.
+        """
+        if self._hierarchy is None or not self._hierarchy.is_valid(self.graph):
+            return False
+        try:
+            self._hierarchy.save(file_name)
+        except IOError:
+            return False
+        return True
+
+    def load_contraction_hierarchy(self, file_name: str) -> bool:
+        """
+        Loading a contraction hierarchy that was saved for this graph using save_contraction_hierarchy.
+        :param file_name: the name of the hierarchy file.
+        :return: (True/False) if the hierarchy was successfully loaded from the file or not.
+        """
+        try:
+            self._hierarchy = ContractionHierarchy.load(self.graph, file_name)
+        except (IOError, ValueError, KeyError) as e:
+            print(e)
+            return False
+        return True
+
+    def build_landmarks(self, k: int = 16) -> Landmarks:
+        """
+        Choosing k landmarks and calculating the distances between them and all the nodes (see Landmarks), which are
+        then used by shortest_path(heuristic="landmarks") until the graph is changed.
+        :param k: the number of landmarks, more landmarks give better bounds but take more time and memory to build.
+        :return: the new landmarks.
+        """
+        self._landmarks = Landmarks.build(self.graph, k)
+        return self._landmarks
+
+    def save_landmarks(self, file_name: str) -> bool:
+        """
+        Saving the landmarks of the graph and their distance tables in a JSON file (to be kept alongside the graph
+        file).
+        :param file_name: the name of the file that we want to save it as.
+        :return: (True/False) if the landmarks were successfully saved in the file or not.
+        """
+        if self._landmarks is None or not self._landmarks.is_valid(self.graph):
+            return False
+        try:
+            self._landmarks.save(file_name)
+        except IOError:
+            return False
+        return True
+
+    def load_landmarks(self, file_name: str) -> bool:
+        """
+        Loading landmarks that were saved for this graph using save_landmarks.
+        :param file_name: the name of the landmarks file.
+        :return: (True/False) if the landmarks were successfully loaded from the file or not.
+        """
+        try:
+            self._landmarks = Landmarks.load(self.graph, file_name)
+        except (IOError, ValueError, KeyError) as e:
+            print(e)
+            return False
+        return True
+
+    def single_source_distances(self, src: int) -> dict:
+        """
+        Calculating the distances from src to all the nodes in the graph, using a single run of Dijkstra's algorithm.
+        :param src: the source node.
+        :return: a dictionary of (node, distance from src) for every node that can be reached from src.
+        """
+        if self.graph.getNode(src) is None:
+            return {}
+        if self.backend == "scipy":
+            return self._scipy_graph().distances(src)
+        if self._path_cache is not None:
+            return dict(self._source_tree(src)[0])
+        return dijkstra(self.graph, src)[0]
+
+    def distance_matrix(self, sources: list, targets: list = None, workers: int = None, as_array: bool = False):
+        """
+        Calculating the distances between every source and every target, using one full Dijkstra per source.
+        With the scipy backend all the rows are calculated by a single call to scipy.sparse.csgraph.dijkstra.
+        When more than one worker is used, the sources are split between processes of a ProcessPoolExecutor, and every
+        process gets one read-only snapshot of the graph (sent once, when the process starts). The snapshot keeps the
+        node ids and the weights as they are, so the rows are the same as with a single worker.
+        :param sources: the list of source nodes (the rows of the matrix).
+        :param targets: the list of target nodes (the columns of the matrix), all the nodes in the graph by default.
+        :param workers: the number of processes to use (1 means no processes at all), by default os.cpu_count() when
+        there are enough sources for the size of the graph (see PARALLEL_MIN_WORK) and 1 otherwise.
+        :param as_array: when True the matrix is returned as a NumPy array (NumPy has to be installed).
+        :return: a list of rows, row i holds the distances from sources[i] to the targets (INFINITY if not reachable).
+        """
+        sources = list(sources)
+        targets = list(self.graph.get_all_v().keys()) if targets is None else list(targets)
+        for node in sources:
+            if self.graph.getNode(node) is None:
+                raise KeyError(node)
+        if workers is None:
+            work = len(sources) * (self.graph.v_size() + self.graph.e_size())
+            workers = (os.cpu_count() or 1) if work >= PARALLEL_MIN_WORK else 1
+        workers = min(workers, len(sources))
+
+        if self.backend == "scipy":
+            return self._scipy_graph().distance_matrix(sources, targets, as_array)
+        if workers <= 1:
+            matrix = [distance_row(self.graph, src, targets) for src in sources]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            snapshot = self.graph.snapshot() if isinstance(self.graph, DiGraph) else self.graph
+            if isinstance(snapshot, GraphSnapshot):
+                # The searches only follow the out-edges, the in-edges aren't sent to the processes
+                snapshot = GraphSnapshot(snapshot.NodesInGraph, snapshot.NodesWithOutputEdges, {}, snapshot.MC,
+                                         snapshot.EdgeCounter)
+            chunk_size = max(1, len(sources) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_distance_worker,
+                                     initargs=(snapshot, targets)) as pool:
+                matrix = list(pool.map(distance_worker_row, sources, chunksize=chunk_size))
+
+        if as_array:
+            import numpy as np
+            return np.array(matrix, dtype=float).reshape(len(sources), len(targets))
+        return matrix
 
     def connected_component(self, id1: int) -> list:
         """
         This function finds all the strongly connected nodes to id1.
         A node is strongly connected to id1 if it's possible to traverse between him and id1 and also the other way
         around, given that this is a directed weighted graph.
-        The main idea of the algorithm is to start from id1 to the direction of the edges that go out *from* id1 and
-        "paint" every node, the second part is to go in reverse - in the direction of the edges that go *to* id1 and
-        every node that is already painted is in id1's connected component list.
+        The components of the whole graph are found once (see connected_components) and kept in an index of
+        node -> component, so after the first call this is just a lookup, until the graph is changed.
+        If the graph has a dynamic index of its components (see DiGraph.enable_dynamic_scc), the index is used and
+        the components are never searched again.
         :param id1: The key of the node
         :return: A list of all the strongly connected nodes to id1
         """
-        if id1 not in self.get_graph().NodesInGraph:
+        return self._instrumented("connected_component", self._connected_component, id1)
+
+    def _connected_component(self, id1, stats) -> list:
+        if self.graph.getNode(id1) is None:
             return []
-        if len(self.get_graph().NodesWithOutputEdges[id1]) == 0 or len(
-                self.get_graph().NodesWithReceivingEdges[id1]) == 0:
-            ans = [id1]
-            return ans
-        for initialize in self.get_graph().NodesInGraph.values():
-            initialize.tag = 0
-        node = self.get_graph().getNode(id1)
-        MyList = list()
-        node.tag = 1
-        MyList.append(node)
-        while len(MyList) != 0:
-            tempNode = MyList.pop()
-            for ni in self.get_graph().NodesWithOutputEdges[tempNode.id].keys():
-                tempNode2 = self.get_graph().getNode(ni)
-                if tempNode2.tag == 0 and "checked" not in tempNode2.info:
-                    tempNode2.tag = 1
-                    MyList.append(tempNode2)
-
-        ans = [node.id]
-        node.tag = 2
-        MyList.append(node)
-        while len(MyList) != 0:
-            tempNode = MyList.pop()
-            for Ni in self.get_graph().NodesWithReceivingEdges[tempNode.id].keys():
-                reversNi = self.get_graph().getNode(Ni)
-
-                if reversNi.tag == 1 and "checked" not in reversNi.info:
-                    reversNi.tag = 2
-                    # reversNi.info = "checked"
-                    ans.append(reversNi.id)
-                    MyList.append(reversNi)
-
-        return sorted(ans)
+        index = getattr(self.graph, "SCCIndex", None)
+        if index is not None:
+            if stats is not None:
+                stats.add("dynamic_index_queries")
+            return index.component(id1)
+        component_of = self._component_index(stats)[2]
+        return list(component_of[id1])
 
     def connected_components(self) -> List[list]:
         """
         This function finds all the possible strongly connected components in the graph.
         A graph is said to be strongly connected if every vertex is reachable from every other vertex.
-        The main idea of the algorithm is to check every node and find his connected component by using the function above
+        The components are found with an iterative version of Tarjan's algorithm in O(V+E), and are kept until the
+        graph is changed (checked using the MC of the graph).
         note: every node can be only in ONE connected component.
         :return: A list with nested lists that contain all the strongly connected components in the graph.
         """
-        for node in self.get_graph().NodesInGraph.values():
-            node.info = "un"
+        return self._instrumented("connected_components", self._connected_components)
 
-        ans = []
-        for node in self.get_graph().NodesInGraph.values():
-            if "checked" in node.info:
-                continue
-            else:
-                ans.append(self.connected_component(node.id))
-            for node1 in self.get_graph().NodesInGraph.values():
-                if node1.tag == 2:
-                    node1.info = "checked"
-        for i in ans:
-            for checked in i:
-                (self.get_graph().getNode(checked)).info = ""
-        return sorted(ans)
+    def _connected_components(self, stats) -> List[list]:
+        index = getattr(self.graph, "SCCIndex", None)
+        if index is not None:
+            if stats is not None:
+                stats.add("dynamic_index_queries")
+            return index.components()
+        components = self._component_index(stats)[3]
+        return [list(component) for component in components]
 
-    def plot_graph(self, ax=None) -> None:
+    def _component_index(self, stats=None):
+        """
+        Returning the cached components of the graph, or finding them again if the graph was replaced or changed.
+        :return: a tuple of (graph, mc, dictionary of node -> sorted component, sorted list of all the components).
+        """
+        graph = self.graph
+        mc = graph.get_mc()
+        cached = self._components
+        if cached is not None and cached[0] is graph and cached[1] == mc:
+            if stats is not None:
+                stats.add("cache_hits")
+            return cached
+        if self.backend == "scipy":
+            components = self._scipy_graph().connected_components()
+        else:
+            components = sorted(sorted(component) for component in strongly_connected_components(graph, stats=stats))
+        component_of = dict()
+        for component in components:
+            for node in component:
+                component_of[node] = component
+        cached = (graph, mc, component_of, components)
+        self._components = cached
+        return cached
+
+    def plot_graph(self, ax=None, max_edges: int = PLOT_MAX_EDGES) -> None:
         """
         Using the matplotlib library, this function plots a directed weighted graph in order to properly
         visualize a representation of the graph.
-        To plot the edges and show the arrows we used the ConnectionPatch class within matplotlib.
+        All the edges are drawn as one quiver (arrows) and all the nodes as one scatter, instead of an artist per
+        edge, so large graphs can be plotted. Above max_edges edges only an even sample of max_edges edges is drawn
+        (see GraphPlotter.draw_graph). Nodes without a position are given a random one.
+        :param ax: the matplotlib axes to draw on, when it's not given a new figure is created and shown.
+        :param max_edges: the maximum number of edges to draw, 0 or None to always draw all of them.
         :return: None - just opens up the pop up window containing the graph visualization.
         """
-        x = self.get_all_node_pos()[0]
-        y = self.get_all_node_pos()[1]
-        fig, ax = plt.subplots(1, 1, figsize=(8, 7))
-        coordsA, coordsB = "data", "data"
-        for src_node in self.graph.get_all_v().values():
-            if src_node.pos is None:
-                src_node.pos = self.generate_random_pos()
-            for j in self.graph.all_out_edges_of_node(src_node.id):
-                dest_node = self.graph.getNode(j)
-                xy1 = (src_node.pos[0], src_node.pos[1])
-                xy2 = (dest_node.pos[0], dest_node.pos[1])
-                ConPatch = ConnectionPatch(xy1, xy2, coordsA, coordsB, arrowstyle="->", shrinkA=5, shrinkB=5, fc="w")
-                ax.add_artist(ConPatch)
-                ax.plot(x, y, "o")
-        plt.title("Graph Representation:")
-        plt.xlabel("X position of node")
-        plt.ylabel("Y position of node")
-        extra_space = 0.05
-        if (self.get_node_pos_limits()[0]-self.get_node_pos_limits()[1]) <= 0.5:
-            extra_space = 0.0008
-        plt.xlim(self.get_node_pos_limits()[1]-extra_space, self.get_node_pos_limits()[0]+extra_space)
-        plt.ylim(self.get_node_pos_limits()[3]-extra_space, self.get_node_pos_limits()[2]+extra_space)
-        plt.tight_layout()
-        plt.show()
+        from src import GraphPlotter
+        self.assign_missing_positions()
+        GraphPlotter.show_graph(self.graph, ax, max_edges)
+
+    def render_to_file(self, path: str, dpi: int = 100, size: tuple = (8, 7), max_edges: int = PLOT_MAX_EDGES) -> bool:
+        """
+        Drawing the graph (like plot_graph) straight into an image file, using matplotlib's Agg renderer without
+        pyplot, so no window is opened. Nodes without a position are given a random one.
+        :param path: the path of the image, its extension sets the format (png, svg, pdf...).
+        :param dpi: the resolution of the image, in dots per inch.
+        :param size: the (width, height) of the image in inches.
+        :param max_edges: the maximum number of edges to draw, 0 or None to always draw all of them.
+        :return: (True/False) if the image was successfully saved or not.
+        """
+        from src import GraphPlotter
+        self.assign_missing_positions()
+        try:
+            GraphPlotter.render_to_file(self.graph, path, dpi, size, max_edges)
+        except (IOError, ValueError) as e:
+            print(e)
+            return False
+        return True
 
     def get_node_pos_limits(self):
         """
         Getting the limits of the X/Y axis using the position of all the nodes in graph.
-        :return: the maximum and minimum X/Y values from all the node positions in the graph.
-        """
-        x_positions, y_positions = list(), list()
-        for node in self.graph.get_all_v().values():
-            if node.pos is None:
-                x = random.uniform(35.1800000000, 35.2500000000)
-                y = random.uniform(32.1000000000, 32.1100000000)
-                node.pos = (x, y, 0)
-            x_positions.append(node.pos[0])
-            y_positions.append(node.pos[1])
-        return max(x_positions), min(x_positions), max(y_positions), min(y_positions)
+        Nodes without a position are given a random one first (see assign_missing_positions).
+        :return: the maximum and minimum X/Y values from all the node positions in the graph, or None if the graph is
+        empty.
+        """
+        self.assign_missing_positions()
+        if isinstance(self.graph, (DiGraph, GraphSnapshot)):
+            bounds = self.graph.get_pos_bounds()
+        else:
+            bounds = pos_bounds(self.graph.get_all_v().values())
+        if bounds is None:
+            return None
+        x_min, x_max, y_min, y_max = bounds
+        return x_max, x_min, y_max, y_min
 
     def get_all_node_pos(self):
         """
         Getting the positions of all the nodes in the graph.
+        Nodes without a position are given a random one first (see assign_missing_positions).
         :return: two lists, containing the X positions of all the nodes, and the Y positions of all the nodes.
         """
-        x_positions, y_positions = list(), list()
-        for node in self.graph.get_all_v().values():
-            if node.pos is None:
-                node.pos = self.generate_random_pos()
-            x_positions.append(node.pos[0])
-            y_positions.append(node.pos[1])
-        return x_positions, y_positions
+        self.assign_missing_positions()
+        nodes = self.graph.get_all_v().values()
+        return [node.pos[0] for node in nodes], [node.pos[1] for node in nodes]
+
+    def assign_missing_positions(self) -> int:
+        """
+        Giving every node that does not have a position/geolocation a random position, inside the limits of the rest
+        of the nodes in the graph, in a single pass over the nodes.
+        The nodes of a snapshot are shared with its graph, so a snapshot gets new nodes instead (see
+        GraphSnapshot.assign_missing_positions).
+        :return: the number of nodes that were given a position.
+        """
+        if isinstance(self.graph, (DiGraph, GraphSnapshot)):
+            return self.graph.assign_missing_positions()
+        return assign_random_positions(self.graph.get_all_v().values())
 
     def generate_random_pos(self):
         """
@@ -280,8 +756,11 @@ class GraphAlgo(GraphAlgoInterface):
         for him using the random library, and the minimum/maximum limits from the rest of the nodes in the graph.
         :return: a random position in the graph
         """
-        x_max, x_min, y_max, y_min = self.get_node_pos_limits()[0], self.get_node_pos_limits()[1],\
-                                     self.get_node_pos_limits()[2], self.get_node_pos_limits()[3]
+        if isinstance(self.graph, (DiGraph, GraphSnapshot)):
+            bounds = self.graph.get_pos_bounds()
+        else:
+            bounds = pos_bounds(self.graph.get_all_v().values())
+        x_min, x_max, y_min, y_max = bounds or DEFAULT_POS_BOUNDS
         x = random.uniform(x_min, x_max)
         y = random.uniform(y_min, y_max)
         z = 0
@@ -0,0 +1,369 @@
+from src.DiGraph import DiGraph
+from src.BinaryGraph import write_binary, read_binary
+import math
+import os
+import struct
+import threading
+import zlib
+
+"""
+A write-ahead journal for DiGraph, so a big graph that changes all the time doesn't have to be saved again after
+every change, and the changes since the last save are not lost on a crash.
+The state of the graph is kept in two kinds of files next to each other:
+
+    <path>.checkpoint     the graph at some MC, in the binary format of BinaryGraph
+    <path>.journal        every change since the checkpoint, one binary record per change
+
+The journal starts with a header of (magic, version, the MC of its first change - 1, a random token). The graph keeps
+the token of the journal it was recovered from or recorded in (DiGraph.JournalToken), and a new journal continues an
+existing one only if the tokens match, so a different graph that happens to have the same MC never appends to it.
+A record is (type: uint8, MC: int64, payload, CRC32 of everything before it), the payload of every type is:
+
+    node added      node id: int64, x, y, z: float64 (NaN for a node without a position)
+    node removed    node id: int64
+    edge added      src, dest: int64, weight: float64
+    edge removed    src, dest: int64
+
+Recovering loads the checkpoint and replays the records whose MC is above the MC of the checkpoint. A record that
+was only partly written when the process crashed fails its CRC, and the replay stops before it.
+Compacting folds the journal into a new checkpoint: a snapshot of the graph is taken, the journal is renamed to
+<path>.journal.old and a new journal is started, and the checkpoint is written from the snapshot in a background
+thread while the graph keeps changing. <path>.journal.old is deleted once the new checkpoint is in place, until then
+recovering replays both journals.
+note: node ids are saved as 64 bit integers and weights as floats, and positions that are changed after a node was
+added (set_node_pos, assign_missing_positions) are only saved by the next checkpoint.
+"""
+
+MAGIC = b"DWJOURN\x00"
+VERSION = 2
+HEADER = struct.Struct("<8sIq16s")
+NODE_ADDED, NODE_REMOVED, EDGE_ADDED, EDGE_REMOVED = 1, 2, 3, 4
+RECORDS = {NODE_ADDED: struct.Struct("<Bqqddd"), NODE_REMOVED: struct.Struct("<Bqq"),
+           EDGE_ADDED: struct.Struct("<Bqqqd"), EDGE_REMOVED: struct.Struct("<Bqqq")}
+CRC = struct.Struct("<I")
+# With durability="none" the records are written to the file in chunks of this size
+BUFFER_SIZE = 1 << 16
+DURABILITY = ("none", "flush", "fsync")
+
+
+class GraphJournal:
+    """
+    This class records every change of a DiGraph in the journal files of a path, as a listener of the graph.
+    Creating it attaches it to the graph: if the graph was recovered from (or recorded in) the journal of the path,
+    and the journal ends exactly at the MC of the graph, new records are appended to it, otherwise a new checkpoint of
+    the graph is written and a new journal is started.
+    The graph checks every change with check_node/check_edge before making it, since a change that was made can't be
+    taken back if its record can't be written (e.g. a node id that is not an integer), and the graph and the journal
+    would then disagree about the MC of every later change.
+    """
+
+    def __init__(self, graph: DiGraph, path: str, durability: str = "flush", compact_every: int = None):
+        """
+        :param graph: the graph to record the changes of.
+        :param path: the path of the files, without the .checkpoint/.journal extensions.
+        :param durability: "none" to write the records in big chunks (a crash loses the changes that weren't written
+        yet), "flush" to write every record to the operating system right away (nothing is lost when the process
+        crashes) or "fsync" to also force every record to the disk (nothing is lost when the machine crashes).
+        :param compact_every: optional number of records, after which the journal is compacted in the background.
+        """
+        if durability not in DURABILITY:
+            raise ValueError("Unknown durability: %s" % durability)
+        self.graph = graph
+        self.path = path
+        self.checkpoint_file = path + ".checkpoint"
+        self.journal_file = path + ".journal"
+        self.old_journal_file = path + ".journal.old"
+        self.durability = durability
+        self.compact_every = compact_every
+        self.buffer = bytearray()
+        self.file = None
+        self.mc = 0
+        self.records = 0
+        # The number of records in the journal, after which the next compaction starts
+        self.next_compaction = compact_every
+        self.compaction = None
+        with graph.Lock:
+            if graph.Journal is not None:
+                raise ValueError("The graph already has a journal")
+            end = None
+            if os.path.exists(self.checkpoint_file) and not os.path.exists(self.old_journal_file):
+                end = _journal_end(self.journal_file)
+            if end is not None and end[0] == graph.get_mc() and end[3] == graph.JournalToken:
+                self.file = open(self.journal_file, "r+b", buffering=0)
+                # Cutting off a record that was only partly written before a crash
+                self.file.truncate(end[1])
+                self.file.seek(end[1])
+                self.records = end[2]
+                self.mc = end[0]
+            else:
+                snapshot = graph.snapshot()
+                _write_checkpoint(snapshot, self.checkpoint_file)
+                self._start_journal(snapshot.get_mc())
+                if os.path.exists(self.old_journal_file):
+                    os.remove(self.old_journal_file)
+            graph.add_listener(self)
+            graph.Journal = self
+
+    def _start_journal(self, mc: int) -> None:
+        token = os.urandom(16)
+        self.file = open(self.journal_file, "wb", buffering=0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, mc, token))
+        self._sync()
+        self.mc = mc
+        self.records = 0
+        self.graph.JournalToken = token
+
+    def check_node(self, node_id, pos) -> None:
+        """
+        Checking that adding a node can be recorded, before the graph adds it.
+        :raise ValueError: if the node id is not a 64 bit integer, or the position is not 3 numbers.
+        """
+        try:
+            _node_record(0, node_id, pos)
+        except (struct.error, OverflowError, TypeError, IndexError) as e:
+            raise ValueError("Can't record the node %r with the position %r in the journal: %s" % (node_id, pos, e))
+
+    def check_edge(self, src, dest, weight) -> None:
+        """
+        Checking that adding an edge can be recorded, before the graph adds it.
+        :raise ValueError: if the ids are not 64 bit integers, or the weight is not a number.
+        """
+        try:
+            RECORDS[EDGE_ADDED].pack(EDGE_ADDED, 0, src, dest, weight)
+        except (struct.error, OverflowError) as e:
+            raise ValueError("Can't record the edge (%r, %r, %r) in the journal: %s" % (src, dest, weight, e))
+
+    def node_added(self, node_id, pos):
+        self._append(_node_record(self.mc + 1, node_id, pos))
+
+    def node_removed(self, node_id):
+        # A removed node (or edge) was found in the graph, so its ids are equal to the integer ids it was added with
+        # (e.g. 1.0 finds the node 1)
+        self._append(RECORDS[NODE_REMOVED].pack(NODE_REMOVED, self.mc + 1, int(node_id)))
+
+    def edge_added(self, src, dest, weight):
+        self._append(RECORDS[EDGE_ADDED].pack(EDGE_ADDED, self.mc + 1, src, dest, weight))
+
+    def edge_removed(self, src, dest):
+        self._append(RECORDS[EDGE_REMOVED].pack(EDGE_REMOVED, self.mc + 1, int(src), int(dest)))
+
+    def _append(self, record: bytes) -> None:
+        # Every change of the graph increments its MC by one, and is reported to the listeners exactly once
+        self.mc += 1
+        self.records += 1
+        buffer = self.buffer
+        buffer += record
+        buffer += CRC.pack(zlib.crc32(record))
+        if self.durability != "none" or len(buffer) >= BUFFER_SIZE:
+            self._write()
+        if self.compact_every is not None and self.records >= self.next_compaction and self.compaction is None:
+            # The graph is in the middle of a change, the compaction thread takes its snapshot after the change
+            self._start_compaction()
+
+    def _write(self) -> None:
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.buffer.clear()
+        self._sync()
+
+    def _sync(self) -> None:
+        if self.durability == "fsync":
+            os.fsync(self.file.fileno())
+
+    def flush(self) -> None:
+        """
+        Writing the buffered records to the file (only needed with durability="none").
+        """
+        with self.graph.Lock:
+            self._write()
+
+    def compact(self, wait: bool = False):
+        """
+        Folding the journal into a new checkpoint, in a background thread. The graph is only locked for taking a
+        snapshot and switching to a new journal, the checkpoint is written from the snapshot while the graph keeps
+        changing.
+        :param wait: (True/False) if the call should return only after the new checkpoint was written.
+        :return: the thread of the compaction.
+        """
+        with self.graph.Lock:
+            thread = self.compaction or self._start_compaction()
+        if wait:
+            thread.join()
+        return thread
+
+    def _start_compaction(self) -> threading.Thread:
+        self.compaction = threading.Thread(target=self._compact, daemon=True)
+        self.compaction.start()
+        return self.compaction
+
+    def _compact(self) -> None:
+        try:
+            with self.graph.Lock:
+                if self.file is None:
+                    return
+                snapshot = self.graph.snapshot()
+                self._write()
+                # The old journal of a compaction that failed holds records that are in no checkpoint yet, so it is
+                # kept (with the current journal) until the new checkpoint includes them
+                if not os.path.exists(self.old_journal_file):
+                    self.file.close()
+                    os.replace(self.journal_file, self.old_journal_file)
+                    self._start_journal(snapshot.get_mc())
+                if self.compact_every is not None:
+                    # Without a new journal the records keep counting, the next compaction waits for compact_every
+                    # more of them instead of starting after every change
+                    self.next_compaction = self.records + self.compact_every
+            _write_checkpoint(snapshot, self.checkpoint_file)
+            os.remove(self.old_journal_file)
+        except (IOError, OSError) as e:
+            # The old journal is kept, and is replayed by recover until a compaction succeeds
+            print(e)
+        finally:
+            self.compaction = None
+
+    def close(self) -> None:
+        """
+        Writing the buffered records, detaching the journal from the graph and closing the file.
+        """
+        compaction = self.compaction
+        if compaction is not None:
+            compaction.join()
+        with self.graph.Lock:
+            self.graph.remove_listener(self)
+            if self.graph.Journal is self:
+                self.graph.Journal = None
+            if self.file is not None:
+                self._write()
+                self.file.close()
+                self.file = None
+
+
+def recover(path: str, packed_positions: bool = False) -> DiGraph:
+    """
+    Building the graph of a path from its last checkpoint and journals.
+    :param path: the path of the files, without the .checkpoint/.journal extensions.
+    :param packed_positions: passed on to the new DiGraph.
+    :return: a new DiGraph, with the MC of the last change that was recorded.
+    """
+    graph = DiGraph(packed_positions)
+    checkpoint_file = path + ".checkpoint"
+    if os.path.exists(checkpoint_file):
+        checkpoint = read_binary(checkpoint_file)
+        graph.add_nodes_from(checkpoint.NodeIds, [checkpoint._pos(i) for i in range(checkpoint.v_size())])
+        ids, offsets, targets, weights = checkpoint.NodeIds, checkpoint.OutOffsets, checkpoint.OutTargets, \
+            checkpoint.OutWeights
+        graph.add_edges_from((ids[i], ids[targets[j]], weights[j])
+                             for i in range(len(ids)) for j in range(offsets[i], offsets[i + 1]))
+        graph.MC = checkpoint.get_mc()
+    for journal_file in (path + ".journal.old", path + ".journal"):
+        if os.path.exists(journal_file):
+            replay(graph, journal_file)
+    header = _journal_header(path + ".journal")
+    if header is not None:
+        # The replay stopped at the end of the journal, so the graph continues it
+        graph.JournalToken = header[1]
+    return graph
+
+
+def replay(graph: DiGraph, journal_file: str) -> int:
+    """
+    Applying the records of a journal to a graph, records that are already included in the graph (their MC is not
+    above the MC of the graph) are skipped.
+    :param graph: the graph to change.
+    :param journal_file: the journal file.
+    :return: the number of records that were applied.
+    """
+    applied = 0
+    for kind, mc, values in _read_records(journal_file):
+        if mc <= graph.get_mc():
+            continue
+        if mc != graph.get_mc() + 1:
+            raise ValueError("%s doesn't continue the graph, its next change is %d and the graph is at %d" %
+                             (journal_file, mc, graph.get_mc()))
+        if kind == NODE_ADDED:
+            node_id, x, y, z = values
+            graph.add_node(node_id, None if math.isnan(x) else (x, y, z))
+        elif kind == NODE_REMOVED:
+            graph.remove_node(values[0])
+        elif kind == EDGE_ADDED:
+            graph.add_edge(*values)
+        else:
+            graph.remove_edge(*values)
+        if graph.get_mc() != mc:
+            raise ValueError("The change %d of %s can't be applied to the graph" % (mc, journal_file))
+        applied += 1
+    return applied
+
+
+def _node_record(mc: int, node_id, pos) -> bytes:
+    x, y, z = (math.nan, math.nan, math.nan) if pos is None else (pos[0], pos[1], pos[2])
+    return RECORDS[NODE_ADDED].pack(NODE_ADDED, mc, node_id, x, y, z)
+
+
+def _read_records(journal_file: str):
+    """
+    Reading the records of a journal, until its end or until the first record that is incomplete or damaged.
+    :return: a generator of (type, MC, payload values) tuples, the generator returns the offset where the records end.
+    """
+    with open(journal_file, "rb") as file:
+        data = file.read()
+    if len(data) < HEADER.size or HEADER.unpack_from(data, 0)[:2] != (MAGIC, VERSION):
+        raise ValueError("%s is not a graph journal" % journal_file)
+    offset = HEADER.size
+    while offset < len(data):
+        record = RECORDS.get(data[offset])
+        if record is None or offset + record.size + CRC.size > len(data):
+            break
+        end = offset + record.size
+        if CRC.unpack_from(data, end)[0] != zlib.crc32(data[offset:end]):
+            break
+        values = record.unpack_from(data, offset)
+        yield values[0], values[1], values[2:]
+        offset = end + CRC.size
+    return offset
+
+
+def _journal_header(journal_file: str):
+    """
+    :return: a tuple of the MC before the first record of a journal and its token, or None if there is no journal.
+    """
+    if not os.path.exists(journal_file):
+        return None
+    try:
+        with open(journal_file, "rb") as file:
+            return HEADER.unpack(file.read(HEADER.size))[2:]
+    except struct.error:
+        return None
+
+
+def _journal_end(journal_file: str):
+    """
+    :return: a tuple of the MC after the last complete record of a journal, the offset where the records end, the
+    number of records and the token of the journal, or None if there is no journal.
+    """
+    header = _journal_header(journal_file)
+    if header is None:
+        return None
+    mc, token = header
+    records = _read_records(journal_file)
+    count = 0
+    try:
+        while True:
+            mc = next(records)[1]
+            count += 1
+    except StopIteration as stop:
+        return mc, stop.value, count, token
+    except ValueError:
+        return None
+
+
+def _write_checkpoint(graph, checkpoint_file: str) -> None:
+    """
+    Writing a checkpoint into a temporary file that then replaces the old checkpoint, so there is always one whole
+    checkpoint on the disk.
+    """
+    temp_file = checkpoint_file + ".tmp"
+    write_binary(graph, temp_file)
+    with open(temp_file, "rb+") as file:
+        os.fsync(file.fileno())
+    os.replace(temp_file, checkpoint_file)
@@ -0,0 +1,100 @@
+from src.GraphInterface import GraphInteface
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+"""
+The drawing code of GraphAlgo.plot_graph and GraphAlgo.render_to_file.
+GraphAlgo only imports this module (and matplotlib) when a graph is actually drawn, so programs that only run
+algorithms don't pay for importing matplotlib. Every node of the graph is expected to have a position.
+"""
+
+
+def draw_graph(graph: GraphInteface, ax: Axes, max_edges: int) -> None:
+    """
+    Drawing a graph on a matplotlib axes.
+    All the edges are drawn as one quiver (arrows) and all the nodes as one scatter, instead of an artist per edge.
+    Above max_edges edges only an even sample of max_edges edges is drawn, as plain lines in one LineCollection
+    (arrow heads can't be told apart at that density).
+    :param graph: the graph to draw.
+    :param ax: the axes to draw on.
+    :param max_edges: the maximum number of edges to draw, 0 or None to always draw all of them.
+    """
+    ax.set_title("Graph Representation:")
+    ax.set_xlabel("X position of node")
+    ax.set_ylabel("Y position of node")
+    nodes = graph.get_all_v()
+    if not nodes:
+        return
+    index = {}
+    x, y = np.empty(len(nodes)), np.empty(len(nodes))
+    for i, (node_id, node) in enumerate(nodes.items()):
+        index[node_id] = i
+        x[i], y[i] = node.pos[0], node.pos[1]
+    x_min, x_max, y_min, y_max = x.min(), x.max(), y.min(), y.max()
+
+    edge_count = graph.e_size()
+    step = -(-edge_count // max_edges) if max_edges and edge_count > max_edges else 1
+    sources, targets = [], []
+    counter = 0
+    for node_id, i in index.items():
+        for neighbour in graph.all_out_edges_of_node(node_id):
+            if counter % step == 0:
+                sources.append(i)
+                targets.append(index[neighbour])
+            counter += 1
+    x1, y1 = x[sources], y[sources]
+    dx, dy = x[targets] - x1, y[targets] - y1
+
+    if step > 1:
+        segments = np.stack((np.column_stack((x1, y1)), np.column_stack((x1 + dx, y1 + dy))), axis=1)
+        ax.add_collection(LineCollection(segments, linewidths=0.3, colors="gray", alpha=0.4, zorder=1))
+        ax.set_title("Graph Representation: (%d of %d edges)" % (len(sources), edge_count))
+    elif sources:
+        # The arrows are shortened at both ends, so the arrow heads are not hidden under the nodes
+        shrink = 0.01 * max(x_max - x_min, y_max - y_min)
+        length = np.hypot(dx, dy)
+        factor = np.where(length > 4 * shrink, shrink / np.maximum(length, shrink), 0)
+        ax.quiver(x1 + dx * factor, y1 + dy * factor, dx * (1 - 2 * factor), dy * (1 - 2 * factor),
+                  angles="xy", scale_units="xy", scale=1, width=0.002, headwidth=5, headlength=6,
+                  color="gray", zorder=1)
+    ax.scatter(x, y, s=max(1.0, min(30.0, 30000.0 / len(nodes))), zorder=2)
+
+    extra_space = 0.05
+    if (x_max - x_min) <= 0.5:
+        extra_space = 0.0008
+    ax.set_xlim(x_min - extra_space, x_max + extra_space)
+    ax.set_ylim(y_min - extra_space, y_max + extra_space)
+
+
+def show_graph(graph: GraphInteface, ax, max_edges: int) -> None:
+    """
+    Drawing a graph on the given axes, or on a new pyplot figure that is then shown in a window.
+    """
+    if isinstance(ax, Axes):
+        draw_graph(graph, ax, max_edges)
+        return
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(1, 1, figsize=(8, 7))
+    draw_graph(graph, ax, max_edges)
+    plt.tight_layout()
+    plt.show()
+
+
+def render_to_file(graph: GraphInteface, path: str, dpi: int, size: tuple, max_edges: int) -> None:
+    """
+    Drawing a graph into an image file with the Agg renderer, without pyplot (no window and no global figure state),
+    so it can be used by headless processes and from several threads.
+    :param graph: the graph to draw.
+    :param path: the path of the image, its extension sets the format (png, svg, pdf...).
+    :param dpi: the resolution of the image, in dots per inch.
+    :param size: the (width, height) of the image in inches.
+    :param max_edges: the maximum number of edges to draw (see draw_graph).
+    """
+    fig = Figure(figsize=size)
+    FigureCanvasAgg(fig)
+    draw_graph(graph, fig.subplots(), max_edges)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
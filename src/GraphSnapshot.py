@@ -0,0 +1,111 @@
+from src.GraphInterface import GraphInteface
+from src.DiGraph import Node, pos_bounds, assign_random_positions
+import math
+
+
+class GraphSnapshot(GraphInteface):
+    """
+    An immutable view of a DiGraph at one version (MC), created by DiGraph.snapshot().
+    The snapshot shares the dictionaries of the graph instead of copying them: the graph copies its top level
+    dictionaries on the first change after a snapshot was taken, and then copies the dictionary of neighbours of a node
+    only before it changes it (copy-on-write), so the dictionaries a snapshot holds are never changed again.
+    Queries (e.g. GraphAlgo(graph.snapshot())) see a consistent graph while another thread keeps changing the graph,
+    without any locking. The nodes are shared with the graph too, and must not be changed through the snapshot
+    (assign_missing_positions gives the snapshot its own copies of the nodes it changes).
+    All the mutating methods do nothing and return False.
+    """
+
+    def __init__(self, nodes: dict, out_edges: dict, in_edges: dict, mc: int, edge_count: int, bounds=None):
+        """
+        :param nodes: dictionary of (node id, Node).
+        :param out_edges: dictionary of (node id, dictionary of (neighbour, weight)) of the out-edges.
+        :param in_edges: dictionary of (node id, dictionary of (neighbour, weight)) of the in-edges.
+        :param mc: the MC of the graph when the snapshot was taken, the version of the snapshot.
+        :param edge_count: the number of edges.
+        :param bounds: the (x_min, x_max, y_min, y_max) bounding box of the positions as DiGraph keeps it, or None to
+        find it when it's needed.
+        """
+        self.NodesInGraph = nodes
+        self.NodesWithOutputEdges = out_edges
+        self.NodesWithReceivingEdges = in_edges
+        self.MC = mc
+        self.EdgeCounter = edge_count
+        self.PosBounds = bounds
+
+    def v_size(self):
+        return len(self.NodesInGraph)
+
+    def e_size(self):
+        return self.EdgeCounter
+
+    def get_all_v(self):
+        return self.NodesInGraph
+
+    def all_in_edges_of_node(self, id1):
+        return self.NodesWithReceivingEdges.get(id1)
+
+    def all_out_edges_of_node(self, id1):
+        return self.NodesWithOutputEdges.get(id1)
+
+    def get_mc(self):
+        return self.MC
+
+    def getNode(self, id):
+        return self.NodesInGraph.get(id)
+
+    def get_pos_bounds(self):
+        """
+        :return: a tuple of (x_min, x_max, y_min, y_max) of the positions of the nodes, or None if no node has a
+        position.
+        """
+        if self.PosBounds is None:
+            self.PosBounds = pos_bounds(self.NodesInGraph.values()) or (math.inf, -math.inf, math.inf, -math.inf)
+        x_min, x_max, y_min, y_max = self.PosBounds
+        if x_min > x_max:
+            return None
+        return x_min, x_max, y_min, y_max
+
+    def assign_missing_positions(self, bounds: tuple = None) -> int:
+        """
+        Giving every node that doesn't have a position a random one (like DiGraph.assign_missing_positions), only in
+        this snapshot: the nodes without a position are replaced by new nodes in a copy of the dictionary of nodes, so
+        the graph and its other snapshots don't change.
+        :param bounds: the (x_min, x_max, y_min, y_max) area of the new positions, by default the bounding box of the
+        positions.
+        :return: the number of nodes that were given a position.
+        """
+        missing = [node_id for node_id, node in self.NodesInGraph.items() if node.pos is None]
+        if not missing:
+            return 0
+        nodes = dict(self.NodesInGraph)
+        for node_id in missing:
+            nodes[node_id] = Node(node_id)
+        assign_random_positions(nodes.values(), bounds or self.get_pos_bounds())
+        self.NodesInGraph = nodes
+        self.PosBounds = None
+        return len(missing)
+
+    def freeze(self):
+        """
+        :return: a CSRGraph of the snapshot (see DiGraph.freeze).
+        """
+        from src.CSRGraph import CSRGraph
+        return CSRGraph.from_graph(self)
+
+    def add_edge(self, id1, id2, weight):
+        return False
+
+    def add_node(self, node_id, pos: tuple = None):
+        return False
+
+    def remove_node(self, node_id):
+        return False
+
+    def remove_edge(self, node_id1, node_id2):
+        return False
+
+    def __str__(self):
+        result = ""
+        for node in self.NodesInGraph.keys():
+            result += "Node: %s, Neighbours: %s \n" % (node, str(self.NodesWithOutputEdges[node]))
+        return result
@@ -0,0 +1,254 @@
+from json.encoder import encode_basestring_ascii
+import json
+import math
+import re
+
+"""
+A small incremental JSON reader used by GraphAlgo.load_from_json, and the streaming writer used by
+GraphAlgo.save_to_json.
+Instead of loading the whole file into one Python object tree, the file is read in chunks and the items of the
+top-level arrays are decoded (and handed over) one at a time, so only a single item needs to be in memory at once.
+The writer works the other way around: the text of the nodes and edges is formatted directly and written in chunks,
+and never collected into one big object.
+"""
+
+_WHITESPACE = " \t\n\r"
+_SEPARATOR = re.compile(r"[ \t\n\r]*([,\]])[ \t\n\r]*")
+
+
+class JsonStreamReader:
+    """
+    This class reads a JSON object of the form {"key": [item, item, ...], ...} from a file, one array item at a time.
+    """
+
+    def __init__(self, file, chunk_size: int = 1 << 16):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        self.keys = list()
+
+    def _read_more(self) -> bool:
+        """
+        Reading the next chunk of the file into the buffer, dropping the part that was already consumed.
+        :return: (True/False) if more data was read or the end of the file was reached.
+        """
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _next_char(self) -> str:
+        """
+        Skipping whitespaces and returning the next character in the file (without consuming it).
+        :return: the next non-whitespace character, or an empty string at the end of the file.
+        """
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._read_more():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def _expect(self, chars: str) -> str:
+        char = self._next_char()
+        if char == "" or char not in chars:
+            raise ValueError("Expected one of %r at offset %d, found %r" % (chars, self.pos, char))
+        self.pos += 1
+        return char
+
+    def _decode(self):
+        """
+        Decoding the next JSON value in the file, reading more chunks until the value is complete.
+        :return: the decoded value.
+        """
+        self._next_char()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number that ends exactly at the end of the buffer might continue in the next chunk:
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read_more()
+
+    def _array_batches(self):
+        """
+        Yielding the items of the array that starts at the current position (after the opening bracket), in lists.
+        The buffer is cut after its last "}", and all the objects before the cut are decoded at once as one JSON array
+        by the C decoder of the json module. A cut inside a string or inside a nested value (or after the end of the
+        array) can't be decoded as an array, the items are then decoded one at a time with the C scanner, and only an
+        item that crosses the end of the buffer goes through the slower _decode path.
+        :return: a generator of lists of items.
+        """
+        decode = self.decoder.decode
+        scan = self.decoder.scan_once
+        separator = _SEPARATOR.match
+        while True:
+            buffer, pos = self.buffer, self.pos
+            cut = buffer.rfind("}", pos) + 1
+            if cut > pos:
+                try:
+                    batch = decode("[" + buffer[pos:cut] + "]")
+                except json.JSONDecodeError:
+                    pass
+                else:
+                    yield batch
+                    self.pos = cut
+                    if self._expect(",]") == "]":
+                        return
+                    continue
+            batch = []
+            while True:
+                try:
+                    value, end = scan(buffer, pos)
+                except (StopIteration, json.JSONDecodeError):
+                    break
+                match = separator(buffer, end)
+                if match is None:
+                    break
+                batch.append(value)
+                pos = match.end()
+                if match.group(1) == "]":
+                    self.pos = pos
+                    yield batch
+                    return
+            self.pos = pos
+            batch.append(self._decode())
+            yield batch
+            if self._expect(",]") == "]":
+                return
+
+    def items(self):
+        """
+        Going over the top-level object, and yielding every item of every array in it.
+        :return: a generator of (key, item) tuples, in the order they appear in the file.
+        """
+        for key, batch in self.batches():
+            for item in batch:
+                yield key, item
+
+    def batches(self):
+        """
+        Going over the top-level object, and yielding the items of every array in it in lists (of up to about a chunk
+        of the file), which is faster than yielding them one by one.
+        Values of the object that are not arrays are decoded and skipped, all the keys that were found are kept in
+        self.keys.
+        :return: a generator of (key, list of items) tuples, in the order they appear in the file.
+        """
+        self._expect("{")
+        if self._next_char() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self._decode()
+            self.keys.append(key)
+            self._expect(":")
+            if self._next_char() == "[":
+                self.pos += 1
+                if self._next_char() == "]":
+                    self.pos += 1
+                else:
+                    for batch in self._array_batches():
+                        yield key, batch
+            else:
+                self._decode()
+            if self._expect(",}") == "}":
+                return
+
+
+def iter_json_arrays(file, chunk_size: int = 1 << 16):
+    """
+    Streaming the items of the top-level arrays of a JSON object from an open file.
+    :param file: a file object opened in text mode.
+    :param chunk_size: the number of characters to read from the file at a time.
+    :return: a generator of (key, item) tuples.
+    """
+    return JsonStreamReader(file, chunk_size).items()
+
+
+# The encoder of the values json.dump can't encode by itself, the same one save_to_json always used
+_ENCODER = json.JSONEncoder(default=lambda x: x.__dict__)
+_FLOAT_CONSTANTS = {math.inf: "Infinity", -math.inf: "-Infinity"}
+
+
+def encode_value(value) -> str:
+    """
+    Encoding a single value exactly like json.dump encodes it, with a fast path for ints and floats.
+    """
+    kind = type(value)
+    if kind is int:
+        return int.__repr__(value)
+    if kind is float:
+        if value != value:
+            return "NaN"
+        return _FLOAT_CONSTANTS.get(value) or float.__repr__(value)
+    return _ENCODER.encode(value)
+
+
+def write_graph_json(graph, file, sort: bool = False, chunk_size: int = 1 << 16) -> None:
+    """
+    Writing a graph as the JSON object {"Edges": [...], "Nodes": [...]}, byte for byte the same text that
+    json.dump(obj, file) writes for that object (the format of GraphAlgo.save_to_json), without building the object.
+    The edges and nodes are formatted one by one and written to the file in chunks of about chunk_size characters.
+    :param graph: the graph to write.
+    :param file: a file object opened in text mode.
+    :param sort: when True the nodes are written in the order of their ids, and the edges of every node in the order
+    of their destinations, so the same graph is always written the same way (the ids have to be comparable).
+    Otherwise the order of the graph is kept.
+    :param chunk_size: the number of characters to collect before every write.
+    """
+    nodes = graph.get_all_v()
+    node_ids = sorted(nodes) if sort else list(nodes)
+    # Every id is encoded once, instead of once for every edge it appears in
+    encoded_ids = {node_id: encode_value(node_id) for node_id in node_ids}
+    out_edges = graph.all_out_edges_of_node
+    parts = ['{"Edges": [']
+    size = 0
+    separator = ""
+    for node_id in node_ids:
+        src = '{"src": ' + encoded_ids[node_id] + ', "w": '
+        edges = out_edges(node_id)
+        for dest in (sorted(edges) if sort else edges):
+            weight = edges[dest]
+            # weight - weight is NaN for infinite and NaN weights
+            if type(weight) is float and weight - weight == 0:
+                weight = float.__repr__(weight)
+            else:
+                weight = encode_value(weight)
+            part = separator + src + weight + ', "dest": ' + encoded_ids[dest] + '}'
+            parts.append(part)
+            size += len(part)
+            separator = ", "
+        if size >= chunk_size:
+            file.write("".join(parts))
+            parts.clear()
+            size = 0
+
+    parts.append('], "Nodes": [')
+    separator = ""
+    for node_id in node_ids:
+        pos = nodes[node_id].pos
+        if pos is None:
+            pos = "null"
+        else:
+            pos = encode_basestring_ascii(str(pos[0]) + ', ' + str(pos[1]) + ', ' + str(pos[2]))
+        part = separator + '{"pos": ' + pos + ', "id": ' + encoded_ids[node_id] + '}'
+        parts.append(part)
+        size += len(part)
+        separator = ", "
+        if size >= chunk_size:
+            file.write("".join(parts))
+            parts.clear()
+            size = 0
+    parts.append("]}")
+    file.write("".join(parts))
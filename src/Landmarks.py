@@ -0,0 +1,199 @@
+from src.GraphInterface import GraphInteface
+from heapq import heappush, heappop
+import json
+import math
+
+INFINITY = math.inf
+# The number of landmarks a single query uses, the ones that give the best lower bound at its source
+ACTIVE_LANDMARKS = 4
+
+
+class Landmarks:
+    """
+    This class was created in order to direct A* searches on graphs that have no meaningful positions (ALT: A*,
+    landmarks and the triangle inequality).
+    In a preprocessing step a few landmark nodes are chosen, and the distances from every landmark to all the nodes
+    (forward) and from all the nodes to every landmark (backward) are saved. For every node v, target t and landmark L
+    the triangle inequality gives two lower bounds of the distance from v to t:
+    dist(L,t) - dist(L,v) and dist(v,L) - dist(t,L), and the largest of them is a consistent A* potential.
+    The tables also tell when a node can't reach the target at all (e.g. L reaches v but not t), so most unreachable
+    queries are answered without any search.
+    """
+
+    def __init__(self, graph: GraphInteface, landmarks: list, forward: dict, backward: dict, mc: int):
+        """
+        :param graph: the graph the landmarks were chosen in.
+        :param landmarks: the list of the landmark nodes.
+        :param forward: dictionary of (node, list of the distances from every landmark to the node).
+        :param backward: dictionary of (node, list of the distances from the node to every landmark).
+        :param mc: the MC of the graph the tables are valid for.
+        """
+        self.graph = graph
+        self.landmarks = landmarks
+        self.forward = forward
+        self.backward = backward
+        self.mc = mc
+
+    @classmethod
+    def build(cls, graph: GraphInteface, k: int = 16):
+        """
+        Choosing k landmarks using the farthest-first selection, and calculating their distance tables.
+        The first landmark is the node farthest from the first node of the graph, and every next landmark is the node
+        farthest from the landmarks that were already chosen (nodes that can't reach or can't be reached from them
+        first), so the landmarks end up spread around the "edges" of the graph, where they give the best bounds.
+        The distance of a node from the landmarks is the round trip dist(L,v) + dist(v,L) to the closest one.
+        :param graph: the graph to choose the landmarks in.
+        :param k: the number of landmarks, every landmark costs two full Dijkstra searches and 2 floats per node.
+        :return: a new Landmarks.
+        """
+        nodes = list(graph.get_all_v().keys())
+        k = min(k, len(nodes))
+        forward = {node: [INFINITY] * k for node in nodes}
+        backward = {node: [INFINITY] * k for node in nodes}
+        landmarks = []
+        if k == 0:
+            return cls(graph, landmarks, forward, backward, graph.get_mc())
+
+        closest = _round_trips(graph, nodes[0], nodes)
+        for i in range(k):
+            landmark = max(closest, key=closest.get)
+            landmarks.append(landmark)
+            for node, distance in _distances(graph.all_out_edges_of_node, landmark).items():
+                forward[node][i] = distance
+            for node, distance in _distances(graph.all_in_edges_of_node, landmark).items():
+                backward[node][i] = distance
+            for node in nodes:
+                round_trip = forward[node][i] + backward[node][i]
+                if round_trip < closest[node]:
+                    closest[node] = round_trip
+            # A landmark is never chosen twice, even if it can't reach itself back (inf + inf)
+            closest[landmark] = -1
+        return cls(graph, landmarks, forward, backward, graph.get_mc())
+
+    def is_valid(self, graph: GraphInteface) -> bool:
+        """
+        :return: (True/False) if the tables were calculated for this graph, and the graph wasn't changed since.
+        """
+        return graph is self.graph and graph.get_mc() == self.mc
+
+    def unreachable(self, src, target) -> bool:
+        """
+        :return: True if the tables prove that there is no path from src to target (False doesn't mean there is one).
+        """
+        forward, backward = self.forward, self.backward
+        for i in range(len(self.landmarks)):
+            # L reaches src but not target, or target reaches L but src doesn't
+            if forward[target][i] == INFINITY and forward[src][i] != INFINITY:
+                return True
+            if backward[target][i] != INFINITY and backward[src][i] == INFINITY:
+                return True
+        return False
+
+    def potential(self, src, target, active: int = ACTIVE_LANDMARKS):
+        """
+        Creating the A* potential of a query: a lower bound of the distance from a node to the target.
+        Only the active landmarks that give the best bounds at src are used, since every landmark adds work to every
+        heap push. Bounds that rely on an infinite distance of the target are skipped.
+        :param src: the source node of the query.
+        :param target: the destination node of the query.
+        :param active: the maximum number of landmarks to use.
+        :return: a potential function for ShortestPath.astar.
+        """
+        forward, backward = self.forward, self.backward
+        target_forward, target_backward = forward[target], backward[target]
+        src_forward, src_backward = forward[src], backward[src]
+        bounds = []
+        for i in range(len(self.landmarks)):
+            if target_forward[i] != INFINITY:
+                bounds.append((target_forward[i] - src_forward[i], True, i))
+            if target_backward[i] != INFINITY:
+                bounds.append((src_backward[i] - target_backward[i], False, i))
+        bounds.sort(reverse=True)
+        forward_terms = [(i, target_forward[i]) for bound, is_forward, i in bounds[:active] if is_forward]
+        backward_terms = [(i, target_backward[i]) for bound, is_forward, i in bounds[:active] if not is_forward]
+
+        def landmark_potential(node):
+            best = 0
+            distances = forward[node]
+            for i, distance in forward_terms:
+                bound = distance - distances[i]
+                if bound > best:
+                    best = bound
+            distances = backward[node]
+            for i, distance in backward_terms:
+                bound = distances[i] - distance
+                if bound > best:
+                    best = bound
+            # Keeping a small margin, so rounding errors never make the potential larger than a real distance
+            return best * (1 - 1e-9)
+
+        return landmark_potential
+
+    def save(self, file_name: str) -> None:
+        """
+        Saving the landmarks and their distance tables in a JSON file, to be saved alongside the graph.
+        Infinite distances are saved as null.
+        """
+        node_ids = list(self.forward.keys())
+        data = {"Nodes": self.graph.v_size(), "Edges": self.graph.e_size(), "Landmarks": self.landmarks,
+                "NodeIds": node_ids,
+                "Forward": [_to_json(self.forward[node]) for node in node_ids],
+                "Backward": [_to_json(self.backward[node]) for node in node_ids]}
+        with open(file_name, "w") as file:
+            json.dump(data, file)
+
+    @classmethod
+    def load(cls, graph: GraphInteface, file_name: str):
+        """
+        Loading landmarks that were saved using save, for the same graph they were chosen in.
+        :param graph: the graph of the landmarks (usually loaded from the graph file saved alongside them).
+        :param file_name: the name of the landmarks file.
+        :return: a new Landmarks, valid for the current version of the graph.
+        """
+        with open(file_name) as file:
+            data = json.load(file)
+        if data["Nodes"] != graph.v_size() or data["Edges"] != graph.e_size() or \
+                any(graph.getNode(node) is None for node in data["NodeIds"]):
+            raise ValueError("The landmarks in %s were chosen in a different graph" % file_name)
+        forward = {node: _from_json(row) for node, row in zip(data["NodeIds"], data["Forward"])}
+        backward = {node: _from_json(row) for node, row in zip(data["NodeIds"], data["Backward"])}
+        return cls(graph, data["Landmarks"], forward, backward, graph.get_mc())
+
+
+def _distances(edges, src) -> dict:
+    """
+    A full Dijkstra search from src over the given edges (all_out_edges_of_node for the distances from src, or
+    all_in_edges_of_node for the distances to src).
+    :return: a dictionary of (node, distance) for every node the search reached.
+    """
+    distances = {src: 0}
+    settled = set()
+    heap = [(0, src)]
+    while heap:
+        distance, node = heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        for neighbour, weight in edges(node).items():
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbour, INFINITY):
+                distances[neighbour] = new_distance
+                heappush(heap, (new_distance, neighbour))
+    return distances
+
+
+def _round_trips(graph: GraphInteface, src, nodes: list) -> dict:
+    """
+    :return: a dictionary of (node, dist(src,node) + dist(node,src)) for all the nodes, INFINITY if there is none.
+    """
+    to_nodes = _distances(graph.all_out_edges_of_node, src)
+    from_nodes = _distances(graph.all_in_edges_of_node, src)
+    return {node: to_nodes.get(node, INFINITY) + from_nodes.get(node, INFINITY) for node in nodes}
+
+
+def _to_json(distances: list) -> list:
+    return [None if distance == INFINITY else distance for distance in distances]
+
+
+def _from_json(distances: list) -> list:
+    return [INFINITY if distance is None else distance for distance in distances]
@@ -0,0 +1,80 @@
+from src.GraphInterface import GraphInteface
+from collections import OrderedDict
+import threading
+
+
+class PathCache:
+    """
+    This class was created in order to keep the shortest path trees (distances and parents from a source node) of
+    the most recently used sources, so repeated shortest path queries from the same source don't need a new search.
+    The trees are only valid for the version of the graph they were calculated on, so the whole cache is cleared
+    whenever the graph (or its MC) changes. When the cache is full, the least recently used tree is evicted.
+    """
+
+    def __init__(self, max_size: int = 128):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.trees = OrderedDict()
+        self.graph = None
+        self.mc = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def _check_version(self, graph: GraphInteface):
+        if graph is not self.graph or graph.get_mc() != self.mc:
+            if self.trees:
+                self.invalidations += 1
+                self.trees.clear()
+            self.graph = graph
+            self.mc = graph.get_mc()
+
+    def get(self, graph: GraphInteface, src):
+        """
+        Returning the cached tree of src.
+        :param graph: the graph that is queried.
+        :param src: the source node.
+        :return: a (distances, parents) tuple, or None if the tree of src isn't in the cache.
+        """
+        with self.lock:
+            self._check_version(graph)
+            tree = self.trees.get(src)
+            if tree is None:
+                self.misses += 1
+                return None
+            self.trees.move_to_end(src)
+            self.hits += 1
+            return tree
+
+    def put(self, graph: GraphInteface, mc: int, src, tree: tuple):
+        """
+        Adding the tree of src to the cache.
+        :param graph: the graph the tree was calculated on.
+        :param mc: the MC of the graph when the calculation started, the tree isn't kept if the graph changed since.
+        :param src: the source node.
+        :param tree: a (distances, parents) tuple.
+        """
+        with self.lock:
+            self._check_version(graph)
+            if mc != self.mc:
+                return
+            self.trees[src] = tree
+            self.trees.move_to_end(src)
+            while len(self.trees) > self.max_size:
+                self.trees.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.trees.clear()
+
+    def stats(self) -> dict:
+        """
+        :return: a dictionary with the number of hits, misses, evictions and invalidations, and the current size.
+        """
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "invalidations": self.invalidations, "size": len(self.trees), "max_size": self.max_size}
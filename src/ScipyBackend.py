@@ -0,0 +1,233 @@
+from src.GraphInterface import GraphInteface
+from src.CSRGraph import CSRGraph
+from src.DiGraph import DiGraph
+import math
+
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix, coo_matrix
+    from scipy.sparse import csgraph
+except ImportError:
+    np = None
+
+"""
+A vectorized backend for GraphAlgo, running the algorithms of scipy.sparse.csgraph over a sparse matrix of the graph.
+NumPy and SciPy are optional: this module can always be imported, and is_available tells if they are installed.
+Row/column i of a matrix stands for the i-th node of the graph, the node ids are kept in a separate list.
+"""
+
+INFINITY = math.inf
+_NO_PARENT = -9999
+# The number of sources searched by a single call in ScipyGraph.shortest_paths, every source takes a row of n floats
+SOURCES_PER_CALL = 64
+
+
+def is_available() -> bool:
+    """
+    :return: (True/False) if NumPy and SciPy are installed.
+    """
+    return np is not None
+
+
+def to_scipy_sparse(graph: GraphInteface):
+    """
+    Converting a graph into a SciPy sparse matrix, where matrix[i, j] is the weight of the edge between the i-th and
+    the j-th nodes. A CSRGraph is used as is (the arrays are shared, not copied), the matrix of any other graph is
+    built from its own node ids, so they don't have to be ints.
+    :param graph: the graph to convert.
+    :return: a tuple of the (n x n) csr_matrix and a list of the node ids of its rows.
+    """
+    if isinstance(graph, CSRGraph):
+        n = graph.v_size()
+        weights = np.frombuffer(graph.OutWeights, dtype=np.float64)
+        targets = np.frombuffer(graph.OutTargets, dtype=np.int64)
+        offsets = np.frombuffer(graph.OutOffsets, dtype=np.int64)
+        return csr_matrix((weights, targets, offsets), shape=(n, n)), list(graph.NodeIds)
+    node_ids = list(graph.get_all_v())
+    n = len(node_ids)
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    offsets, targets, weights = [0], [], []
+    for node_id in node_ids:
+        edges = graph.all_out_edges_of_node(node_id)
+        targets.extend([index[neighbour] for neighbour in edges])
+        weights.extend(edges.values())
+        offsets.append(len(targets))
+    matrix = csr_matrix((np.array(weights, dtype=np.float64), np.array(targets, dtype=np.int64),
+                         np.array(offsets, dtype=np.int64)), shape=(n, n))
+    return matrix, node_ids
+
+
+def from_scipy_sparse(matrix, node_ids=None) -> DiGraph:
+    """
+    Building a DiGraph out of a square SciPy sparse matrix (or anything scipy.sparse.coo_matrix accepts), every stored
+    entry of the matrix becomes an edge, except the entries of the diagonal.
+    :param matrix: the adjacency matrix of the graph.
+    :param node_ids: the node ids of the rows of the matrix, 0..n-1 by default.
+    :return: a new DiGraph.
+    """
+    matrix = coo_matrix(matrix)
+    n = matrix.shape[0]
+    if matrix.shape[1] != n:
+        raise ValueError("The matrix of a graph must be square, got %s" % (matrix.shape,))
+    node_ids = list(range(n)) if node_ids is None else list(node_ids)
+    if len(node_ids) != n:
+        raise ValueError("Expected %d node ids, got %d" % (n, len(node_ids)))
+    graph = DiGraph()
+    graph.add_nodes_from(node_ids)
+    graph.add_edges_from(zip([node_ids[row] for row in matrix.row.tolist()],
+                             [node_ids[col] for col in matrix.col.tolist()], matrix.data.tolist()))
+    return graph
+
+
+def _int_weights(graph: GraphInteface, node_ids: list) -> bool:
+    """
+    :return: (True/False) if all the weights of the graph are ints (a CSRGraph always keeps its weights as floats).
+    """
+    if isinstance(graph, CSRGraph):
+        return False
+    for node_id in node_ids:
+        for weight in graph.all_out_edges_of_node(node_id).values():
+            if type(weight) is not int:
+                return False
+    return True
+
+
+class ScipyGraph:
+    """
+    This class keeps the sparse matrix of one version of a graph, and answers queries using scipy.sparse.csgraph.
+    The results have the same form (node ids, Python numbers and lists) as the pure Python algorithms of GraphAlgo.
+    The Python algorithms add up the original weights starting from the int 0, so the distances are ints when all the
+    weights of the graph are ints (and the distance of a node from itself is always 0), the distances SciPy finds are
+    converted back the same way. In a graph that mixes int and float weights every other distance is a float.
+    """
+
+    def __init__(self, graph: GraphInteface):
+        self.graph = graph
+        self.mc = graph.get_mc()
+        self.matrix, self.node_ids = to_scipy_sparse(graph)
+        self.index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.int_weights = _int_weights(graph, self.node_ids)
+
+    def is_valid(self, graph: GraphInteface) -> bool:
+        """
+        :return: (True/False) if the matrix was built from this graph, and the graph wasn't changed since.
+        """
+        return graph is self.graph and graph.get_mc() == self.mc
+
+    def shortest_path(self, src, dest) -> (float, list):
+        """
+        :return: a tuple of the distance and the path from src to dest, or (INFINITY, []) if there is no path.
+        """
+        source, target = self.index[src], self.index[dest]
+        distances, parents = csgraph.dijkstra(self.matrix, directed=True, indices=source, return_predecessors=True)
+        if math.isinf(distances[target]):
+            return INFINITY, []
+        path = self._path(parents, source, target)
+        return self._path_distance(path), path
+
+    def shortest_paths(self, groups: dict, paths: bool = True) -> dict:
+        """
+        Answering many queries at once, all the sources are searched by a few calls of scipy.sparse.csgraph.dijkstra.
+        :param groups: dictionary of (source, the set of its destinations).
+        :param paths: (True/False) if the paths should be built, or only the distances.
+        :return: a dictionary of (src, dest) -> (distance, path or None) for every destination that was reached.
+        """
+        index, node_ids = self.index, self.node_ids
+        sources = list(groups)
+        results = {}
+        for start in range(0, len(sources), SOURCES_PER_CALL):
+            chunk = sources[start:start + SOURCES_PER_CALL]
+            rows = csgraph.dijkstra(self.matrix, directed=True, indices=[index[src] for src in chunk],
+                                    return_predecessors=paths)
+            distances, parents = rows if paths else (rows, None)
+            distances = distances.reshape(len(chunk), len(node_ids))
+            if paths:
+                parents = parents.reshape(len(chunk), len(node_ids))
+            for row, src in enumerate(chunk):
+                for dest in groups[src]:
+                    distance = distances[row, index[dest]]
+                    if math.isinf(distance):
+                        continue
+                    if paths:
+                        path = self._path(parents[row], index[src], index[dest])
+                        results[(src, dest)] = (self._path_distance(path), path)
+                    else:
+                        results[(src, dest)] = (self._number(distance, src == dest), None)
+        return results
+
+    def _path(self, parents, source: int, target: int) -> list:
+        """
+        :return: the list of node ids of the path from the source index to the target index, from a predecessors row.
+        """
+        node_ids = self.node_ids
+        path = [node_ids[target]]
+        i = target
+        while i != source:
+            i = int(parents[i])
+            path.append(node_ids[i])
+        path.reverse()
+        return path
+
+    def _number(self, distance, same_node: bool):
+        """
+        :return: a finite distance SciPy found as the same Python number the Python algorithms return.
+        """
+        if self.int_weights or same_node:
+            return int(distance)
+        return float(distance)
+
+    def _path_distance(self, path: list):
+        # The distance is summed from the original weights, so it's the same number the Python algorithms return
+        distance = 0
+        for node, next_node in zip(path, path[1:]):
+            distance += self.graph.all_out_edges_of_node(node)[next_node]
+        return distance
+
+    def distances(self, src) -> dict:
+        """
+        :return: a dictionary of (node, distance from src) for every node that can be reached from src.
+        """
+        distances = csgraph.dijkstra(self.matrix, directed=True, indices=self.index[src])
+        reachable = np.flatnonzero(np.isfinite(distances)).tolist()
+        node_ids = self.node_ids
+        values = distances[reachable]
+        if self.int_weights:
+            values = values.astype(np.int64)
+        result = dict(zip([node_ids[i] for i in reachable], values.tolist()))
+        result[src] = 0
+        return result
+
+    def distance_matrix(self, sources: list, targets: list, as_array: bool = True):
+        """
+        :param as_array: when False the matrix is returned as a list of rows of Python numbers (see _number).
+        :return: a NumPy array, row i holds the distances from sources[i] to the targets (inf if not reachable).
+        """
+        index = self.index
+        matrix = csgraph.dijkstra(self.matrix, directed=True, indices=[index[src] for src in sources])
+        matrix = matrix.reshape(len(sources), len(self.node_ids))
+        columns = np.array([index.get(target, -1) for target in targets], dtype=np.int64)
+        result = np.full((len(sources), len(targets)), np.inf)
+        found = columns >= 0
+        result[:, found] = matrix[:, columns[found]]
+        if as_array:
+            return result
+        rows = result.tolist()
+        columns_of = {}
+        for column, target in enumerate(targets):
+            columns_of.setdefault(target, []).append(column)
+        for src, row in zip(sources, rows):
+            if self.int_weights:
+                row[:] = [distance if distance == INFINITY else int(distance) for distance in row]
+            for column in columns_of.get(src, ()):
+                row[column] = 0
+        return rows
+
+    def connected_components(self) -> list:
+        """
+        :return: a sorted list of all the strongly connected components, every component is a sorted list of node ids.
+        """
+        count, labels = csgraph.connected_components(self.matrix, directed=True, connection="strong")
+        components = [[] for _ in range(count)]
+        for node_id, label in zip(self.node_ids, labels.tolist()):
+            components[label].append(node_id)
+        return sorted(sorted(component) for component in components)
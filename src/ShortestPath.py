@@ -0,0 +1,328 @@
+from src.GraphInterface import GraphInteface
+from src.CSRGraph import CSRGraph
+from src.DiGraph import GeoLocation
+from heapq import heappush, heappop
+import math
+
+INFINITY = math.inf
+
+"""
+The shortest path engine used by GraphAlgo.
+The searches here work on any graph that implements GraphInteface (DiGraph, CSRGraph) and keep all of their state
+in local structures, the graph itself is never changed.
+"""
+
+
+def dijkstra(graph: GraphInteface, src, target=None, stats=None):
+    """
+    Dijkstra's algorithm using a binary heap (heapq).
+    Instead of updating the priority of a node in the heap, a new entry is pushed every time a shorter distance is
+    found, and the old (stale) entries are skipped when they are popped.
+    The distance and parent maps are filled lazily - only nodes that were reached by the search appear in them, so
+    a short query on a big graph never touches the rest of the graph.
+    :param graph: the graph to search in.
+    :param src: the source node of the search.
+    :param target: optional destination node, the search stops as soon as it is settled.
+    :param stats: optional AlgoStats, the counters of the search are added to it.
+    :return: a tuple of two dictionaries: the distances from src, and the parent of every reached node.
+    note: when the search stops early, only the distances of the settled nodes are final.
+    """
+    if isinstance(graph, CSRGraph):
+        return _csr_dijkstra(graph, src, target, stats)
+    distances = {src: 0}
+    parents = {src: src}
+    settled = set()
+    heap = [(0, src)]
+    out_edges = graph.all_out_edges_of_node
+    relaxed = 0
+    while heap:
+        distance, node = heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        if node == target:
+            break
+        for neighbour, weight in out_edges(node).items():
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbour, INFINITY):
+                distances[neighbour] = new_distance
+                parents[neighbour] = node
+                heappush(heap, (new_distance, neighbour))
+                relaxed += 1
+    if stats is not None:
+        _record_search(stats, settled, relaxed, heap, lambda node: len(out_edges(node)), target)
+    return distances, parents
+
+
+def dijkstra_to_targets(graph: GraphInteface, src, targets, stats=None):
+    """
+    Dijkstra's algorithm from src, stopping as soon as all the given targets are settled (or everything that can be
+    reached from src was searched), so a single search answers all the queries of a source.
+    :param graph: the graph to search in.
+    :param src: the source node of the search.
+    :param targets: the set of destination nodes.
+    :param stats: optional AlgoStats, the counters of the search are added to it.
+    :return: a tuple of two dictionaries: the distances from src, and the parent of every reached node.
+    note: only the distances of the settled nodes (including all the reachable targets) are final.
+    """
+    distances = {src: 0}
+    parents = {src: src}
+    settled = set()
+    remaining = set(targets)
+    heap = [(0, src)]
+    out_edges = graph.all_out_edges_of_node
+    relaxed = 0
+    last = None
+    while heap:
+        distance, node = heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        if node in remaining:
+            remaining.remove(node)
+            if not remaining:
+                last = node
+                break
+        for neighbour, weight in out_edges(node).items():
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbour, INFINITY):
+                distances[neighbour] = new_distance
+                parents[neighbour] = node
+                heappush(heap, (new_distance, neighbour))
+                relaxed += 1
+    if stats is not None:
+        _record_search(stats, settled, relaxed, heap, lambda node: len(out_edges(node)), last)
+    return distances, parents
+
+
+def _record_search(stats, settled: set, relaxed: int, heap: list, degree, target) -> None:
+    """
+    Adding the counters of a finished search to stats, the number of scanned edges is found from the settled nodes
+    (all of them were scanned, except the target when the search stopped at it).
+    """
+    edges_scanned = sum(degree(node) for node in settled)
+    if target in settled:
+        edges_scanned -= degree(target)
+    # Every relaxed edge pushed one entry, and the heap started with the source
+    stats.record_search(len(settled), relaxed + 1 - len(heap), relaxed, edges_scanned)
+
+
+def _csr_dijkstra(graph: CSRGraph, src, target=None, stats=None):
+    """
+    The same search as dijkstra, working directly on the arrays of a CSRGraph (using node indexes instead of ids), so
+    no dictionary of neighbours is created for every settled node. The results are translated back to node ids.
+    """
+    ids, offsets, targets, weights = graph.NodeIds, graph.OutOffsets, graph.OutTargets, graph.OutWeights
+    start = graph.index_of(src)
+    end = graph.index_of(target) if target is not None else None
+    distances = {start: 0}
+    parents = {start: start}
+    settled = set()
+    heap = [(0, start)]
+    relaxed = 0
+    while heap:
+        distance, node = heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        if node == end:
+            break
+        first, last = offsets[node], offsets[node + 1]
+        for neighbour, weight in zip(targets[first:last], weights[first:last]):
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbour, INFINITY):
+                distances[neighbour] = new_distance
+                parents[neighbour] = node
+                heappush(heap, (new_distance, neighbour))
+                relaxed += 1
+    if stats is not None:
+        _record_search(stats, settled, relaxed, heap, lambda node: offsets[node + 1] - offsets[node], end)
+    return ({ids[node]: distance for node, distance in distances.items()},
+            {ids[node]: ids[parent] for node, parent in parents.items()})
+
+
+def astar(graph: GraphInteface, src, target, potential, stats=None):
+    """
+    The A* algorithm - Dijkstra's algorithm where the heap is ordered by (distance from src + potential), the potential
+    being a lower bound of the distance from a node to the target. This directs the search towards the target, so far
+    fewer nodes are settled. The potential must be consistent (potential(u) <= weight(u,v) + potential(v) for every
+    edge), which makes every node final as soon as it is popped, just like in Dijkstra's algorithm.
+    :param graph: the graph to search in.
+    :param src: the source node of the search.
+    :param target: the destination node, the search stops as soon as it is settled.
+    :param potential: a function returning the lower bound of the distance from a node to the target.
+    :param stats: optional AlgoStats, the counters of the search are added to it.
+    :return: a tuple of two dictionaries: the distances from src, and the parent of every reached node.
+    """
+    distances = {src: 0}
+    parents = {src: src}
+    settled = set()
+    heap = [(potential(src), 0, src)]
+    out_edges = graph.all_out_edges_of_node
+    relaxed = 0
+    while heap:
+        estimate, distance, node = heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        if node == target:
+            break
+        for neighbour, weight in out_edges(node).items():
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbour, INFINITY):
+                distances[neighbour] = new_distance
+                parents[neighbour] = node
+                heappush(heap, (new_distance + potential(neighbour), new_distance, neighbour))
+                relaxed += 1
+    if stats is not None:
+        _record_search(stats, settled, relaxed, heap, lambda node: len(out_edges(node)), target)
+    return distances, parents
+
+
+def bidirectional_dijkstra(graph: GraphInteface, src, target, stats=None) -> (float, list):
+    """
+    Bidirectional Dijkstra: one search goes forward from src over the out-edges, and a second search goes backward
+    from target over the in-edges (the reverse index of the graph). Every step expands the search whose next node is
+    closer to its start, and every edge that reaches a node already reached by the other search is a candidate path.
+    The searches stop as soon as the sum of the two next distances is at least the length of the best candidate,
+    since no path through unsettled nodes can be shorter. On most graphs the two searches together settle far fewer
+    nodes than a single search from src to target.
+    :param graph: the graph to search in.
+    :param src: the source node of the path.
+    :param target: the destination node of the path.
+    :param stats: optional AlgoStats, the counters of both searches are added to it.
+    :return: a tuple of the distance and the path from src to target, or (INFINITY, []) if there is no path.
+    """
+    forward = ({src: 0}, {src: src}, set(), [(0, src)], graph.all_out_edges_of_node)
+    backward = ({target: 0}, {target: target}, set(), [(0, target)], graph.all_in_edges_of_node)
+    best = INFINITY
+    meeting = None
+    relaxed = 0
+    while forward[3] and backward[3]:
+        if forward[3][0][0] + backward[3][0][0] >= best:
+            break
+        if forward[3][0][0] <= backward[3][0][0]:
+            search, other = forward, backward
+        else:
+            search, other = backward, forward
+        distances, parents, settled, heap, edges = search
+        distance, node = heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        other_distances = other[0]
+        for neighbour, weight in edges(node).items():
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbour, INFINITY):
+                distances[neighbour] = new_distance
+                parents[neighbour] = node
+                heappush(heap, (new_distance, neighbour))
+                relaxed += 1
+                if neighbour in other_distances and new_distance + other_distances[neighbour] < best:
+                    best = new_distance + other_distances[neighbour]
+                    meeting = neighbour
+
+    if stats is not None:
+        edges_scanned = sum(len(forward[4](node)) for node in forward[2]) + \
+            sum(len(backward[4](node)) for node in backward[2])
+        stats.record_search(len(forward[2]) + len(backward[2]), relaxed + 2 - len(forward[3]) - len(backward[3]),
+                            relaxed, edges_scanned)
+    if meeting is None:
+        return INFINITY, []
+    path = build_path(forward[1], src, meeting)
+    backward_parents = backward[1]
+    node = meeting
+    while node != target:
+        node = backward_parents[node]
+        path.append(node)
+    # Summing the weights from src to target, so the distance is rounded exactly like a forward search would round it
+    distance = 0
+    for node, next_node in zip(path, path[1:]):
+        distance += graph.all_out_edges_of_node(node)[next_node]
+    return distance, path
+
+
+def euclidean_scale(graph: GraphInteface) -> float:
+    """
+    Finding how the weights of the edges relate to the geometric distance between the positions of their nodes:
+    the largest factor such that weight >= factor * distance for every edge in the graph.
+    Multiplying the distance between a node and the target by this factor gives a consistent A* potential.
+    :param graph: the graph to check.
+    :return: the factor, or 0 if there is none (some nodes have no position, or the weights are unrelated to the
+    positions), in which case the distances can't be used as a heuristic.
+    """
+    nodes = graph.get_all_v()
+    scale = INFINITY
+    for node_id, node in nodes.items():
+        if node.pos is None:
+            return 0
+        src = GeoLocation(*node.pos)
+        for neighbour, weight in graph.all_out_edges_of_node(node_id).items():
+            pos = nodes[neighbour].pos
+            if pos is None:
+                return 0
+            distance = src.distance(GeoLocation(*pos))
+            if distance > 0 and weight / distance < scale:
+                scale = weight / distance
+    if scale == INFINITY or scale <= 0:
+        return 0
+    # Keeping a small margin, so rounding errors never make the potential larger than a real distance
+    return scale * (1 - 1e-9)
+
+
+def euclidean_potential(graph: GraphInteface, target, scale: float):
+    """
+    :return: a potential function for astar: the straight line distance from a node to the target times scale.
+    """
+    nodes = graph.get_all_v()
+    goal = GeoLocation(*nodes[target].pos)
+
+    def potential(node):
+        pos = nodes[node].pos
+        return scale * math.sqrt((goal.x - pos[0]) ** 2 + (goal.y - pos[1]) ** 2 + (goal.z - pos[2]) ** 2)
+
+    return potential
+
+
+def distance_row(graph: GraphInteface, src, targets: list) -> list:
+    """
+    Running a single full Dijkstra from src, and returning the distances to the given targets.
+    :param graph: the graph to search in.
+    :param src: the source node.
+    :param targets: the list of target nodes.
+    :return: a list of the distances from src to every target (INFINITY for unreachable targets).
+    """
+    distances = dijkstra(graph, src)[0]
+    return [distances.get(target, INFINITY) for target in targets]
+
+
+# The graph and targets of a worker process of GraphAlgo.distance_matrix, set once by init_distance_worker
+_worker_graph = None
+_worker_targets = None
+
+
+def init_distance_worker(graph: GraphInteface, targets: list):
+    global _worker_graph, _worker_targets
+    _worker_graph = graph
+    _worker_targets = targets
+
+
+def distance_worker_row(src) -> list:
+    return distance_row(_worker_graph, src, _worker_targets)
+
+
+def build_path(parents: dict, src, dest) -> list:
+    """
+    Backtracking the path from dest to src using the parents dictionary that was built by the search.
+    :param parents: dictionary of (node, parent node).
+    :param src: the source node of the path.
+    :param dest: the destination node of the path.
+    :return: a list of the nodes in the path from src to dest, or an empty list if dest was not reached.
+    """
+    if dest not in parents:
+        return []
+    path = [dest]
+    while dest != src:
+        dest = parents[dest]
+        path.append(dest)
+    return path[::-1]
@@ -0,0 +1,35 @@
+import unittest
+from benchmarks.graphs import random_graph, random_pairs
+from benchmarks.run import run, compare
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_random_graph(self):
+        graph = random_graph(50, 4, seed=3)
+        self.assertEqual(graph.v_size(), 50)
+        self.assertEqual(graph.e_size(), 200)
+        same = random_graph(50, 4, seed=3)
+        for node in range(50):
+            self.assertEqual(graph.all_out_edges_of_node(node), same.all_out_edges_of_node(node))
+            self.assertEqual(graph.getNode(node).pos, same.getNode(node).pos)
+        self.assertEqual(random_graph(3, 8).e_size(), 6)
+        self.assertEqual(random_pairs(graph, 5, seed=1), random_pairs(same, 5, seed=1))
+
+    def test_run(self):
+        results = run([20], warmup=0, repeat=2, use_networkx=False, plot=False)
+        operations = [result["operation"] for result in results["results"]]
+        self.assertEqual(operations, ["load_json", "save_json", "save_json_gzip", "load_binary", "shortest_path",
+                                      "connected_components"])
+        for result in results["results"]:
+            self.assertEqual(result["nodes"], 20)
+            self.assertEqual(len(result["times"]), 2)
+            self.assertLessEqual(result["min"], result["median"])
+        self.assertEqual(results["meta"]["repeat"], 2)
+        slower = {"results": [dict(result, median=result["median"] * 2) for result in results["results"]]}
+        self.assertEqual(compare(results, results), [])
+        self.assertEqual(len(compare(slower, results)), len(operations))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from src.DiGraph import DiGraph
+
+
+# Create simple graph
+def create_graph():
+    default_weight = 10
+    graph = DiGraph()
+    for node in range(20):
+        graph.add_node(node, (node, node * 2, 0))
+    for node in range(19):
+        graph.add_edge(node, node + 1, default_weight)
+    graph.add_edge(19, 0, 1.5)
+    return graph
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_freeze(self):
+        graph = create_graph()
+        frozen = graph.freeze()
+        self.assertEqual(frozen.v_size(), 20)
+        self.assertEqual(frozen.e_size(), 20)
+        self.assertEqual(frozen.get_mc(), graph.get_mc())
+        for node in range(20):
+            self.assertEqual(frozen.all_out_edges_of_node(node), graph.all_out_edges_of_node(node))
+            self.assertEqual(frozen.all_in_edges_of_node(node), graph.all_in_edges_of_node(node))
+        self.assertEqual(frozen.getNode(3).pos, (3, 6, 0))
+        self.assertIsNone(frozen.getNode(20))
+        self.assertIsNone(frozen.all_out_edges_of_node(20))
+
+    def test_immutable(self):
+        graph = create_graph()
+        frozen = graph.freeze()
+        self.assertFalse(frozen.add_node(30))
+        self.assertFalse(frozen.add_edge(0, 5, 1))
+        self.assertFalse(frozen.remove_edge(0, 1))
+        self.assertFalse(frozen.remove_node(0))
+        graph.remove_node(0)
+        self.assertEqual(frozen.v_size(), 20)
+        self.assertEqual(frozen.all_out_edges_of_node(0), {1: 10})
+
+    def test_sparse_ids(self):
+        graph = DiGraph()
+        for node in (7, 3, 100):
+            graph.add_node(node)
+        graph.add_edge(7, 100, 2.5)
+        graph.add_edge(100, 3, 1)
+        frozen = graph.freeze()
+        frozen._index = None
+        self.assertEqual(frozen.all_out_edges_of_node(7), {100: 2.5})
+        self.assertEqual(frozen.all_in_edges_of_node(3), {100: 1})
+        self.assertIsNone(frozen.getNode(7).pos)
+        self.assertEqual(list(frozen.get_all_v().keys()), [7, 3, 100])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
+import threading
 from src.DiGraph import DiGraph
+from src.GraphAlgo import GraphAlgo
 
 
 # Create simple graph
@@ -41,6 +43,209 @@ class MyTestCase(unittest.TestCase):
         graph.remove_node(18)
         self.assertEqual(graph.get_mc(), 46)
 
+    def test_bulk(self):
+        graph = DiGraph()
+        self.assertEqual(graph.add_nodes_from(range(10), [(node, node, 0) for node in range(10)]), 10)
+        self.assertEqual(graph.add_nodes_from([5, 10, 10]), 1)
+        mc = graph.get_mc()
+        self.assertRaises(ValueError, graph.add_nodes_from, [11, 12, 13], [(1, 1, 0), (2, 2, 0)])
+        self.assertRaises(ValueError, graph.add_nodes_from, iter([11]), iter([(1, 1, 0), (2, 2, 0)]))
+        self.assertEqual((graph.v_size(), graph.get_mc()), (11, mc))
+        self.assertEqual(graph.getNode(3).pos, (3, 3, 0))
+        self.assertIsNone(graph.getNode(10).pos)
+        self.assertEqual(graph.get_mc(), 11)
+        edges = [(node, node + 1, 1.5) for node in range(10)] + [(0, 1, 2), (3, 3, 1), (0, 42, 1)]
+        self.assertEqual(graph.add_edges_from(edges), 10)
+        self.assertEqual(graph.e_size(), 10)
+        self.assertEqual(graph.all_out_edges_of_node(0), {1: 1.5})
+        self.assertEqual(graph.all_in_edges_of_node(10), {9: 1.5})
+        self.assertEqual(graph.get_mc(), 21)
+        self.assertEqual(graph.remove_edges_from([(0, 1), (0, 1), (1, 2), (5, 42)]), 2)
+        self.assertEqual(graph.e_size(), 8)
+        self.assertEqual(graph.all_in_edges_of_node(2), {})
+        self.assertEqual(graph.get_mc(), 23)
+
+    def test_packed_positions(self):
+        graph = DiGraph(packed_positions=True)
+        for node in range(5):
+            graph.add_node(node, (node, node * 2, 0))
+        graph.add_node(5)
+        graph.add_nodes_from([6, 7], [(1.5, 2.5, 3.5), None])
+        self.assertEqual(graph.getNode(3).pos, (3, 6, 0))
+        self.assertIsNone(graph.getNode(5).pos)
+        self.assertEqual(graph.getNode(6).pos, (1.5, 2.5, 3.5))
+        graph.getNode(5).pos = (9, 9, 9)
+        self.assertEqual(graph.getNode(5).pos, (9, 9, 9))
+        graph.remove_node(3)
+        graph.add_node(8)
+        self.assertIsNone(graph.getNode(8).pos)
+        self.assertEqual(graph.getNode(4).pos, (4, 8, 0))
+        self.assertEqual(graph.freeze().getNode(6).pos, (1.5, 2.5, 3.5))
+
+    def test_listeners(self):
+        class Recorder:
+            def __init__(self):
+                self.changes = []
+
+            def node_added(self, node_id, pos):
+                self.changes.append(("node_added", node_id))
+
+            def node_removed(self, node_id):
+                self.changes.append(("node_removed", node_id))
+
+            def edge_added(self, src, dest, weight):
+                self.changes.append(("edge_added", src, dest))
+
+            def edge_removed(self, src, dest):
+                self.changes.append(("edge_removed", src, dest))
+
+        graph = create_graph()
+        recorder = Recorder()
+        graph.add_listener(recorder)
+        graph.add_node(20)
+        graph.add_edge(19, 20, 1)
+        graph.add_edge(19, 20, 1)
+        graph.remove_edge(0, 1)
+        graph.remove_node(5)
+        graph.add_edges_from([(20, 0, 1), (20, 42, 1)])
+        graph.remove_edges_from([(20, 0)])
+        self.assertEqual(recorder.changes, [("node_added", 20), ("edge_added", 19, 20), ("edge_removed", 0, 1),
+                                            ("node_removed", 5), ("edge_added", 20, 0), ("edge_removed", 20, 0)])
+        graph.remove_listener(recorder)
+        graph.add_node(21)
+        self.assertEqual(len(recorder.changes), 6)
+
+        index = graph.enable_dynamic_scc()
+        self.assertEqual(index.component(10), [10])
+        graph.add_edge(10, 6, 1)
+        self.assertEqual(index.component(6), [6, 7, 8, 9, 10])
+        graph.remove_edge(8, 9)
+        self.assertEqual(index.component(6), [6])
+
+    def test_pos_bounds(self):
+        graph = DiGraph()
+        self.assertIsNone(graph.get_pos_bounds())
+        graph.add_node(0, (1, 5, 0))
+        graph.add_node(1)
+        graph.add_nodes_from([2, 3], [(-2, 7, 0), (4, 6, 0)])
+        self.assertEqual(graph.get_pos_bounds(), (-2, 4, 5, 7))
+        graph.remove_node(2)
+        self.assertEqual(graph.get_pos_bounds(), (1, 4, 5, 6))
+        graph.set_node_pos(0, (3, 5.5, 0))
+        self.assertEqual(graph.get_pos_bounds(), (3, 4, 5.5, 6))
+        self.assertEqual(graph.assign_missing_positions(), 1)
+        x, y, z = graph.getNode(1).pos
+        self.assertTrue(3 <= x <= 4 and 5.5 <= y <= 6)
+        self.assertEqual(graph.assign_missing_positions(), 0)
+        graph.add_nodes_from(range(10, 20))
+        self.assertEqual(graph.assign_missing_positions((0, 1, 0, 1)), 10)
+        self.assertEqual(graph.get_pos_bounds()[0], min(node.pos[0] for node in graph.get_all_v().values()))
+
+    def test_snapshot(self):
+        graph = create_graph()
+        snapshot = graph.snapshot()
+        self.assertIs(graph.snapshot(), snapshot)
+        self.assertEqual((snapshot.v_size(), snapshot.e_size(), snapshot.get_mc()), (20, 19, graph.get_mc()))
+        self.assertFalse(snapshot.add_edge(0, 2, 1))
+
+        graph.add_edge(0, 2, 1)
+        graph.remove_node(10)
+        graph.remove_edge(3, 4)
+        graph.add_node(20, (1, 2, 0))
+        graph.add_edges_from([(19, 20, 1), (20, 0, 1)])
+        graph.set_node_pos(0, (5, 5, 0))
+        self.assertEqual((snapshot.v_size(), snapshot.e_size()), (20, 19))
+        self.assertEqual(snapshot.all_out_edges_of_node(0), {1: 10})
+        self.assertEqual(snapshot.all_in_edges_of_node(11), {10: 10})
+        self.assertEqual(snapshot.all_out_edges_of_node(3), {4: 10})
+        self.assertIsNone(snapshot.getNode(20))
+        self.assertIsNone(snapshot.getNode(0).pos)
+        self.assertIsNone(snapshot.get_pos_bounds())
+        self.assertEqual(GraphAlgo(snapshot).shortest_path(0, 19)[0], 190)
+
+        self.assertEqual((graph.v_size(), graph.e_size()), (20, 19))
+        self.assertEqual(graph.all_out_edges_of_node(0), {1: 10, 2: 1})
+        self.assertEqual(graph.getNode(0).pos, (5, 5, 0))
+        self.assertEqual(GraphAlgo(graph).shortest_path(0, 19), (float("inf"), []))
+        # Only the changed dictionaries were copied, the rest is still shared
+        self.assertIs(graph.all_out_edges_of_node(15), snapshot.all_out_edges_of_node(15))
+        self.assertIsNot(graph.all_out_edges_of_node(0), snapshot.all_out_edges_of_node(0))
+
+        second = graph.snapshot()
+        self.assertIsNot(second, snapshot)
+        graph.remove_edge(0, 2)
+        self.assertEqual(second.all_out_edges_of_node(0), {1: 10, 2: 1})
+        self.assertEqual(second.get_pos_bounds(), (1, 5, 2, 5))
+
+    def test_snapshot_then_bulk(self):
+        # The first change after a snapshot is a bulk change
+        graph = create_graph()
+        snapshot = graph.snapshot()
+        self.assertEqual(graph.add_nodes_from([20, 21, 22]), 3)
+        self.assertEqual((graph.v_size(), snapshot.v_size()), (23, 20))
+        snapshot = graph.snapshot()
+        self.assertEqual(graph.add_edges_from([(0, 2, 1.0), (0, 2, 1.0), (20, 21, 1.0)]), 2)
+        self.assertEqual((graph.e_size(), snapshot.e_size()), (21, 19))
+        self.assertEqual(graph.all_out_edges_of_node(0), {1: 10, 2: 1.0})
+        self.assertEqual(snapshot.all_out_edges_of_node(0), {1: 10})
+        self.assertEqual(sum(len(graph.all_out_edges_of_node(node)) for node in graph.get_all_v()), graph.e_size())
+
+    def test_snapshot_positions(self):
+        graph = create_graph()
+        graph.set_node_pos(0, (1, 2, 0))
+        graph.set_node_pos(5, (3, 4, 0))
+        bounds = graph.get_pos_bounds()
+        snapshot = graph.snapshot()
+        # Querying the positions of a snapshot gives the missing ones only to the snapshot
+        x, y = GraphAlgo(snapshot).get_all_node_pos()
+        self.assertEqual(len(x), 20)
+        self.assertTrue(all(1 <= value <= 3 for value in x) and all(2 <= value <= 4 for value in y))
+        self.assertEqual(GraphAlgo(snapshot).get_node_pos_limits(), (3, 1, 4, 2))
+        self.assertIsNotNone(snapshot.getNode(1).pos)
+        self.assertIs(snapshot.getNode(0), graph.getNode(0))
+        self.assertIsNone(graph.getNode(1).pos)
+        self.assertEqual(graph.NodesWithoutPos, 18)
+        self.assertEqual(graph.get_pos_bounds(), bounds)
+        self.assertIsNone(graph.snapshot().getNode(1).pos)
+
+    def test_snapshot_while_changing(self):
+        graph = DiGraph(packed_positions=True)
+        graph.add_nodes_from(range(200), [(node, node, 0) for node in range(200)])
+        errors = []
+
+        def writer():
+            for i in range(2000):
+                graph.add_edge(i % 200, (i * 7 + 1) % 200, 1)
+                if i % 3 == 0:
+                    graph.remove_edge(i % 200, (i * 7 + 1) % 200)
+                if i % 500 == 0:
+                    graph.remove_node(i % 200)
+                    graph.add_node(i % 200, (i, i, 0))
+
+        def reader():
+            for _ in range(200):
+                snapshot = graph.snapshot()
+                out_count = sum(len(snapshot.all_out_edges_of_node(node)) for node in snapshot.get_all_v())
+                in_count = sum(len(snapshot.all_in_edges_of_node(node)) for node in snapshot.get_all_v())
+                if not out_count == in_count == snapshot.e_size():
+                    errors.append((out_count, in_count, snapshot.e_size()))
+                if any(node.pos[0] % 200 != node.id for node in snapshot.get_all_v().values()):
+                    errors.append("pos")
+
+        threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_slots(self):
+        graph = create_graph()
+        self.assertFalse(hasattr(graph.getNode(0), "__dict__"))
+        packed = DiGraph(packed_positions=True)
+        packed.add_node(0, (1, 2, 3))
+        self.assertFalse(hasattr(packed.getNode(0), "__dict__"))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,15 @@
 import unittest
+import os
+import json
+import sys
+import random
+import subprocess
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
 from src.DiGraph import DiGraph
 from src.GraphAlgo import GraphAlgo
+from src.ConnectedComponents import strongly_connected_components
+from src import ScipyBackend
 
 
 # Create simple graph
@@ -40,6 +49,13 @@ def create_graph_for_component():
     return graph
 
 
+def typed(values):
+    # Comparing numbers with their types, since 10 == 10.0
+    if isinstance(values, dict):
+        return {key: (type(value), value) for key, value in values.items()}
+    return [(type(value), value) for value in values]
+
+
 class MyTestCase(unittest.TestCase):
 
     def test_save_and_load(self):
@@ -70,6 +86,79 @@ class MyTestCase(unittest.TestCase):
         self.assertFalse(graph_algo.load_from_json("../data/A404"))
         self.assertFalse(graph_algo.load_from_json("ThisDoesNotExist.json"))
 
+        # Node ids that are not integers
+        graph = DiGraph()
+        for node_id in (0, 1, "a", "b", 2 ** 70):
+            graph.add_node(node_id, (1, 2, 0))
+        graph.add_edge(0, 1, 1)
+        graph.add_edge(1, "a", 2)
+        graph.add_edge("a", "b", 3)
+        graph.add_edge("b", 2 ** 70, 4)
+        self.assertTrue(GraphAlgo(graph).save_to_json("MyGraph.json"))
+        self.assertTrue(graph_algo.load_from_json("MyGraph.json"))
+        self.assertEqual(graph_algo.shortest_path(0, 2 ** 70), (10, [0, 1, "a", "b", 2 ** 70]))
+        os.remove("MyGraph.json")
+
+    def test_save_json_stream(self):
+        graph_algo = GraphAlgo()
+        graph_algo.load_from_json("../data/A5")
+        graph = graph_algo.get_graph()
+        graph.add_node(100)
+        graph.add_edge(100, 0, 7)
+        expected = {"Edges": [{"src": src, "w": weight, "dest": dest} for src in graph.get_all_v()
+                              for dest, weight in graph.all_out_edges_of_node(src).items()],
+                    "Nodes": [{"pos": None if node.pos is None else "%s, %s, %s" % node.pos, "id": node_id}
+                              for node_id, node in graph.get_all_v().items()]}
+        self.assertTrue(graph_algo.save_to_json("MyGraph_stream.json"))
+        with open("MyGraph_stream.json") as file:
+            self.assertEqual(file.read(), json.dumps(expected))
+
+        self.assertTrue(graph_algo.save_to_json("MyGraph_stream.json.gz", sort=True))
+        with open("MyGraph_stream.json.gz", "rb") as file:
+            compressed = file.read()
+        self.assertEqual(compressed[:2], b"\x1f\x8b")
+        loaded = GraphAlgo()
+        self.assertTrue(loaded.load_from_json("MyGraph_stream.json.gz"))
+        self.assertEqual(sorted(loaded.get_graph().get_all_v()), sorted(graph.get_all_v()))
+        self.assertEqual(loaded.get_graph().all_out_edges_of_node(7), graph.all_out_edges_of_node(7))
+
+        # The sorted mode saves the same graph (in any order) as the same file
+        reversed_graph = DiGraph()
+        for node_id in reversed(list(graph.get_all_v())):
+            reversed_graph.add_node(node_id, graph.getNode(node_id).pos)
+        for node_id in reversed(list(graph.get_all_v())):
+            for dest, weight in reversed(list(graph.all_out_edges_of_node(node_id).items())):
+                reversed_graph.add_edge(node_id, dest, weight)
+        self.assertTrue(GraphAlgo(reversed_graph).save_to_json("MyGraph_stream.json.gz", sort=True))
+        with open("MyGraph_stream.json.gz", "rb") as file:
+            self.assertEqual(file.read(), compressed)
+        self.assertTrue(graph_algo.save_to_json("MyGraph_stream.json", compress=False, sort=True))
+        with open("MyGraph_stream.json") as file:
+            edges = [(edge["src"], edge["dest"]) for edge in json.load(file)["Edges"]]
+        self.assertEqual(edges, sorted(edges))
+        os.remove("MyGraph_stream.json")
+        os.remove("MyGraph_stream.json.gz")
+
+    def test_save_and_load_binary(self):
+        graph_algo = GraphAlgo()
+        self.assertTrue(graph_algo.load_from_json("../data/A5"))
+        graph = graph_algo.get_graph()
+        self.assertTrue(graph_algo.save_binary("MyGraph.bin"))
+        binary_algo = GraphAlgo()
+        self.assertTrue(binary_algo.load_binary("MyGraph.bin"))
+        binary = binary_algo.get_graph()
+        self.assertEqual(binary.v_size(), 48)
+        self.assertEqual(binary.e_size(), 166)
+        self.assertEqual(binary.get_mc(), 214)
+        for node_id, node in graph.get_all_v().items():
+            self.assertEqual(binary.getNode(node_id).pos, node.pos)
+            self.assertEqual(binary.all_out_edges_of_node(node_id), graph.all_out_edges_of_node(node_id))
+            self.assertEqual(binary.all_in_edges_of_node(node_id), graph.all_in_edges_of_node(node_id))
+        self.assertEqual(binary_algo.shortest_path(4, 9), (2.948614138644694, [4, 13, 11, 9]))
+        self.assertFalse(binary_algo.load_binary("../data/A5"))
+        self.assertFalse(binary_algo.load_binary("ThisDoesNotExist.bin"))
+        os.remove("MyGraph.bin")
+
     def test_shortest_path(self):
         graph = create_graph()
         graph_algo = GraphAlgo(graph)
@@ -85,6 +174,214 @@ class MyTestCase(unittest.TestCase):
         self.assertEqual(graph_algo.shortest_path(4, 9), (2.948614138644694, [4, 13, 11, 9]))
         self.assertEqual(graph_algo.shortest_path(2, 2), (0, [2]))
 
+    def test_shortest_path_euclidean(self):
+        graph_algo = GraphAlgo()
+        graph_algo.load_from_json("../data/Graphs_random_pos/G_100_800_2.json")
+        for id1, id2 in [(0, 99), (42, 7), (13, 65), (80, 3)]:
+            dist, path = graph_algo.shortest_path(id1, id2)
+            astar_dist, astar_path = graph_algo.shortest_path(id1, id2, heuristic="euclidean")
+            self.assertAlmostEqual(dist, astar_dist)
+            self.assertEqual((astar_path[0], astar_path[-1]), (id1, id2))
+
+        # Without positions A* falls back to Dijkstra's algorithm
+        graph_algo = GraphAlgo(create_graph())
+        self.assertEqual(graph_algo.shortest_path(0, 10, heuristic="euclidean"),
+                         (100, [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10]))
+        with self.assertRaises(ValueError):
+            graph_algo.shortest_path(0, 10, heuristic="manhattan")
+
+    def test_shortest_path_bidirectional(self):
+        graph_algo = GraphAlgo(create_graph())
+        self.assertEqual(graph_algo.shortest_path(0, 10, bidirectional=True),
+                         (100, [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10]))
+        self.assertEqual(graph_algo.shortest_path(10, 0, bidirectional=True), (float("inf"), []))
+
+        graph_algo.load_from_json("../data/A5")
+        self.assertEqual(graph_algo.shortest_path(4, 9, bidirectional=True), (2.948614138644694, [4, 13, 11, 9]))
+        for id1, id2 in [(7, 15), (47, 19), (20, 2), (2, 20)]:
+            dist = graph_algo.shortest_path(id1, id2)[0]
+            self.assertAlmostEqual(graph_algo.shortest_path(id1, id2, bidirectional=True)[0], dist)
+
+    def test_contraction_hierarchy(self):
+        graph_algo = GraphAlgo()
+        graph_algo.load_from_json("../data/A5")
+        pairs = [(4, 9), (7, 15), (47, 19), (20, 2), (2, 20), (32, 32)]
+        expected = [graph_algo.shortest_path(id1, id2) for id1, id2 in pairs]
+        hierarchy = graph_algo.build_contraction_hierarchy()
+        self.assertTrue(hierarchy.is_valid(graph_algo.get_graph()))
+        for (id1, id2), (dist, path) in zip(pairs, expected):
+            self.assertEqual(graph_algo.shortest_path(id1, id2), (dist, path))
+        self.assertEqual(graph_algo.shortest_paths(pairs), expected)
+        # Only the distances, without unpacking the shortcuts of the paths
+        with mock.patch.object(type(hierarchy), "_unpack", side_effect=AssertionError):
+            distances = graph_algo.shortest_paths(pairs, paths=False)
+        for distance, (dist, path) in zip(distances, expected):
+            self.assertAlmostEqual(distance, dist)
+        self.assertTrue(graph_algo.save_contraction_hierarchy("MyGraph.ch.json"))
+
+        graph_algo.load_from_json("../data/A5")
+        self.assertFalse(hierarchy.is_valid(graph_algo.get_graph()))
+        self.assertTrue(graph_algo.load_contraction_hierarchy("MyGraph.ch.json"))
+        for (id1, id2), (dist, path) in zip(pairs, expected):
+            self.assertAlmostEqual(graph_algo.shortest_path(id1, id2)[0], dist)
+        graph_algo.load_from_json("../data/A3")
+        self.assertFalse(graph_algo.load_contraction_hierarchy("MyGraph.ch.json"))
+        os.remove("MyGraph.ch.json")
+
+        # A change in the graph makes shortest_path go back to Dijkstra's algorithm
+        graph = create_graph()
+        graph_algo = GraphAlgo(graph)
+        graph_algo.build_contraction_hierarchy()
+        self.assertEqual(graph_algo.shortest_path(0, 3), (30, [0, 1, 2, 3]))
+        self.assertEqual(graph_algo.shortest_paths([(0, 3), (3, 0), (5, 5)], paths=False), [30, float("inf"), 0])
+        graph.add_edge(0, 3, 5)
+        self.assertEqual(graph_algo.shortest_path(0, 3), (5, [0, 3]))
+
+    def test_landmarks(self):
+        graph_algo = GraphAlgo()
+        graph_algo.load_from_json("../data/Graphs_no_pos/G_100_800_0.json")
+        landmarks = graph_algo.build_landmarks(4)
+        self.assertEqual(len(landmarks.landmarks), 4)
+        self.assertEqual(len(set(landmarks.landmarks)), 4)
+        pairs = [(0, 99), (42, 7), (13, 65), (80, 3), (5, 5)]
+        expected = [graph_algo.shortest_path(id1, id2) for id1, id2 in pairs]
+        for (id1, id2), (dist, path) in zip(pairs, expected):
+            alt_dist, alt_path = graph_algo.shortest_path(id1, id2, heuristic="landmarks")
+            self.assertAlmostEqual(alt_dist, dist)
+            self.assertEqual((alt_path[0], alt_path[-1]), (id1, id2))
+        self.assertTrue(graph_algo.save_landmarks("MyGraph.landmarks.json"))
+
+        graph_algo.load_from_json("../data/Graphs_no_pos/G_100_800_0.json")
+        self.assertFalse(landmarks.is_valid(graph_algo.get_graph()))
+        self.assertFalse(graph_algo.save_landmarks("MyGraph.landmarks.json"))
+        self.assertTrue(graph_algo.load_landmarks("MyGraph.landmarks.json"))
+        for (id1, id2), (dist, path) in zip(pairs, expected):
+            self.assertAlmostEqual(graph_algo.shortest_path(id1, id2, heuristic="landmarks")[0], dist)
+        graph_algo.load_from_json("../data/A5")
+        self.assertFalse(graph_algo.load_landmarks("MyGraph.landmarks.json"))
+        os.remove("MyGraph.landmarks.json")
+
+        # Unreachable targets, and a change in the graph makes shortest_path go back to Dijkstra's algorithm
+        graph = create_graph()
+        graph_algo = GraphAlgo(graph)
+        graph_algo.build_landmarks(2)
+        self.assertEqual(graph_algo.shortest_path(10, 0, heuristic="landmarks"), (float("inf"), []))
+        self.assertEqual(graph_algo.shortest_path(0, 3, heuristic="landmarks"), (30, [0, 1, 2, 3]))
+        graph.add_edge(3, 0, 5)
+        self.assertEqual(graph_algo.shortest_path(3, 1, heuristic="landmarks"), (15, [3, 0, 1]))
+
+    def test_stats(self):
+        graph_algo = GraphAlgo()
+        self.assertIsNone(graph_algo.get_stats())
+        calls = []
+        graph_algo.enable_stats(lambda operation, stats: calls.append((operation, stats)))
+        graph_algo.load_from_json("../data/A5")
+        graph_algo.shortest_path(4, 9)
+        graph_algo.shortest_path(4, 9, bidirectional=True)
+        graph_algo.connected_components()
+        graph_algo.connected_component(3)
+        self.assertEqual([operation for operation, stats in calls],
+                         ["load_from_json", "shortest_path", "shortest_path", "connected_components",
+                          "connected_component"])
+
+        counters, times = graph_algo.get_stats()["counters"], graph_algo.get_stats()["times"]
+        self.assertEqual(counters["load_from_json.nodes"], 48)
+        self.assertGreaterEqual(times["load_from_json.total"], times["load_from_json.insert"])
+        self.assertIn("load_from_json.parse", times)
+        self.assertEqual(counters["shortest_path.calls"], 2)
+        self.assertEqual(counters["shortest_path.searches"], 2)
+        self.assertEqual(counters["shortest_path.nodes_popped"],
+                         counters["shortest_path.nodes_settled"] + counters["shortest_path.stale_entries"])
+        self.assertLessEqual(counters["shortest_path.edges_relaxed"], counters["shortest_path.edges_scanned"])
+        single = calls[1][1].counters
+        self.assertTrue(len(GraphAlgo(graph_algo.get_graph()).shortest_path(4, 9)[1]) <= single["nodes_settled"] <= 48)
+        self.assertEqual(counters["connected_components.nodes_visited"], 48)
+        self.assertEqual(counters["connected_component.cache_hits"], 1)
+
+        graph_algo.disable_stats()
+        graph_algo.shortest_path(4, 9)
+        self.assertIsNone(graph_algo.get_stats())
+        self.assertEqual(len(calls), 5)
+
+    def test_shortest_paths(self):
+        graph_algo = GraphAlgo()
+        graph_algo.load_from_json("../data/A5")
+        pairs = [(4, 9), (7, 15), (4, 13), (47, 19), (4, 9), (32, 32), (4, 100), (7, 4), (20, 2)]
+        expected = [graph_algo.shortest_path(id1, id2) for id1, id2 in pairs]
+        self.assertEqual(graph_algo.shortest_paths(pairs), expected)
+        self.assertEqual(graph_algo.shortest_paths(pairs, paths=False), [dist for dist, path in expected])
+        self.assertEqual(graph_algo.shortest_paths([]), [])
+        graph_algo.enable_path_cache()
+        self.assertEqual(graph_algo.shortest_paths(iter(pairs)), expected)
+
+        graph_algo = GraphAlgo(create_graph())
+        graph_algo.enable_stats()
+        self.assertEqual(graph_algo.shortest_paths([(0, 3), (0, 10), (10, 0), (0, 1)], paths=False),
+                         [30, 100, float("inf"), 10])
+        counters = graph_algo.get_stats()["counters"]
+        self.assertEqual((counters["shortest_paths.sources"], counters["shortest_paths.searches"]), (2, 2))
+        # The search from 0 stops at 10, the search from 10 settles everything it can reach (10..19)
+        self.assertEqual(counters["shortest_paths.nodes_settled"], 11 + 10)
+
+        if ScipyBackend.is_available():
+            scipy_algo = GraphAlgo(backend="scipy")
+            scipy_algo.load_from_json("../data/A5")
+            self.assertEqual(scipy_algo.shortest_paths(pairs), expected)
+            self.assertEqual(typed(scipy_algo.shortest_paths(pairs, paths=False)),
+                             typed(dist for dist, path in expected))
+            scipy_algo = GraphAlgo(create_graph(), backend="scipy")
+            self.assertEqual(typed(scipy_algo.shortest_paths([(0, 3), (0, 10), (10, 0), (0, 1)], paths=False)),
+                             typed([30, 100, float("inf"), 10]))
+
+    def test_path_cache(self):
+        graph = create_graph()
+        graph_algo = GraphAlgo(graph)
+        self.assertIsNone(graph_algo.path_cache_stats())
+        graph_algo.enable_path_cache(max_size=2)
+        self.assertEqual(graph_algo.shortest_path(0, 10), (100, [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10]))
+        self.assertEqual(graph_algo.shortest_path(0, 3), (30, [0, 1, 2, 3]))
+        self.assertEqual(graph_algo.shortest_path(1, 3), (20, [1, 2, 3]))
+        self.assertEqual(graph_algo.shortest_path(2, 3), (10, [2, 3]))
+        stats = graph_algo.path_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"], stats["size"]), (1, 3, 1, 2))
+
+        graph.add_edge(0, 3, 5)
+        self.assertEqual(graph_algo.shortest_path(0, 3), (5, [0, 3]))
+        stats = graph_algo.path_cache_stats()
+        self.assertEqual((stats["misses"], stats["invalidations"], stats["size"]), (4, 1, 1))
+        self.assertEqual(graph_algo.shortest_path(3, 0), (float("inf"), []))
+        graph_algo.disable_path_cache()
+        self.assertEqual(graph_algo.shortest_path(0, 10), (75, [0, 3, 4, 5, 6, 7, 8, 9, 10]))
+
+    def test_distance_matrix(self):
+        graph = create_graph()
+        graph_algo = GraphAlgo(graph)
+        distances = graph_algo.single_source_distances(5)
+        self.assertEqual(len(distances), 15)
+        self.assertEqual(distances[19], 140)
+        self.assertEqual(graph_algo.single_source_distances(42), {})
+
+        matrix = graph_algo.distance_matrix([0, 5, 19], [0, 10, 19], workers=1)
+        self.assertEqual(matrix, [[0, 100, 190], [float("inf"), 50, 140], [float("inf"), float("inf"), 0]])
+        self.assertEqual([typed(row) for row in graph_algo.distance_matrix([0, 5, 19], [0, 10, 19], workers=2)],
+                         [typed(row) for row in matrix])
+        # The processes keep the node ids and the weights of the graph as they are
+        string_graph = DiGraph()
+        string_graph.add_nodes_from(["a", "b", "c"])
+        string_graph.add_edges_from([("a", "b", 2), ("b", "c", 3.5)])
+        string_algo = GraphAlgo(string_graph)
+        self.assertEqual([typed(row) for row in string_algo.distance_matrix(["a", "b", "c"], workers=2)],
+                         [typed(row) for row in string_algo.distance_matrix(["a", "b", "c"], workers=1)])
+        self.assertEqual([typed(row) for row in GraphAlgo(graph.snapshot()).distance_matrix([0, 5], workers=2)],
+                         [typed(row) for row in graph_algo.distance_matrix([0, 5], workers=1)])
+        # A small matrix is calculated in this process by default
+        with mock.patch("os.cpu_count", return_value=8), \
+                mock.patch("concurrent.futures.ProcessPoolExecutor", side_effect=AssertionError):
+            self.assertEqual(graph_algo.distance_matrix([0, 5, 19], [0, 10, 19]), matrix)
+        self.assertEqual(len(graph_algo.distance_matrix([3])[0]), 20)
+        with self.assertRaises(KeyError):
+            graph_algo.distance_matrix([42])
+
     def test_connected_component(self):
         graph = create_graph_for_component()
         graphAlgo = GraphAlgo(graph)
@@ -101,6 +398,132 @@ class MyTestCase(unittest.TestCase):
         ans1 = graphAlgo.connected_components()
         self.assertEqual(ans1, [[0, 1, 2], [3, 5], [4, 6], [7]])
 
+    def test_connected_components_after_change(self):
+        graph = create_graph_for_component()
+        graphAlgo = GraphAlgo(graph)
+        self.assertEqual(graphAlgo.connected_component(3), [3, 5])
+        graph.add_edge(5, 2, 1)
+        self.assertEqual(graphAlgo.connected_component(3), [0, 1, 2, 3, 4, 5, 6])
+        self.assertEqual(graphAlgo.connected_components(), [[0, 1, 2, 3, 4, 5, 6], [7]])
+        graphAlgo.connected_components()[0].append(8)
+        self.assertEqual(graphAlgo.connected_component(7), [7])
+        self.assertEqual(graphAlgo.connected_components(), [[0, 1, 2, 3, 4, 5, 6], [7]])
+
+    def test_dynamic_connected_components(self):
+        graph_algo = GraphAlgo()
+        graph_algo.load_from_json("../data/Graphs_no_pos/G_100_800_0.json")
+        graph = graph_algo.get_graph()
+        graph.enable_dynamic_scc()
+        random.seed(3)
+        for step in range(300):
+            node = random.randrange(100)
+            if step % 2 == 0:
+                graph.add_edge(node, random.randrange(100), 1)
+            elif step % 10 == 1:
+                graph.remove_node(node)
+                graph.add_node(node)
+            else:
+                for neighbour in list(graph.all_out_edges_of_node(node))[:3]:
+                    graph.remove_edge(node, neighbour)
+            expected = sorted(sorted(component) for component in strongly_connected_components(graph))
+            self.assertEqual(graph_algo.connected_components(), expected)
+        for component in expected:
+            self.assertEqual(graph_algo.connected_component(component[0]), component)
+        self.assertEqual(graph_algo.connected_component(1000), [])
+        graph.disable_dynamic_scc()
+        self.assertEqual(graph_algo.connected_components(), expected)
+
+    def test_backend(self):
+        graph_algo = GraphAlgo(create_graph())
+        self.assertEqual(graph_algo.set_backend("scipy"), ScipyBackend.is_available())
+        self.assertRaises(ValueError, graph_algo.set_backend, "networkx")
+        self.assertTrue(graph_algo.set_backend("python"))
+        self.assertEqual(graph_algo.backend, "python")
+
+    @unittest.skipUnless(ScipyBackend.is_available(), "SciPy is not installed")
+    def test_scipy_backend(self):
+        python_algo = GraphAlgo()
+        python_algo.load_from_json("../data/A5")
+        scipy_algo = GraphAlgo(python_algo.get_graph(), backend="scipy")
+        self.assertEqual(scipy_algo.backend, "scipy")
+        for id1, id2 in [(4, 9), (7, 15), (47, 19), (20, 2), (32, 32), (4, 100)]:
+            self.assertEqual(scipy_algo.shortest_path(id1, id2), python_algo.shortest_path(id1, id2))
+        self.assertEqual(typed(scipy_algo.single_source_distances(3)), typed(python_algo.single_source_distances(3)))
+        self.assertEqual([typed(row) for row in scipy_algo.distance_matrix([1, 2], [3, 100, 1])],
+                         [typed(row) for row in python_algo.distance_matrix([1, 2], [3, 100, 1], workers=1)])
+
+        # With int weights all the distances are ints, like the Python algorithms return them
+        int_python_algo = GraphAlgo(create_graph())
+        int_scipy_algo = GraphAlgo(int_python_algo.get_graph(), backend="scipy")
+        self.assertEqual(typed(int_scipy_algo.single_source_distances(5)),
+                         typed(int_python_algo.single_source_distances(5)))
+        self.assertEqual([typed(row) for row in int_scipy_algo.distance_matrix([0, 5, 19], [0, 10, 19])],
+                         [typed(row) for row in int_python_algo.distance_matrix([0, 5, 19], [0, 10, 19], workers=1)])
+        self.assertEqual(int_scipy_algo.distance_matrix([0], [10], as_array=True).tolist(), [[100.0]])
+
+        graph = create_graph_for_component()
+        scipy_algo = GraphAlgo(graph, backend="scipy")
+        self.assertEqual(scipy_algo.connected_component(3), [3, 5])
+        graph.add_edge(5, 2, 1)
+        self.assertEqual(scipy_algo.connected_components(), [[0, 1, 2, 3, 4, 5, 6], [7]])
+
+        matrix, node_ids = python_algo.get_graph().to_scipy_sparse()
+        self.assertEqual(matrix.shape, (48, 48))
+        copy = DiGraph.from_scipy_sparse(matrix, node_ids)
+        self.assertEqual(copy.e_size(), python_algo.get_graph().e_size())
+        self.assertEqual(copy.all_out_edges_of_node(7), python_algo.get_graph().all_out_edges_of_node(7))
+
+        # The node ids of the matrix don't have to be ints
+        graph = DiGraph()
+        graph.add_nodes_from(["a", "b", "c", "d"])
+        graph.add_edges_from([("a", "b", 2), ("b", "c", 3), ("a", "c", 7), ("c", "a", 1)])
+        string_python_algo = GraphAlgo(graph)
+        string_scipy_algo = GraphAlgo(graph, backend="scipy")
+        self.assertEqual(string_scipy_algo.shortest_path("a", "c"), string_python_algo.shortest_path("a", "c"))
+        self.assertEqual(typed(string_scipy_algo.single_source_distances("b")),
+                         typed(string_python_algo.single_source_distances("b")))
+        self.assertEqual([typed(row) for row in string_scipy_algo.distance_matrix(["a", "d"], ["c", "d"])],
+                         [typed(row) for row in string_python_algo.distance_matrix(["a", "d"], ["c", "d"], workers=1)])
+        self.assertEqual(string_scipy_algo.connected_components(), [["a", "b", "c"], ["d"]])
+
+    def test_concurrent_queries(self):
+        graph_algo = GraphAlgo()
+        graph_algo.load_from_json("../data/Graphs_on_circle/G_1000_8000_1.json")
+        graph = graph_algo.get_graph()
+        random.seed(7)
+        pairs = [(random.randrange(1000), random.randrange(1000)) for _ in range(200)]
+        expected_paths = [graph_algo.shortest_path(id1, id2) for id1, id2 in pairs]
+        expected_components = graph_algo.connected_components()
+
+        def query(index):
+            # Every query uses its own GraphAlgo over the same shared graph
+            algo = GraphAlgo(graph)
+            id1, id2 = pairs[index]
+            return algo.shortest_path(id1, id2), algo.connected_component(id1), algo.connected_components()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(query, range(len(pairs))))
+        for index, (path, component, components) in enumerate(results):
+            self.assertEqual(path, expected_paths[index])
+            self.assertIn(component, expected_components)
+            self.assertIn(pairs[index][0], component)
+            self.assertEqual(components, expected_components)
+        for node in graph.get_all_v().values():
+            self.assertEqual(node.tag, 0)
+            self.assertEqual(node.info, "")
+
+    def test_separate_default_graphs(self):
+        first, second = GraphAlgo(), GraphAlgo()
+        first.get_graph().add_node(0)
+        self.assertEqual(second.get_graph().v_size(), 0)
+
+    def test_frozen_graph(self):
+        graph = create_graph_for_component()
+        graphAlgo = GraphAlgo(graph.freeze())
+        self.assertEqual(graphAlgo.connected_components(), [[0, 1, 2], [3, 5], [4, 6], [7]])
+        self.assertEqual(graphAlgo.connected_component(4), [4, 6])
+        self.assertEqual(graphAlgo.shortest_path(0, 7), (40, [0, 2, 3, 5, 7]))
+
 
     def test_plot(self):
         algo = GraphAlgo()
@@ -108,6 +531,35 @@ class MyTestCase(unittest.TestCase):
         graph = algo.get_graph()
         algo.plot_graph(graph)
 
+    def test_render_to_file(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        self.assertTrue(algo.render_to_file("MyGraph.png", dpi=50, size=(4, 3)))
+        with open("MyGraph.png", "rb") as file:
+            self.assertEqual(file.read(8), b"\x89PNG\r\n\x1a\n")
+        os.remove("MyGraph.png")
+        self.assertFalse(algo.render_to_file("../data/no_such_folder/MyGraph.png"))
+        self.assertTrue(GraphAlgo(DiGraph()).render_to_file("MyGraph.svg"))
+        os.remove("MyGraph.svg")
+
+    def test_import_without_matplotlib(self):
+        code = "import sys; from src.GraphAlgo import GraphAlgo; print('matplotlib' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], cwd="..", capture_output=True, text=True).stdout
+        self.assertEqual(output.strip(), "False")
+
+    def test_plot_level_of_detail(self):
+        from matplotlib.figure import Figure
+        algo = GraphAlgo()
+        algo.load_from_json("../data/Graphs_on_circle/G_100_800_1.json")
+        ax = Figure().subplots()
+        algo.plot_graph(ax, max_edges=100)
+        self.assertEqual(len(ax.collections), 2)
+        self.assertTrue(90 <= len(ax.collections[0].get_segments()) <= 100)
+        ax = Figure().subplots()
+        algo.plot_graph(ax, max_edges=None)
+        self.assertEqual(len(ax.collections), 2)
+        self.assertEqual(len(ax.collections[0].U), algo.get_graph().e_size())
+
 
 if __name__ == '__main__':
     unittest.main()
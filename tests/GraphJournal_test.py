@@ -0,0 +1,210 @@
+import unittest
+from unittest import mock
+import os
+import tempfile
+from src.DiGraph import DiGraph
+from src.GraphAlgo import GraphAlgo
+from src.GraphJournal import GraphJournal
+
+
+# Create simple graph
+def create_graph():
+    default_weight = 10
+    graph = DiGraph()
+    for node in range(20):
+        graph.add_node(node, (node, node * 2, 0))
+    for node in range(19):
+        graph.add_edge(node, node + 1, default_weight)
+    return graph
+
+
+def graph_state(graph):
+    nodes = {node_id: node.pos for node_id, node in graph.get_all_v().items()}
+    edges = {node_id: dict(graph.all_out_edges_of_node(node_id)) for node_id in nodes}
+    return nodes, edges, graph.e_size(), graph.get_mc()
+
+
+def change_graph(graph):
+    graph.add_node(20)
+    graph.add_edge(19, 20, 2.5)
+    graph.remove_edge(0, 1)
+    graph.remove_node(10)
+    graph.add_edges_from([(20, 0, 1), (5, 7, 3)])
+    graph.remove_edges_from([(5, 6)])
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "graph")
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_recover(self):
+        graph = create_graph()
+        journal = graph.enable_journal(self.path)
+        self.assertTrue(os.path.exists(self.path + ".checkpoint"))
+        change_graph(graph)
+        self.assertEqual(journal.records, 7)
+
+        recovered = DiGraph.recover(self.path)
+        self.assertEqual(graph_state(recovered), graph_state(graph))
+        self.assertEqual(GraphAlgo(recovered).shortest_path(3, 7), (23, [3, 4, 5, 7]))
+        graph.disable_journal()
+        graph.add_node(21)
+        self.assertEqual(graph_state(DiGraph.recover(self.path))[3], graph.get_mc() - 1)
+
+        # A recovered graph continues the same journal
+        journal = recovered.enable_journal(self.path)
+        self.assertEqual(journal.records, 7)
+        recovered.add_edge(3, 9, 1)
+        recovered.disable_journal()
+        self.assertEqual(graph_state(DiGraph.recover(self.path)), graph_state(recovered))
+
+    def test_other_graph(self):
+        graph = create_graph()
+        graph.enable_journal(self.path)
+        graph.add_node(20)
+        graph.disable_journal()
+        # A different graph with the same MC starts a new checkpoint, instead of continuing the journal
+        other = DiGraph()
+        for node in range(graph.get_mc()):
+            other.add_node(100 + node)
+        self.assertEqual(other.get_mc(), graph.get_mc())
+        other.enable_journal(self.path)
+        other.add_edge(100, 101, 1)
+        other.disable_journal()
+        self.assertEqual(graph_state(DiGraph.recover(self.path)), graph_state(other))
+
+        # The graph that was recorded in the journal before doesn't continue the journal of the other graph
+        graph.enable_journal(self.path)
+        graph.add_edge(0, 2, 1)
+        graph.disable_journal()
+        self.assertEqual(graph_state(DiGraph.recover(self.path)), graph_state(graph))
+
+    def test_torn_record(self):
+        graph = create_graph()
+        graph.enable_journal(self.path, durability="none")
+        change_graph(graph)
+        graph.disable_journal()
+        expected = graph_state(DiGraph.recover(self.path))
+        with open(self.path + ".journal", "ab") as file:
+            file.write(b"\x03\x01\x02\x03")
+        self.assertEqual(graph_state(DiGraph.recover(self.path)), expected)
+
+        recovered = DiGraph.recover(self.path)
+        journal = GraphJournal(recovered, self.path)
+        recovered.add_node(30)
+        journal.close()
+        self.assertEqual(graph_state(DiGraph.recover(self.path)), graph_state(recovered))
+
+    def test_compact(self):
+        graph = create_graph()
+        journal = graph.enable_journal(self.path)
+        change_graph(graph)
+        journal.compact(wait=True)
+        self.assertEqual(journal.records, 0)
+        self.assertFalse(os.path.exists(self.path + ".journal.old"))
+        graph.add_edge(20, 1, 4)
+        self.assertEqual(graph_state(DiGraph.recover(self.path)), graph_state(graph))
+
+        # A compaction that didn't finish leaves the old checkpoint and the old journal, which is replayed too
+        with open(self.path + ".checkpoint", "rb") as file:
+            old_checkpoint = file.read()
+        with open(self.path + ".journal", "rb") as file:
+            old_journal = file.read()
+        journal.compact(wait=True)
+        graph.add_edge(20, 2, 4)
+        with open(self.path + ".checkpoint", "wb") as file:
+            file.write(old_checkpoint)
+        with open(self.path + ".journal.old", "wb") as file:
+            file.write(old_journal)
+        self.assertEqual(graph_state(DiGraph.recover(self.path)), graph_state(graph))
+        graph.disable_journal()
+
+        graph = create_graph()
+        journal = graph.enable_journal(self.path, compact_every=5)
+        change_graph(graph)
+        graph.disable_journal()
+        self.assertLess(journal.records, 5)
+        self.assertEqual(graph_state(DiGraph.recover(self.path)), graph_state(graph))
+
+    def test_bulk_change(self):
+        graph = create_graph()
+        graph.enable_journal(self.path)
+        self.assertEqual(graph.add_nodes_from([20, 21, 22]), 3)
+        self.assertEqual(graph.add_edges_from([(20, 21, 1.0), (20, 21, 1.0), (0, 2, 3)]), 2)
+        self.assertEqual((graph.v_size(), graph.e_size()), (23, 21))
+        graph.disable_journal()
+        self.assertEqual(graph_state(DiGraph.recover(self.path)), graph_state(graph))
+
+    def test_rejected_change(self):
+        graph = create_graph()
+        journal = graph.enable_journal(self.path)
+        expected = graph_state(graph)
+        # Changes that can't be recorded are refused before they change the graph
+        self.assertRaises(ValueError, graph.add_edge, 0, 2, "3")
+        self.assertRaises(ValueError, graph.add_edge, 0, 2.0, 3)
+        self.assertRaises(ValueError, graph.add_node, "a")
+        self.assertRaises(ValueError, graph.add_node, 2 ** 63)
+        self.assertRaises(ValueError, graph.add_nodes_from, [20, "b"])
+        self.assertRaises(ValueError, graph.add_edges_from, [(0, 2, 1), (0, 3, None)])
+        self.assertEqual(graph_state(graph), expected)
+        self.assertEqual(journal.records, 0)
+
+        # Ids that are equal to the integer ids of the graph are fine
+        self.assertTrue(graph.remove_edge(0.0, 1))
+        self.assertTrue(graph.remove_node(2.0))
+        self.assertTrue(graph.add_edge(0, 3, 7))
+        graph.disable_journal()
+        self.assertEqual(graph_state(DiGraph.recover(self.path)), graph_state(graph))
+        self.assertIsNone(graph.Journal)
+        self.assertTrue(graph.add_node("a"))
+
+    def test_failed_compaction(self):
+        graph = create_graph()
+        journal = graph.enable_journal(self.path)
+        change_graph(graph)
+        # The checkpoint can't be written while its temporary file is a folder
+        os.mkdir(self.path + ".checkpoint.tmp")
+        journal.compact(wait=True)
+        self.assertTrue(os.path.exists(self.path + ".journal.old"))
+        graph.add_edge(20, 1, 4)
+        # The next compaction keeps the records of the old journal, instead of replacing it with the current one
+        journal.compact(wait=True)
+        self.assertTrue(os.path.exists(self.path + ".journal.old"))
+        graph.add_edge(20, 2, 4)
+        self.assertEqual(graph_state(DiGraph.recover(self.path)), graph_state(graph))
+
+        os.rmdir(self.path + ".checkpoint.tmp")
+        journal.compact(wait=True)
+        self.assertFalse(os.path.exists(self.path + ".journal.old"))
+        graph.add_edge(20, 3, 4)
+        self.assertEqual(graph_state(DiGraph.recover(self.path)), graph_state(graph))
+        journal.compact(wait=True)
+        self.assertEqual(journal.records, 0)
+        graph.disable_journal()
+        self.assertEqual(graph_state(DiGraph.recover(self.path)), graph_state(graph))
+
+    def test_failed_compact_every(self):
+        graph = create_graph()
+        journal = graph.enable_journal(self.path, compact_every=3)
+        with mock.patch("src.GraphJournal._write_checkpoint", side_effect=OSError("disk full")) as write_checkpoint:
+            for node in range(20, 29):
+                graph.add_node(node)
+                compaction = journal.compaction
+                if compaction is not None:
+                    compaction.join()
+            # After a failed compaction, the next one waits for compact_every more records
+            self.assertEqual(write_checkpoint.call_count, 3)
+        self.assertTrue(os.path.exists(self.path + ".journal.old"))
+        journal.compact(wait=True)
+        self.assertFalse(os.path.exists(self.path + ".journal.old"))
+        graph.disable_journal()
+        self.assertEqual(graph_state(DiGraph.recover(self.path)), graph_state(graph))
+
+
+if __name__ == '__main__':
+    unittest.main()
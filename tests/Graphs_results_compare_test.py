@@ -1,5 +1,5 @@
 import unittest
-from tests.run_time_compare_test import create_nx_graph
+from benchmarks.graphs import create_nx_graph
 from src.DiGraph import DiGraph
 from src.GraphAlgo import GraphAlgo
 import networkx as nx
@@ -0,0 +1,43 @@
+import unittest
+import io
+import json
+from src.JsonStream import iter_json_arrays, JsonStreamReader
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_items(self):
+        text = '{"Edges": [{"src": 0, "w": 1.5, "dest": 1}, {"src": 1, "w": 2, "dest": 0}], "x": 12345, ' \
+               '"Nodes": [{"id": 0}, {"id": 1, "pos": "1.0,2.0,0.0"}], "Empty": []}'
+        expected = [(key, item) for key, value in json.loads(text).items() if isinstance(value, list)
+                    for item in value]
+        for chunk_size in (1, 2, 5, 64, 1 << 16):
+            self.assertEqual(list(iter_json_arrays(io.StringIO(text), chunk_size)), expected)
+
+    def test_batches(self):
+        # Nested objects and strings with brackets can't be cut into a batch anywhere, and are decoded one by one
+        text = '{"Nodes": [' + ", ".join('{"id": %d, "pos": {"x": %d}, "name": "}, ]%d"}' % (i, i, i)
+                                         for i in range(50)) + '], "Edges": [{"src": 0}, {"src": 1}]}'
+        expected = [(key, item) for key, value in json.loads(text).items() for item in value]
+        for chunk_size in (3, 10, 64, 1 << 16):
+            self.assertEqual(list(iter_json_arrays(io.StringIO(text), chunk_size)), expected)
+        batches = list(JsonStreamReader(io.StringIO(text)).batches())
+        self.assertEqual([(key, item) for key, batch in batches for item in batch], expected)
+
+    def test_data_file(self):
+        with open("../data/A5") as file:
+            expected = json.load(file)
+        with open("../data/A5") as file:
+            items = list(iter_json_arrays(file, 100))
+        self.assertEqual([item for key, item in items if key == "Nodes"], expected["Nodes"])
+        self.assertEqual([item for key, item in items if key == "Edges"], expected["Edges"])
+
+    def test_broken_file(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_arrays(io.StringIO('{"Nodes": [{"id": 0}, {"id": 1}'), 4))
+        with self.assertRaises(ValueError):
+            list(iter_json_arrays(io.StringIO('[1, 2]')))
+
+
+if __name__ == '__main__':
+    unittest.main()